@@ -80,12 +80,12 @@ def is_ip_allowed(ip: str, allowlist: str) -> bool:
 class AdminIPAllowlistMiddleware(BaseHTTPMiddleware):
     """
     Middleware to restrict admin endpoints to allowed IPs.
-    Applies to /admin/* endpoints only.
+    Applies to /admin/* and /metrics endpoints only.
     """
     
     async def dispatch(self, request: Request, call_next):
-        # Only apply to admin endpoints
-        if request.url.path.startswith("/admin"):
+        # Only apply to admin endpoints (metrics expose tenant names, so guard them too)
+        if request.url.path.startswith("/admin") or request.url.path == "/metrics":
             if ADMIN_IP_ALLOWLIST:
                 ip = get_client_ip(request)
                 
@@ -0,0 +1,210 @@
+"""
+Admission control for /chat and /search: an adaptive concurrency limit with a
+bounded wait queue and load shedding.
+
+Each endpoint has a limit on requests in flight that adapts to latency (AIMD):
+- a request that finishes within ADMISSION_LATENCY_TOLERANCE x the baseline
+  latency raises the limit by 1/limit (about +1 per limit-many requests)
+- a slower request, or a 5xx, cuts the limit by ADMISSION_BACKOFF_RATIO
+The baseline is a slow moving average of observed latency, so the limit
+settles where latency stops growing with concurrency.
+
+Requests over the limit wait in a FIFO queue of at most ADMISSION_QUEUE_SIZE
+for at most ADMISSION_QUEUE_TIMEOUT_MS; beyond that they are shed with
+503 + Retry-After instead of piling onto an already saturated upstream.
+Limits are per process.
+"""
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from fastapi import Request, status
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.metrics import ADMISSION_INFLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUE_DEPTH, ADMISSION_QUEUE_WAIT, ADMISSION_SHED
+
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "2000")) / 1000
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0"))
+ADMISSION_BACKOFF_RATIO = float(os.getenv("ADMISSION_BACKOFF_RATIO", "0.9"))
+
+# Weight of a new sample in the baseline latency average
+_BASELINE_ALPHA = 0.05
+
+
+class LoadShedError(Exception):
+    """Request rejected by admission control."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a bounded FIFO wait queue."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.baseline: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._update_gauges()
+
+    def _update_gauges(self):
+        ADMISSION_LIMIT.labels(self.name).set(int(self.limit))
+        ADMISSION_INFLIGHT.labels(self.name).set(self.inflight)
+        ADMISSION_QUEUE_DEPTH.labels(self.name).set(len(self._waiters))
+
+    def _has_capacity(self) -> bool:
+        return self.inflight < int(self.limit)
+
+    def retry_after(self) -> float:
+        """Suggested client back-off: roughly one request's worth of latency."""
+        return max(1.0, self.baseline or 1.0)
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if the limit is reached.
+
+        Raises:
+            LoadShedError: If the queue is full or the wait exceeds the queue timeout
+        """
+        if self._has_capacity() and not self._waiters:
+            self.inflight += 1
+            self._update_gauges()
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            ADMISSION_SHED.labels(self.name, "queue_full").inc()
+            raise LoadShedError("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            # _grant_waiters() counts the slot as in flight before resolving the future
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not (waiter.done() and not waiter.cancelled()):
+                # Not granted in time (a slot granted just as the timeout fired is kept)
+                waiter.cancel()
+                ADMISSION_SHED.labels(self.name, "queue_timeout").inc()
+                raise LoadShedError("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Client went away after being granted a slot: pass it on
+                self.release(None, success=True)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - start)
+            self._update_gauges()
+
+    def release(self, latency: Optional[float], success: bool):
+        """
+        Free a slot and adapt the limit.
+
+        Args:
+            latency: Request latency in seconds (None to skip adaptation)
+            success: False for failed (5xx) requests
+        """
+        if latency is not None:
+            self._adapt(latency, success)
+        self.inflight -= 1
+        self._grant_waiters()
+        self._update_gauges()
+
+    def _grant_waiters(self):
+        # Admit queued requests in FIFO order while the (adapted) limit allows
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def _adapt(self, latency: float, success: bool):
+        if self.baseline is None:
+            self.baseline = latency
+        congested = not success or latency > ADMISSION_LATENCY_TOLERANCE * self.baseline
+        if congested:
+            self.limit = max(self.min_limit, self.limit * ADMISSION_BACKOFF_RATIO)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            # Only uncongested samples move the baseline, so overload can't redefine "normal"
+            self.baseline += _BASELINE_ALPHA * (latency - self.baseline)
+
+
+def _limiter_from_env(path: str, initial: int, minimum: int, maximum: int) -> AdaptiveLimiter:
+    prefix = f"{path.strip('/').upper()}_CONCURRENCY"
+    return AdaptiveLimiter(
+        path,
+        initial_limit=int(os.getenv(f"{prefix}_LIMIT", str(initial))),
+        min_limit=int(os.getenv(f"{prefix}_MIN", str(minimum))),
+        max_limit=int(os.getenv(f"{prefix}_MAX", str(maximum)))
+    )
+
+
+# Limiters by path; /chat waits on the LLM, so it starts lower
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(path: str) -> Optional[AdaptiveLimiter]:
+    """Limiter for an admission-controlled path (None for other paths)."""
+    if not _limiters:
+        for path, initial, minimum, maximum in (("/chat", 16, 2, 128), ("/search", 32, 4, 256)):
+            _limiters[path] = _limiter_from_env(path, initial, minimum, maximum)
+    return _limiters.get(path)
+
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """
+    Admission control middleware for /chat and /search (POST).
+    Sheds load with 503 + Retry-After when the wait queue is full or too slow.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        limiter = get_limiter(request.url.path) if request.method == "POST" else None
+        if limiter is None:
+            return await call_next(request)
+
+        try:
+            await limiter.acquire()
+        except LoadShedError as e:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy. Try again later."},
+                headers={"Retry-After": str(math.ceil(e.retry_after))}
+            )
+
+        start = time.perf_counter()
+        latency = None
+        success = False
+        try:
+            response = await call_next(request)
+            latency = time.perf_counter() - start
+            success = response.status_code < 500
+            return response
+        finally:
+            limiter.release(latency, success)
@@ -0,0 +1,237 @@
+"""
+Compact bundle format for documents, chunks and their vectors.
+Used by the seed snapshot and tenant export/import.
+
+Layout:
+    AIERP-BUNDLE/1\\n
+    <header JSON>\\n            {"dimension": 384, "embedding_model": "...", ...}
+    <record JSON>\\n            one per line: {"type": "document", ...} or {"type": "chunk", ...}
+    ...
+    \\n                         empty line ends the metadata
+    <zero padding>              up to a 4-byte boundary
+    <float32 little-endian>     one row of `dimension` floats per chunk record, in record order
+
+The metadata is JSONL and the vectors are one contiguous block, so a reader
+can map the file and view all vectors with numpy.frombuffer without copying.
+"""
+import json
+import tempfile
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+MAGIC = b"AIERP-BUNDLE/1\n"
+VECTOR_DTYPE = np.dtype("<f4")
+_ALIGNMENT = VECTOR_DTYPE.itemsize
+_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def _json_line(obj: Dict[str, Any]) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class BundleWriter:
+    """
+    Incremental bundle writer.
+    Methods return the bytes to emit, so the writer works for files and for
+    streaming HTTP responses alike. Vectors are spooled (memory, then a temp
+    file past 16MB) until finish() appends them after the metadata.
+    """
+
+    def __init__(self, header: Dict[str, Any]):
+        if "dimension" not in header:
+            raise ValueError("Bundle header requires 'dimension'")
+        self.header = header
+        self.dimension = int(header["dimension"])
+        self.vector_count = 0
+        self._offset = 0
+        self._vectors = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def start(self) -> bytes:
+        """Magic line and header."""
+        return self._emit(MAGIC + _json_line(self.header))
+
+    def add_document(self, document: Dict[str, Any]) -> bytes:
+        """
+        Add a document record.
+
+        Args:
+            document: Document fields (id, source, title, content, ...)
+
+        Returns:
+            Bytes to write
+        """
+        return self._emit(_json_line({"type": "document", **document}))
+
+    def add_chunk(self, chunk: Dict[str, Any], vector) -> bytes:
+        """
+        Add a chunk record and its vector.
+
+        Args:
+            chunk: Chunk fields (id, document_id, chunk_index, content, ...)
+            vector: Embedding vector (sequence of floats or NumPy array)
+
+        Returns:
+            Bytes to write (metadata only; the vector is written by finish())
+        """
+        row = np.asarray(vector, dtype=VECTOR_DTYPE)
+        if row.shape != (self.dimension,):
+            raise ValueError(f"Vector has shape {row.shape}, expected ({self.dimension},)")
+        self._vectors.write(row.tobytes())
+        self.vector_count += 1
+        return self._emit(_json_line({"type": "chunk", **chunk}))
+
+    def finish(self, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Terminate the metadata and emit the vector block.
+
+        Args:
+            block_size: Size of the emitted vector pieces
+
+        Yields:
+            Bytes to write
+        """
+        terminator = b"\n"
+        padding = (-(self._offset + len(terminator))) % _ALIGNMENT
+        yield self._emit(terminator + b"\0" * padding)
+
+        self._vectors.seek(0)
+        while True:
+            data = self._vectors.read(block_size)
+            if not data:
+                break
+            yield self._emit(data)
+        self._vectors.close()
+
+
+def write_bundle(path: str, header: Dict[str, Any], documents: List[Dict[str, Any]], chunks: List[Tuple[Dict[str, Any], Any]]):
+    """
+    Write a complete bundle file.
+
+    Args:
+        path: Output file path
+        header: Bundle header (must include dimension)
+        documents: Document records
+        chunks: (chunk record, vector) pairs
+    """
+    writer = BundleWriter(header)
+    with open(path, "wb") as f:
+        f.write(writer.start())
+        for document in documents:
+            f.write(writer.add_document(document))
+        for chunk, vector in chunks:
+            f.write(writer.add_chunk(chunk, vector))
+        for data in writer.finish():
+            f.write(data)
+
+
+def read_header(file: IO[bytes]) -> Dict[str, Any]:
+    """
+    Read only the header of a bundle file (the file position is restored).
+
+    Raises:
+        ValueError: If the file is not a bundle
+    """
+    position = file.tell()
+    try:
+        file.seek(0)
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not an AIERP bundle (bad magic)")
+        return json.loads(file.readline())
+    finally:
+        file.seek(position)
+
+
+class BundleReader:
+    """
+    Lazy bundle reader over bytes or an mmap.
+    `vectors` is a zero-copy view into the buffer (keep the buffer open while
+    using it); records are parsed on iteration, so metadata for large bundles
+    is never held in memory all at once.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not an AIERP bundle (bad magic)")
+
+        header_end = buffer.find(b"\n", len(MAGIC))
+        if header_end < 0:
+            raise ValueError("Bundle header missing")
+        self.header: Dict[str, Any] = json.loads(bytes(view[len(MAGIC):header_end]))
+        self.dimension = int(self.header["dimension"])
+        self._records_start = header_end + 1
+
+        # JSON lines never contain a raw newline, so the first empty line ends the metadata
+        terminator = buffer.find(b"\n\n", header_end)
+        if terminator < 0:
+            raise ValueError("Truncated bundle metadata")
+        self._records_end = terminator + 1
+        offset = terminator + 2
+        offset += (-offset) % _ALIGNMENT
+
+        row_bytes = self.dimension * VECTOR_DTYPE.itemsize
+        block_bytes = len(view) - offset
+        if block_bytes % row_bytes:
+            raise ValueError(f"Vector block of {block_bytes} bytes is not a multiple of {row_bytes}")
+        count = block_bytes // row_bytes
+        self.vectors: np.ndarray = np.frombuffer(
+            view, dtype=VECTOR_DTYPE, count=count * self.dimension, offset=offset
+        ).reshape(count, self.dimension)
+
+    def records(self) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Iterate over metadata records.
+
+        Yields:
+            (record, vector_index) pairs; vector_index is the row in `vectors`
+            for chunk records and -1 for documents
+
+        Raises:
+            ValueError: If a record is invalid or the chunk count doesn't match the vector block
+        """
+        view = memoryview(self._buffer)
+        offset = self._records_start
+        vector_index = 0
+        while offset < self._records_end:
+            end = self._buffer.find(b"\n", offset)
+            record = json.loads(bytes(view[offset:end]))
+            offset = end + 1
+            if record.get("type") == "chunk":
+                if vector_index >= len(self.vectors):
+                    raise ValueError("Bundle has more chunk records than vectors")
+                yield record, vector_index
+                vector_index += 1
+            elif record.get("type") == "document":
+                yield record, -1
+            else:
+                raise ValueError(f"Unknown bundle record type: {record.get('type')}")
+        if vector_index != len(self.vectors):
+            raise ValueError(f"Bundle has {len(self.vectors)} vectors but {vector_index} chunk records")
+
+
+def read_bundle(buffer) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]], np.ndarray]:
+    """
+    Parse a whole bundle from bytes or an mmap (for small bundles such as the seed snapshot).
+    The returned vector matrix is a zero-copy view into `buffer`.
+
+    Args:
+        buffer: Bundle contents
+
+    Returns:
+        Tuple of (header, documents, chunks, vectors) where vectors[i] belongs to chunks[i]
+
+    Raises:
+        ValueError: If the buffer is not a valid bundle
+    """
+    reader = BundleReader(buffer)
+    documents: List[Dict[str, Any]] = []
+    chunks: List[Dict[str, Any]] = []
+    for record, vector_index in reader.records():
+        (chunks if vector_index >= 0 else documents).append(record)
+    return reader.header, documents, chunks, reader.vectors
@@ -0,0 +1,149 @@
+"""
+In-process cache of hydrated chunk rows.
+
+Popular chunks (opening hours, allergens, delivery rules) come back from
+Qdrant on nearly every request; caching their Postgres rows
+(id, document_id, chunk_index, content, source, title) saves the hydration
+query when all hits are cached.
+
+The cache is bounded to CHUNK_CACHE_SIZE rows and tenant-aware: rows are kept
+in one LRU per tenant, and when the cache is full the largest tenant gives up
+its least recently used row, so one busy tenant can't evict everyone else's
+hot chunks. CHUNK_CACHE_SIZE=0 disables the cache.
+
+Rows are keyed by chunk ID and the point's payload "revision", which every
+write of a point renews (see chunk_payload). Chunk IDs are deterministic, so
+a re-ingested or re-seeded chunk comes back with its old ID; its new revision
+makes every worker miss and load the new row, without any cross-process
+invalidation. Deleting a document or resetting a tenant also drops its rows
+in the local process right away; rows nobody asks for any more age out after
+CHUNK_CACHE_TTL_SECONDS.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.metrics import CHUNK_CACHE_ENTRIES, record_cache_lookup
+
+CHUNK_CACHE_SIZE = int(os.getenv("CHUNK_CACHE_SIZE", "10000"))
+CHUNK_CACHE_TTL_SECONDS = float(os.getenv("CHUNK_CACHE_TTL_SECONDS", "300"))
+
+
+class ChunkCache:
+    """Bounded LRU of chunk rows per tenant."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        # tenant -> (chunk_id, revision) -> (expires_at, row), least recently used first
+        self._tenants: Dict[str, "OrderedDict[Tuple[str, Optional[str]], Tuple[float, tuple]]"] = {}
+        # Bumped on invalidation, so rows loaded before it are not stored after it
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, tenant_id: str) -> int:
+        """Invalidation counter of a tenant (pass to put_many)."""
+        return self._generations.get(tenant_id, 0)
+
+    def get_many(self, tenant_id: str, revisions: Mapping[str, Optional[str]]) -> Tuple[Dict[str, tuple], List[str]]:
+        """
+        Look up chunk rows.
+
+        Args:
+            tenant_id: Tenant ID
+            revisions: Payload revision of each hit's point by chunk ID (None for
+                points written before revisions existed)
+
+        Returns:
+            Tuple of (rows by chunk ID, IDs not cached)
+        """
+        entries = self._tenants.get(tenant_id)
+        found: Dict[str, tuple] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        for chunk_id, revision in revisions.items():
+            key = (chunk_id, revision)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None and entry[0] <= now:
+                self._remove(tenant_id, key)
+                entry = None
+            if entry is None:
+                missing.append(chunk_id)
+                record_cache_lookup("chunk_hydration", False)
+                continue
+            entries.move_to_end(key)
+            found[chunk_id] = entry[1]
+            record_cache_lookup("chunk_hydration", True)
+        return found, missing
+
+    def put_many(self, tenant_id: str, rows: Iterable[tuple], revisions: Mapping[str, Optional[str]], generation: int):
+        """
+        Store chunk rows (row[0] is the chunk ID) loaded at `generation`, under
+        the revision of the point they were loaded for. Rows loaded before an
+        invalidation of the tenant are not stored.
+        """
+        if self.max_size <= 0 or generation != self.generation(tenant_id):
+            return
+        expires_at = time.monotonic() + self.ttl
+        for row in rows:
+            chunk_id = str(row[0])
+            key = (chunk_id, revisions.get(chunk_id))
+            if key not in self._tenants.get(tenant_id, ()):
+                if self.size >= self.max_size:
+                    self._evict()
+                self.size += 1
+            # Looked up per row: eviction may have removed this tenant's (emptied) LRU
+            entries = self._tenants.setdefault(tenant_id, OrderedDict())
+            entries[key] = (expires_at, tuple(row))
+            entries.move_to_end(key)
+        CHUNK_CACHE_ENTRIES.set(self.size)
+
+    def invalidate_document(self, tenant_id: str, document_id: str):
+        """Drop the cached rows of a document."""
+        self._generations[tenant_id] = self.generation(tenant_id) + 1
+        entries = self._tenants.get(tenant_id)
+        if entries is None:
+            return
+        for key in [key for key, (_, row) in entries.items() if str(row[1]) == document_id]:
+            self._remove(tenant_id, key)
+        CHUNK_CACHE_ENTRIES.set(self.size)
+
+    def invalidate_tenant(self, tenant_id: str):
+        """Drop all cached rows of a tenant."""
+        self._generations[tenant_id] = self.generation(tenant_id) + 1
+        entries = self._tenants.pop(tenant_id, None)
+        if entries:
+            self.size -= len(entries)
+        CHUNK_CACHE_ENTRIES.set(self.size)
+
+    def _remove(self, tenant_id: str, key: Tuple[str, Optional[str]]):
+        entries = self._tenants[tenant_id]
+        del entries[key]
+        self.size -= 1
+        if not entries:
+            del self._tenants[tenant_id]
+
+    def _evict(self):
+        # The largest tenant gives up its least recently used row
+        tenant_id = max(self._tenants, key=lambda tenant: len(self._tenants[tenant]))
+        key = next(iter(self._tenants[tenant_id]))
+        self._remove(tenant_id, key)
+
+
+_chunk_cache: Optional[ChunkCache] = None
+
+
+def get_chunk_cache() -> ChunkCache:
+    """Get the process-wide chunk cache."""
+    global _chunk_cache
+    if _chunk_cache is None:
+        _chunk_cache = ChunkCache(CHUNK_CACHE_SIZE, CHUNK_CACHE_TTL_SECONDS)
+    return _chunk_cache
+
+
+def reset_chunk_cache():
+    """Forget the chunk cache (for forked worker processes and tests)."""
+    global _chunk_cache
+    _chunk_cache = None
+    CHUNK_CACHE_ENTRIES.set(0)
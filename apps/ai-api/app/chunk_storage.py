@@ -0,0 +1,249 @@
+"""
+Chunk storage modes (CHUNK_STORAGE).
+
+inline (default): chunks.content holds each chunk's text and Qdrant payloads
+carry it as "text". With overlap, a document is stored roughly 3.5 times.
+
+offsets: chunks only store (start_offset, end_offset) into documents.content
+and Qdrant payloads carry ids and metadata, so the text is stored once.
+
+Offsets are recorded in both modes and CHUNK_CONTENT_SQL reads
+chunks.content when present, else the substring of the document, so reads
+work on any mix of rows. compact_chunk_storage() (POST
+/admin/chunk-storage/compact) converts existing data to the configured mode.
+"""
+import os
+import uuid
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.database import get_engine
+from app.jobs import Job
+from app.qdrant_client import get_qdrant_client
+from app.resilience import call, run_blocking
+
+logger = logging.getLogger(__name__)
+
+CHUNK_STORAGE_MODES = ("inline", "offsets")
+CHUNK_STORAGE = os.getenv("CHUNK_STORAGE", "inline")
+if CHUNK_STORAGE not in CHUNK_STORAGE_MODES:
+    raise ValueError(f"CHUNK_STORAGE must be one of {', '.join(CHUNK_STORAGE_MODES)}, got '{CHUNK_STORAGE}'")
+
+COMPACT_BATCH_SIZE = int(os.getenv("CHUNK_COMPACT_BATCH_SIZE", "200"))  # documents per batch
+
+# Chunk text for queries over `chunks c JOIN documents d` (substring is 1-based)
+CHUNK_CONTENT_SQL = (
+    "COALESCE(c.content, substring(d.content FROM c.start_offset + 1 FOR c.end_offset - c.start_offset))"
+)
+
+
+def chunk_spans(content: str, chunk_texts: Sequence[str]) -> List[Optional[Tuple[int, int]]]:
+    """
+    Locate chunks (in order) in their document's content.
+
+    Args:
+        content: Document content
+        chunk_texts: Chunk texts in chunk_index order
+
+    Returns:
+        (start, end) character offsets per chunk, None for a chunk not found
+    """
+    spans: List[Optional[Tuple[int, int]]] = []
+    position = 0
+    for chunk in chunk_texts:
+        start = content.find(chunk, position)
+        if start < 0:
+            start = content.find(chunk)
+        if start < 0:
+            spans.append(None)
+            continue
+        spans.append((start, start + len(chunk)))
+        position = start + 1
+    return spans
+
+
+def stored_content(chunk_text: str, span: Optional[Tuple[int, int]]) -> Optional[str]:
+    """Value for chunks.content: None in offsets mode when the chunk's span is known."""
+    return None if CHUNK_STORAGE == "offsets" and span is not None else chunk_text
+
+
+def chunk_payload(
+    document_id: str,
+    chunk_id: str,
+    tenant_id: str,
+    chunk_index: int,
+    chunk_text: str,
+    title: str,
+    source: str
+) -> dict:
+    """
+    Qdrant payload of a chunk's point ("text" only in inline mode).
+    "revision" is new on every write, so the chunk cache never serves a row
+    cached for an earlier write of the same (deterministic) chunk ID.
+    """
+    payload = {
+        "document_id": document_id,
+        "chunk_id": chunk_id,
+        "tenant_id": tenant_id,
+        "chunk_index": chunk_index,
+        "title": title,
+        "source": source,
+        "revision": uuid.uuid4().hex[:16]
+    }
+    if CHUNK_STORAGE == "inline":
+        payload["text"] = chunk_text
+    return payload
+
+
+async def load_chunk_texts(chunk_ids: Sequence[str]) -> Dict[str, str]:
+    """Chunk texts by chunk ID from Postgres (for points whose payload has no text)."""
+    if not chunk_ids:
+        return {}
+    engine = get_engine()
+
+    async def fetch_rows() -> Dict[str, str]:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(f"""
+                    SELECT c.id, {CHUNK_CONTENT_SQL}
+                    FROM chunks c
+                    JOIN documents d ON c.document_id = d.id
+                    WHERE c.id = ANY(CAST(:chunk_ids AS UUID[]))
+                """),
+                {"chunk_ids": list(chunk_ids)}
+            )
+            return {str(row[0]): row[1] for row in result.fetchall()}
+
+    return await call("postgres", fetch_rows)
+
+
+async def _compact_documents(rows: List[tuple]) -> Tuple[int, int]:
+    """Set offsets (and drop or restore chunks.content) for one batch of documents."""
+    engine = get_engine()
+    document_ids = [str(row[0]) for row in rows]
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(f"""
+                SELECT c.id, c.document_id, {CHUNK_CONTENT_SQL}
+                FROM chunks c
+                JOIN documents d ON c.document_id = d.id
+                WHERE c.document_id = ANY(CAST(:document_ids AS UUID[]))
+                ORDER BY c.document_id, c.chunk_index
+            """),
+            {"document_ids": document_ids}
+        )
+        chunk_rows = result.fetchall()
+
+    contents = {str(row[0]): row[1] for row in rows}
+    by_document: Dict[str, List[tuple]] = {}
+    for row in chunk_rows:
+        by_document.setdefault(str(row[1]), []).append(row)
+
+    updates = []
+    unlocated = 0
+    for document_id, chunks in by_document.items():
+        spans = chunk_spans(contents[document_id], [row[2] for row in chunks])
+        for row, span in zip(chunks, spans):
+            if span is None:
+                # Not a slice of its document (e.g. edited since): keep the text inline
+                unlocated += 1
+                continue
+            updates.append({
+                "id": str(row[0]),
+                "start_offset": span[0],
+                "end_offset": span[1],
+                "content": stored_content(row[2], span)
+            })
+
+    if updates:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("""
+                    UPDATE chunks
+                    SET start_offset = :start_offset, end_offset = :end_offset, content = :content
+                    WHERE id = CAST(:id AS UUID)
+                """),
+                updates
+            )
+    return len(updates), unlocated
+
+
+async def _strip_payload_text():
+    """Remove "text" from the payloads of every point of every collection."""
+    from qdrant_client.models import Filter, FilterSelector
+
+    from app.reembed import list_logical_collections
+    from app.tenant_router import collection_exists, load_versions
+
+    qdrant = get_qdrant_client()
+    for logical in await list_logical_collections():
+        active, building = await load_versions(logical)
+        for target in [active] + building:
+            if not await collection_exists(target.collection):
+                continue
+            await call(
+                "qdrant",
+                lambda target=target: run_blocking(
+                    "qdrant",
+                    qdrant.delete_payload,
+                    collection_name=target.collection,
+                    keys=["text"],
+                    points=FilterSelector(filter=Filter())
+                )
+            )
+
+
+async def compact_chunk_storage(job: Optional[Job] = None) -> Dict:
+    """
+    Convert stored chunks to the configured CHUNK_STORAGE mode.
+    Walks documents in keyset batches (one short transaction each), records
+    offsets for chunks without them and drops chunks.content in offsets mode
+    (restores it in inline mode). In offsets mode the Qdrant payload texts
+    are removed afterwards. Safe to re-run.
+
+    Args:
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with mode, documents, chunks_converted, chunks_kept_inline
+    """
+    engine = get_engine()
+    result = {"mode": CHUNK_STORAGE, "documents": 0, "chunks_converted": 0, "chunks_kept_inline": 0}
+    pending = "c.content IS NOT NULL" if CHUNK_STORAGE == "offsets" else "c.content IS NULL"
+    last_id = None
+
+    while True:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                text(f"""
+                    SELECT d.id, d.content
+                    FROM documents d
+                    WHERE (CAST(:last_id AS UUID) IS NULL OR d.id > CAST(:last_id AS UUID))
+                      AND EXISTS (
+                          SELECT 1 FROM chunks c
+                          WHERE c.document_id = d.id AND (c.start_offset IS NULL OR {pending})
+                      )
+                    ORDER BY d.id
+                    LIMIT :limit
+                """),
+                {"last_id": last_id, "limit": COMPACT_BATCH_SIZE}
+            )).fetchall()
+        if not rows:
+            break
+        converted, unlocated = await _compact_documents(rows)
+        result["documents"] += len(rows)
+        result["chunks_converted"] += converted
+        result["chunks_kept_inline"] += unlocated
+        last_id = str(rows[-1][0])
+        if job:
+            job.update(**result)
+
+    if CHUNK_STORAGE == "offsets":
+        if job:
+            job.update(phase="strip_payloads")
+        await _strip_payload_text()
+
+    logger.info("chunk_storage_compacted", extra=result)
+    return result
@@ -0,0 +1,153 @@
+"""
+Context assembly for /chat: turns retrieved chunks into the LLM's contexts.
+
+Retrieved chunks are:
+- merged: consecutive chunks of the same document (chunk_index N, N+1) share
+  CHUNK_OVERLAP characters, so they are joined into one passage with the
+  overlap written once
+- deduplicated: a passage whose text is already contained in an included
+  one (e.g. the same document ingested twice) is dropped
+- packed: passages are added best score first until CONTEXT_TOKEN_BUDGET is
+  reached; a passage that doesn't fit is skipped in favour of smaller ones
+
+Tokens are estimated from characters (CONTEXT_CHARS_PER_TOKEN), which is close
+enough for budgeting English text without a tokenizer dependency.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+CONTEXT_CHARS_PER_TOKEN = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "4"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "120"))
+
+
+@dataclass
+class ContextChunk:
+    """One retrieved chunk."""
+    document_id: str
+    chunk_index: int
+    content: str
+    score: float
+
+
+@dataclass
+class Passage:
+    """Consecutive chunks of one document, merged."""
+    document_id: str
+    first_index: int
+    last_index: int
+    text: str
+    score: float
+    chunk_indexes: List[int] = field(default_factory=list)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return max(1, round(len(text) / CONTEXT_CHARS_PER_TOKEN)) if text else 0
+
+
+def _overlap_length(left: str, right: str, max_overlap: int) -> int:
+    # Longest suffix of left that is a prefix of right (at most max_overlap chars)
+    for size in range(min(max_overlap, len(left), len(right)), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_chunks(chunks: Sequence[ContextChunk], max_overlap: int = CHUNK_OVERLAP) -> List[Passage]:
+    """
+    Merge consecutive chunks of the same document into passages.
+
+    Args:
+        chunks: Retrieved chunks (any order; duplicates of a chunk are ignored)
+        max_overlap: Longest overlap to look for between neighbouring chunks
+
+    Returns:
+        Passages; each scores as its best chunk
+    """
+    by_document: Dict[str, Dict[int, ContextChunk]] = {}
+    for chunk in chunks:
+        seen = by_document.setdefault(chunk.document_id, {})
+        if chunk.chunk_index not in seen or chunk.score > seen[chunk.chunk_index].score:
+            seen[chunk.chunk_index] = chunk
+
+    passages: List[Passage] = []
+    for document_id, indexed in by_document.items():
+        passage = None
+        for index in sorted(indexed):
+            chunk = indexed[index]
+            if passage is not None and index == passage.last_index + 1:
+                overlap = _overlap_length(passage.text, chunk.content, max_overlap)
+                passage.text += chunk.content[overlap:]
+                passage.last_index = index
+                passage.score = max(passage.score, chunk.score)
+                passage.chunk_indexes.append(index)
+                continue
+            passage = Passage(document_id, index, index, chunk.content, chunk.score, [index])
+            passages.append(passage)
+    return passages
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def pack_passages(passages: Sequence[Passage], token_budget: int = CONTEXT_TOKEN_BUDGET) -> List[Passage]:
+    """
+    Pick passages best score first until the token budget is used up.
+
+    Args:
+        passages: Candidate passages
+        token_budget: Maximum estimated tokens of all picked passages (0 = unlimited)
+
+    Returns:
+        Picked passages, best score first. If even the best passage exceeds the
+        budget, it is truncated to fit rather than sending no context at all.
+    """
+    picked: List[Passage] = []
+    picked_texts: List[str] = []
+    used = 0
+    for passage in sorted(passages, key=lambda p: p.score, reverse=True):
+        normalized = _normalize(passage.text)
+        if any(normalized in text for text in picked_texts):
+            continue
+        tokens = estimate_tokens(passage.text)
+        if token_budget and used + tokens > token_budget:
+            if picked:
+                continue
+            max_chars = int(token_budget * CONTEXT_CHARS_PER_TOKEN)
+            passage = Passage(
+                passage.document_id, passage.first_index, passage.last_index,
+                passage.text[:max_chars], passage.score, list(passage.chunk_indexes)
+            )
+            tokens = estimate_tokens(passage.text)
+        picked_texts.append(normalized)
+        picked.append(passage)
+        used += tokens
+    return picked
+
+
+def assemble_contexts(
+    chunks: Sequence[ContextChunk],
+    token_budget: int = CONTEXT_TOKEN_BUDGET
+) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Build LLM contexts from retrieved chunks: merge, deduplicate, pack.
+
+    Args:
+        chunks: Retrieved chunks
+        token_budget: Maximum estimated context tokens (0 = unlimited)
+
+    Returns:
+        Tuple of (context strings best first, stats dict with input_chunks,
+        passages, context_tokens)
+    """
+    passages = pack_passages(merge_chunks(chunks), token_budget)
+    contexts = [passage.text for passage in passages]
+    stats = {
+        "input_chunks": len(chunks),
+        "passages": len(passages),
+        "context_tokens": sum(estimate_tokens(text) for text in contexts),
+    }
+    return contexts, stats
@@ -1,9 +1,67 @@
+"""
+Postgres engines: the primary, and an optional read replica.
+
+DATABASE_URL is the primary; every write and anything that must see its own
+writes (placements, collection versions, jobs) uses get_engine().
+DATABASE_READ_URL, when set, is a streaming replica with its own pool for
+the public read paths (/search and /chat hydration, GET /documents), so
+large ingests on the primary don't slow them down. read_connection() uses
+the replica while it is reachable and its replay lag is below
+REPLICA_MAX_LAG_SECONDS (checked at most every REPLICA_CHECK_INTERVAL_SECONDS)
+and falls back to the primary otherwise.
+"""
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncEngine
 from sqlalchemy import text
+from app.metrics import POSTGRES_READS, POSTGRES_REPLICA_LAG
+from app.resilience import get_timeout
+
+logger = logging.getLogger(__name__)
 
 _database_url = os.getenv("DATABASE_URL", "")
+_read_database_url = os.getenv("DATABASE_READ_URL", "")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+
 _engine: AsyncEngine | None = None
+_read_engine: AsyncEngine | None = None
+
+# Last replica check: usable, why not, measured lag
+_replica = {"ok": False, "reason": "not checked", "lag_seconds": None, "checked_at": float("-inf")}
+_replica_check_lock = asyncio.Lock()
+
+# Replay lag; 0 when the replica has replayed everything it received (an idle
+# primary would otherwise look lagging) or is not in recovery at all
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Errors meaning the replica can't be reached (rather than a bad query)
+_CONNECT_ERRORS = (OSError, asyncio.TimeoutError, OperationalError, InterfaceError)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    # Convert postgresql:// to postgresql+asyncpg:// for async SQLAlchemy
+    async_url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    # Bounded waits for new connections and pool checkout; statement
+    # timeouts are applied per call site (app.resilience)
+    return create_async_engine(
+        async_url,
+        echo=False,
+        pool_timeout=get_timeout("postgres"),
+        connect_args={"timeout": get_timeout("postgres")}
+    )
 
 
 def get_engine() -> AsyncEngine:
@@ -12,12 +70,112 @@ def get_engine() -> AsyncEngine:
     if _engine is None:
         if not _database_url:
             raise ValueError("DATABASE_URL environment variable is not set")
-        # Convert postgresql:// to postgresql+asyncpg:// for async SQLAlchemy
-        async_url = _database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-        _engine = create_async_engine(async_url, echo=False)
+        _engine = _create_engine(_database_url)
     return _engine
 
 
+def get_read_engine() -> Optional[AsyncEngine]:
+    """Get or create the read replica engine (None without DATABASE_READ_URL)."""
+    global _read_engine
+    if _read_engine is None and _read_database_url:
+        _read_engine = _create_engine(_read_database_url)
+    return _read_engine
+
+
+def reset_engine():
+    """
+    Forget the engines without closing them (for forked worker processes).
+    Pooled connections inherited from a parent belong to the parent; the
+    worker opens its own on next use.
+    """
+    global _engine, _read_engine
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.sync_engine.dispose(close=False)
+    _engine = None
+    _read_engine = None
+    _replica.update(ok=False, reason="not checked", lag_seconds=None, checked_at=float("-inf"))
+
+
+async def close_engines():
+    """Close the pooled connections of both engines and forget them (shutdown)."""
+    global _engine, _read_engine
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            await engine.dispose()
+    _engine = None
+    _read_engine = None
+
+
+def _set_replica_state(ok: bool, reason: str, lag_seconds: Optional[float] = None):
+    if ok != _replica["ok"]:
+        log = logger.info if ok else logger.warning
+        log("postgres_replica_" + ("usable" if ok else "unusable"), extra={"reason": reason, "lag_seconds": lag_seconds})
+    _replica.update(ok=ok, reason=reason, lag_seconds=lag_seconds, checked_at=time.monotonic())
+    if lag_seconds is not None:
+        POSTGRES_REPLICA_LAG.set(lag_seconds)
+
+
+async def check_replica() -> dict:
+    """
+    Measure the replica's replay lag and decide whether reads may use it.
+
+    Returns:
+        Dict with ok, reason ("ok", "lagging" or the connection error) and lag_seconds
+    """
+    engine = get_read_engine()
+    if engine is None:
+        return {"ok": False, "reason": "not configured", "lag_seconds": None}
+
+    async def measure() -> float:
+        async with engine.connect() as conn:
+            return float((await conn.execute(text(REPLICA_LAG_SQL))).scalar() or 0)
+
+    try:
+        lag = await asyncio.wait_for(measure(), timeout=get_timeout("postgres"))
+    except Exception as e:
+        _set_replica_state(False, str(e) or type(e).__name__)
+    else:
+        if lag > REPLICA_MAX_LAG_SECONDS:
+            _set_replica_state(False, "lagging", lag)
+        else:
+            _set_replica_state(True, "ok", lag)
+    return {key: _replica[key] for key in ("ok", "reason", "lag_seconds")}
+
+
+async def _replica_usable() -> bool:
+    if get_read_engine() is None:
+        return False
+    if time.monotonic() - _replica["checked_at"] >= REPLICA_CHECK_INTERVAL_SECONDS:
+        # One check at a time; concurrent readers go by the previous result
+        if not _replica_check_lock.locked():
+            async with _replica_check_lock:
+                await check_replica()
+    return _replica["ok"]
+
+
+@asynccontextmanager
+async def read_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Connection for read-only queries: the replica while it is usable, else
+    the primary. A replica that can't be connected to is marked unusable
+    (until the next check) and the primary is used instead.
+    """
+    if await _replica_usable():
+        try:
+            conn = await get_read_engine().connect()
+        except _CONNECT_ERRORS as e:
+            _set_replica_state(False, str(e) or type(e).__name__)
+        else:
+            POSTGRES_READS.labels("replica").inc()
+            async with conn:
+                yield conn
+            return
+    POSTGRES_READS.labels("primary").inc()
+    async with get_engine().connect() as conn:
+        yield conn
+
+
 async def check_postgres() -> tuple[bool, str]:
     """
     Check Postgres connectivity.
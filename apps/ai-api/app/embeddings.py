@@ -0,0 +1,271 @@
+"""
+Embedding providers.
+EMBEDDING_PROVIDER selects the backend used by ingest, search, chat and startup:
+- "openai": OpenAI embeddings API (EMBEDDING_MODEL, optionally shortened to
+  EMBEDDING_DIMENSIONS)
+- "local": offline hashing embedder (NumPy, deterministic, no API key needed)
+
+Collections re-embedded with another model or size (see app/reembed.py) are
+served by a provider for that (model, dimensions) pair instead.
+"""
+import os
+import re
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.openai_client import get_embedding_model, get_embedding_dimensions
+from app.openai_client import get_embeddings as get_openai_embeddings
+
+_embedding_provider_name: str = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+_local_embedding_dim: int = int(os.getenv("LOCAL_EMBEDDING_DIM", "384"))
+
+# Known output sizes of OpenAI embedding models (avoids a probe call on startup)
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+LOCAL_MODEL_PREFIX = "local-hashing-"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingProvider:
+    """Interface for embedding backends."""
+
+    name: str = ""
+
+    @property
+    def model(self) -> str:
+        """Model identifier (stored alongside vectors to detect mismatches)."""
+        raise NotImplementedError
+
+    async def get_dimension(self) -> int:
+        """Size of the vectors produced by this provider."""
+        raise NotImplementedError
+
+    async def embed(
+        self,
+        texts: List[str],
+        tenant_id: Optional[str] = None,
+        request_id: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: List of text strings to embed
+            tenant_id: Tenant ID for logging (optional)
+            request_id: Request ID for logging (optional)
+
+        Returns:
+            List of embedding vectors (each is a list of floats)
+        """
+        raise NotImplementedError
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API."""
+
+    name = "openai"
+
+    def __init__(self, model: Optional[str] = None, dimensions: Optional[int] = None):
+        self._model = model or get_embedding_model()
+        full_size = OPENAI_MODEL_DIMENSIONS.get(self._model)
+        if dimensions is None and model is None:
+            dimensions = get_embedding_dimensions()
+        if dimensions is not None and dimensions <= 0:
+            raise ValueError("EMBEDDING_DIMENSIONS must be positive")
+        if dimensions is not None and full_size is not None and dimensions > full_size:
+            raise ValueError(f"{self._model} produces at most {full_size} dimensions, not {dimensions}")
+        # Full size needs no dimensions parameter (which older models reject)
+        self._requested_dimensions = dimensions if dimensions != full_size else None
+        self._dimension: Optional[int] = dimensions or full_size
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    async def get_dimension(self) -> int:
+        if self._dimension is None:
+            # Unknown model: probe once
+            self._dimension = len((await self.embed(["dimension probe"]))[0])
+        return self._dimension
+
+    async def embed(self, texts, tenant_id=None, request_id=None):
+        return await get_openai_embeddings(
+            texts, tenant_id=tenant_id, request_id=request_id,
+            model=self._model, dimensions=self._requested_dimensions
+        )
+
+
+@lru_cache(maxsize=65536)
+def _hash_token(token: str) -> int:
+    # blake2b is stable across processes (unlike hash(), which is salted per run)
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline embedder using the hashing trick.
+    Unigrams and bigrams are hashed into `dimension` signed buckets, weighted
+    by log term frequency and L2-normalized. Deterministic and dependency-free
+    beyond NumPy; texts sharing vocabulary get high cosine similarity.
+    """
+
+    name = "local"
+
+    def __init__(self, dimension: int = _local_embedding_dim):
+        if dimension <= 0:
+            raise ValueError("LOCAL_EMBEDDING_DIM must be positive")
+        self.dimension = dimension
+
+    @property
+    def model(self) -> str:
+        return f"{LOCAL_MODEL_PREFIX}{self.dimension}"
+
+    async def get_dimension(self) -> int:
+        return self.dimension
+
+    def _features(self, text: str) -> List[int]:
+        words = _TOKEN_PATTERN.findall(text.lower())
+        bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return [_hash_token(token) for token in words + bigrams]
+
+    def embed_sync(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a float32 matrix of shape (len(texts), dimension).
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            Row-normalized float32 matrix
+        """
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(features)
+
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if hashes:
+            hash_array = np.array(hashes, dtype=np.uint64)
+            columns = (hash_array % np.uint64(self.dimension)).astype(np.intp)
+            # Top hash bit picks the sign so collisions tend to cancel out
+            signs = np.where(hash_array >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.array(rows, dtype=np.intp), columns), signs)
+
+        # Sublinear term frequency, then L2 normalize
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
+
+    async def embed(self, texts, tenant_id=None, request_id=None):
+        return self.embed_sync(texts).tolist()
+
+
+_provider: EmbeddingProvider | None = None
+# Providers for other (model, dimensions) pairs, e.g. collections being re-embedded
+_spec_providers: Dict[Tuple[str, int], EmbeddingProvider] = {}
+
+
+def get_embedding_provider(model: Optional[str] = None, dimensions: Optional[int] = None) -> EmbeddingProvider:
+    """
+    Get or create an embedding provider.
+
+    Args:
+        model: Model the vectors must come from (None = the configured provider)
+        dimensions: Vector size for that model (required with model)
+
+    Returns:
+        The configured provider, or one producing (model, dimensions) vectors
+    """
+    if model is not None:
+        provider = _spec_providers.get((model, dimensions))
+        if provider is None:
+            if model.startswith(LOCAL_MODEL_PREFIX):
+                provider = LocalEmbeddingProvider(dimensions or int(model[len(LOCAL_MODEL_PREFIX):]))
+            else:
+                provider = OpenAIEmbeddingProvider(model, dimensions)
+            _spec_providers[(model, dimensions)] = provider
+        return provider
+
+    global _provider
+    if _provider is None:
+        if _embedding_provider_name == "openai":
+            _provider = OpenAIEmbeddingProvider()
+        elif _embedding_provider_name == "local":
+            _provider = LocalEmbeddingProvider()
+        else:
+            raise ValueError(
+                f"Unknown EMBEDDING_PROVIDER '{_embedding_provider_name}' (expected 'openai' or 'local')"
+            )
+    return _provider
+
+
+def reset_embedding_provider():
+    """Forget the provider (for forked worker processes)."""
+    global _provider
+    _provider = None
+    _spec_providers.clear()
+
+
+async def get_embeddings(
+    texts: List[str],
+    tenant_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None
+) -> List[List[float]]:
+    """
+    Generate embeddings for a list of texts with the configured provider.
+
+    Args:
+        texts: List of text strings to embed
+        tenant_id: Tenant ID for logging (optional)
+        request_id: Request ID for logging (optional)
+        model: Model to embed with instead of the configured one (optional)
+        dimensions: Vector size for that model (optional)
+
+    Returns:
+        List of embedding vectors (each is a list of floats)
+
+    Raises:
+        ValueError: If the provider is misconfigured (e.g. OPENAI_API_KEY not set)
+    """
+    provider = get_embedding_provider(model, dimensions)
+    return await provider.embed(texts, tenant_id=tenant_id, request_id=request_id)
+
+
+async def get_embedding(
+    text: str,
+    tenant_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None
+) -> List[float]:
+    """
+    Generate a single embedding for a text.
+
+    Args:
+        text: Text string to embed
+        tenant_id: Tenant ID for logging (optional)
+        request_id: Request ID for logging (optional)
+        model: Model to embed with instead of the configured one (optional)
+        dimensions: Vector size for that model (optional)
+
+    Returns:
+        Embedding vector (list of floats)
+    """
+    embeddings = await get_embeddings(
+        [text], tenant_id=tenant_id, request_id=request_id, model=model, dimensions=dimensions
+    )
+    return embeddings[0]
@@ -0,0 +1,141 @@
+"""
+Fair scheduling of LLM capacity across tenants.
+
+At most LLM_MAX_CONCURRENCY chat completions run at once per instance: each
+worker process gets its share of the slots (see per_worker). When all slots
+are busy, callers wait in a queue per tenant, and freed slots go to
+tenants by smooth weighted round robin. A tenant with weight 3 gets three
+grants for every one of a weight-1 tenant while both are waiting, and a tenant
+with one request queued isn't stuck behind another tenant's hundred.
+"""
+import os
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from app.metrics import FAIR_QUEUE_WAITING, tenant_label
+from app.resilience import UpstreamUnavailableError
+from app.tenant_quota import get_tenant_limits, per_worker
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class FairScheduler:
+    """Concurrency slots granted across tenants by smooth weighted round robin."""
+
+    def __init__(self, name: str, capacity: int, queue_timeout: float):
+        self.name = name
+        self.capacity = capacity
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # Smooth WRR state: current weight per waiting tenant
+        self._current: Dict[str, int] = {}
+
+    def _next_tenant(self) -> str:
+        # nginx-style smooth weighted round robin over tenants with waiters
+        weights = {tenant: get_tenant_limits(tenant)["weight"] for tenant in self._queues}
+        total = sum(weights.values())
+        for tenant, weight in weights.items():
+            self._current[tenant] = self._current.get(tenant, 0) + weight
+        chosen = max(weights, key=lambda tenant: self._current[tenant])
+        self._current[chosen] -= total
+        return chosen
+
+    def _grant(self):
+        while self._queues and self.inflight < self.capacity:
+            tenant = self._next_tenant()
+            queue = self._queues[tenant]
+            waiter = queue.popleft()
+            if not queue:
+                del self._queues[tenant]
+                self._current.pop(tenant, None)
+            self._report_waiting(tenant)
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def _forget(self, tenant_id: str, waiter: asyncio.Future):
+        queue = self._queues.get(tenant_id)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[tenant_id]
+            self._current.pop(tenant_id, None)
+        self._report_waiting(tenant_id)
+
+    def _report_waiting(self, tenant_id: str):
+        # Tenants beyond the metrics label budget share the "other" series
+        label = tenant_label(tenant_id)
+        waiting = sum(len(queue) for tenant, queue in self._queues.items() if tenant_label(tenant) == label)
+        FAIR_QUEUE_WAITING.labels(label).set(waiting)
+
+    def _release(self):
+        self.inflight -= 1
+        self._grant()
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str):
+        """
+        Hold one LLM slot for the duration of the block.
+
+        Args:
+            tenant_id: Tenant the call is made for
+
+        Raises:
+            UpstreamUnavailableError: If no slot became free within LLM_QUEUE_TIMEOUT_SECONDS
+        """
+        if self.inflight < self.capacity and not self._queues:
+            self.inflight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            queue = self._queues.setdefault(tenant_id, deque())
+            queue.append(waiter)
+            self._report_waiting(tenant_id)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    waiter.cancel()
+                    self._forget(tenant_id, waiter)
+                if isinstance(e, asyncio.CancelledError):
+                    if granted:
+                        self._release()
+                    raise
+                if not granted:
+                    raise UpstreamUnavailableError(
+                        self.name,
+                        f"{self.name} is saturated (waited {self.queue_timeout:g}s for a slot)",
+                        retry_after=self.queue_timeout
+                    )
+                # Granted just as the timeout fired: use the slot
+        try:
+            yield
+        finally:
+            self._release()
+
+
+_llm_scheduler: Optional[FairScheduler] = None
+
+
+def get_llm_scheduler() -> FairScheduler:
+    """Get or create this process's LLM scheduler (sized on first use, after fork)."""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = FairScheduler("openai_chat", max(1, per_worker(LLM_MAX_CONCURRENCY)), LLM_QUEUE_TIMEOUT_SECONDS)
+    return _llm_scheduler
+
+
+def reset_llm_scheduler():
+    """Drop the scheduler so the next call sizes a new one (e.g. after fork)."""
+    global _llm_scheduler
+    _llm_scheduler = None
+
+
+def llm_slot(tenant_id: str):
+    """Fair-scheduled slot for an LLM call (async context manager)."""
+    return get_llm_scheduler().slot(tenant_id)
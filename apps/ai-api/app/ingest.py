@@ -6,9 +6,11 @@ import uuid
 from typing import List, Tuple
 from sqlalchemy import text
 from app.database import get_engine
-from app.qdrant_client import get_qdrant_client, ensure_collection_exists
-from app.openai_client import get_embeddings
+from app.tenant_router import read_target, upsert_points
+from app.embeddings import get_embeddings
 from app.auth import get_default_tenant_id
+from app.chunk_storage import chunk_spans, chunk_payload, stored_content
+from app.metrics import stage_timer
 
 # Environment defaults
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
@@ -51,36 +53,54 @@ def chunk_text(content: str, chunk_size: int = None, overlap: int = None) -> Lis
     return chunks
 
 
+def make_chunk_id(document_id: str, chunk_index: int) -> str:
+    """
+    Deterministic chunk ID (also used as the Qdrant point ID).
+    
+    Args:
+        document_id: Parent document ID
+        chunk_index: Chunk position within the document
+        
+    Returns:
+        UUID string derived from (document_id, chunk_index)
+    """
+    return str(uuid.uuid5(uuid.UUID(document_id), str(chunk_index)))
+
+
 async def ingest_document(
     source: str,
     title: str,
     content: str,
-    tenant_id: str | None = None
+    tenant_id: str | None = None,
+    document_id: str | None = None
 ) -> Tuple[str, int]:
     """
     Ingest a document: store in Postgres, chunk, embed, and store in Qdrant.
+    Idempotent for a given document_id: chunk IDs are derived from it and
+    inserts skip existing rows, so a failed ingest can simply be retried.
     
     Args:
         source: Document source (e.g., "policy", "menu", "manual")
         title: Document title
         content: Document content
         tenant_id: Tenant ID (defaults to DEFAULT_TENANT_ID)
+        document_id: Document ID to use (defaults to a new random UUID)
         
     Returns:
         Tuple of (document_id, num_chunks)
         
     Raises:
-        ValueError: If OPENAI_API_KEY is not set
+        ValueError: If the embedding provider is misconfigured (e.g. OPENAI_API_KEY not set)
     """
     engine = get_engine()
-    qdrant = get_qdrant_client()
     
     # Use provided tenant_id or default
     if tenant_id is None:
         tenant_id = get_default_tenant_id()
     
     # Generate document ID
-    document_id = str(uuid.uuid4())
+    if document_id is None:
+        document_id = str(uuid.uuid4())
     
     # Insert document into Postgres
     async with engine.begin() as conn:
@@ -88,6 +108,7 @@ async def ingest_document(
             text("""
                 INSERT INTO documents (id, tenant_id, source, title, content)
                 VALUES (:id, :tenant_id, :source, :title, :content)
+                ON CONFLICT (id) DO NOTHING
             """),
             {
                 "id": document_id,
@@ -99,62 +120,53 @@ async def ingest_document(
         )
     
     # Chunk the content
-    chunks = chunk_text(content)
+    with stage_timer("ingest_chunk"):
+        chunks = chunk_text(content)
+        spans = chunk_spans(content, chunks)
     
     # Generate chunk IDs and prepare for Postgres insertion
     chunk_records = []
-    for idx, chunk_content in enumerate(chunks):
-        chunk_id = str(uuid.uuid4())
+    for idx, (chunk_content, span) in enumerate(zip(chunks, spans)):
+        chunk_id = make_chunk_id(document_id, idx)
         chunk_records.append({
             "id": chunk_id,
             "document_id": document_id,
             "chunk_index": idx,
-            "content": chunk_content
+            "content": stored_content(chunk_content, span),
+            "start_offset": span[0] if span else None,
+            "end_offset": span[1] if span else None
         })
     
-    # Insert chunks into Postgres
+    # Insert chunks into Postgres (single executemany round trip)
     async with engine.begin() as conn:
-        for record in chunk_records:
-            await conn.execute(
-                text("""
-                    INSERT INTO chunks (id, document_id, tenant_id, chunk_index, content)
-                    VALUES (:id, :document_id, :tenant_id, :chunk_index, :content)
-                """),
-                {
-                    **record,
-                    "tenant_id": tenant_id
-                }
-            )
-    
-    # Generate embeddings for all chunks
-    chunk_texts = [record["content"] for record in chunk_records]
-    embeddings = await get_embeddings(chunk_texts)
-    
-    # Ensure Qdrant collection exists (get vector size from first embedding)
-    vector_size = len(embeddings[0]) if embeddings else 1536  # fallback to default
-    await ensure_collection_exists(vector_size)
-    
-    # Prepare Qdrant points
-    points = []
-    for i, record in enumerate(chunk_records):
-        points.append({
-            "id": record["id"],  # Use chunk UUID as Qdrant point ID
-            "vector": embeddings[i],
-            "payload": {
-                "document_id": document_id,
-                "chunk_id": record["id"],
-                "tenant_id": tenant_id,
-                "chunk_index": record["chunk_index"],
-                "text": record["content"],
-                "title": title,
-                "source": source
-            }
-        })
+        await conn.execute(
+            text("""
+                INSERT INTO chunks (id, document_id, tenant_id, chunk_index, content, start_offset, end_offset)
+                VALUES (:id, :document_id, :tenant_id, :chunk_index, :content, :start_offset, :end_offset)
+                ON CONFLICT (id) DO NOTHING
+            """),
+            [{**record, "tenant_id": tenant_id} for record in chunk_records]
+        )
+    
+    # Generate embeddings for all chunks with the model of the collection serving the tenant
+    chunk_texts = chunks
+    target = await read_target(tenant_id)
+    with stage_timer("ingest_embed"):
+        embeddings = await get_embeddings(
+            chunk_texts, tenant_id=tenant_id, model=target.model, dimensions=target.dimensions
+        )
     
-    # Upsert into Qdrant
-    qdrant.upsert(
-        collection_name="restaurant_knowledge",
-        points=points
-    )
+    # Prepare Qdrant point payloads (chunk UUIDs are the point IDs)
+    payloads = [
+        chunk_payload(document_id, record["id"], tenant_id, record["chunk_index"], chunk_content, title, source)
+        for record, chunk_content in zip(chunk_records, chunks)
+    ]
+    
+    # Upsert into the tenant's Qdrant collection(s) (idempotent: point IDs are deterministic)
+    with stage_timer("ingest_upsert"):
+        await upsert_points(
+            tenant_id, [record["id"] for record in chunk_records], payloads, chunk_texts,
+            vectors=embeddings, model=target.model
+        )
     
     return document_id, len(chunks)
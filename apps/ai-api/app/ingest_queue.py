@@ -0,0 +1,302 @@
+"""
+Asynchronous ingestion: a Postgres-backed job queue drained by a bounded
+in-process worker pool.
+
+Jobs live in the ingest_jobs table, so queued work survives restarts. Workers
+claim jobs with FOR UPDATE SKIP LOCKED and hold a lease (locked_until); a job
+whose worker died is picked up again once its lease expires, unless it has
+used up INGEST_JOB_MAX_ATTEMPTS (a job that keeps crashing its worker is
+failed instead). Transient embedding/Qdrant/Postgres failures are retried with
+exponential backoff.
+"""
+import os
+import uuid
+import random
+import asyncio
+import logging
+from typing import List, Optional
+from sqlalchemy import text
+from app.database import get_engine
+from app.ingest import ingest_document
+from app.resilience import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKER_CONCURRENCY = int(os.getenv("INGEST_WORKER_CONCURRENCY", "2"))
+INGEST_JOB_MAX_ATTEMPTS = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "5"))
+INGEST_JOB_RETRY_BASE_SECONDS = float(os.getenv("INGEST_JOB_RETRY_BASE_SECONDS", "2"))
+INGEST_JOB_RETRY_MAX_SECONDS = float(os.getenv("INGEST_JOB_RETRY_MAX_SECONDS", "300"))
+INGEST_JOB_LEASE_SECONDS = int(os.getenv("INGEST_JOB_LEASE_SECONDS", "300"))
+INGEST_JOB_POLL_SECONDS = float(os.getenv("INGEST_JOB_POLL_SECONDS", "2"))
+
+_workers: List[asyncio.Task] = []
+_wakeup = asyncio.Event()
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff with full jitter for the given attempt count."""
+    delay = min(INGEST_JOB_RETRY_MAX_SECONDS, INGEST_JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return random.uniform(delay / 2, delay)
+
+
+async def enqueue_ingest_job(source: str, title: str, content: str, tenant_id: str) -> str:
+    """
+    Queue a document for asynchronous ingestion.
+
+    Args:
+        source: Document source
+        title: Document title
+        content: Document content
+        tenant_id: Tenant ID
+
+    Returns:
+        Job ID (also used as the document ID once ingested)
+    """
+    job_id = str(uuid.uuid4())
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO ingest_jobs (id, tenant_id, source, title, content)
+                VALUES (:id, :tenant_id, :source, :title, :content)
+            """),
+            {
+                "id": job_id,
+                "tenant_id": tenant_id,
+                "source": source,
+                "title": title,
+                "content": content
+            }
+        )
+
+    # Wake an idle local worker instead of waiting for the next poll
+    _wakeup.set()
+    return job_id
+
+
+async def get_ingest_job(job_id: str, tenant_id: str) -> Optional[dict]:
+    """
+    Get an ingestion job's status.
+
+    Args:
+        job_id: Job ID
+        tenant_id: Tenant ID (jobs of other tenants are not visible)
+
+    Returns:
+        Job status dict, or None if not found
+    """
+    engine = get_engine()
+
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("""
+                SELECT id, tenant_id, status, attempts, next_attempt_at, document_id,
+                       chunks, error, created_at, updated_at
+                FROM ingest_jobs
+                WHERE id = :job_id AND tenant_id = :tenant_id
+            """),
+            {"job_id": job_id, "tenant_id": tenant_id}
+        )
+        row = result.fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "job_id": str(row[0]),
+        "tenant_id": row[1],
+        "status": row[2],
+        "attempts": row[3],
+        "next_attempt_at": row[4].isoformat() if row[2] == "queued" and row[4] else None,
+        "document_id": str(row[5]) if row[5] else None,
+        "chunks": row[6],
+        "error": row[7],
+        "created_at": row[8].isoformat() if row[8] else None,
+        "updated_at": row[9].isoformat() if row[9] else None
+    }
+
+
+async def _claim_job() -> Optional[dict]:
+    """
+    Claim the next runnable job (queued and due, or running with an expired
+    lease and attempts left). Jobs whose lease expired on their last attempt
+    are marked failed.
+    """
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        abandoned = await conn.execute(
+            text("""
+                UPDATE ingest_jobs
+                SET status = 'failed',
+                    error = COALESCE(error, 'Worker lost while processing the job'),
+                    locked_until = NULL,
+                    updated_at = NOW()
+                WHERE id IN (
+                    SELECT id FROM ingest_jobs
+                    WHERE status = 'running' AND locked_until < NOW() AND attempts >= :max_attempts
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, attempts
+            """),
+            {"max_attempts": INGEST_JOB_MAX_ATTEMPTS}
+        )
+        for job_id, attempts in abandoned.fetchall():
+            logger.error(
+                "ingest_job_failed",
+                extra={"job_id": str(job_id), "attempts": attempts, "error": "lease expired on the last attempt"}
+            )
+
+        result = await conn.execute(
+            text("""
+                UPDATE ingest_jobs
+                SET status = 'running',
+                    attempts = attempts + 1,
+                    locked_until = NOW() + make_interval(secs => :lease_seconds),
+                    updated_at = NOW()
+                WHERE id = (
+                    SELECT id FROM ingest_jobs
+                    WHERE (status = 'queued' AND next_attempt_at <= NOW())
+                       OR (status = 'running' AND locked_until < NOW() AND attempts < :max_attempts)
+                    ORDER BY next_attempt_at, created_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, tenant_id, source, title, content, attempts
+            """),
+            {"lease_seconds": INGEST_JOB_LEASE_SECONDS, "max_attempts": INGEST_JOB_MAX_ATTEMPTS}
+        )
+        row = result.fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "id": str(row[0]),
+        "tenant_id": row[1],
+        "source": row[2],
+        "title": row[3],
+        "content": row[4],
+        "attempts": row[5]
+    }
+
+
+async def _finish_job(job_id: str, **fields):
+    engine = get_engine()
+    assignments = ", ".join(f"{name} = :{name}" for name in fields)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(f"""
+                UPDATE ingest_jobs
+                SET {assignments}, locked_until = NULL, updated_at = NOW()
+                WHERE id = :job_id
+            """),
+            {"job_id": job_id, **fields}
+        )
+
+
+async def _process_job(job: dict):
+    try:
+        # The job ID doubles as the document ID, which makes retries idempotent
+        document_id, num_chunks = await ingest_document(
+            source=job["source"],
+            title=job["title"],
+            content=job["content"],
+            tenant_id=job["tenant_id"],
+            document_id=job["id"]
+        )
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if is_transient_error(e) and job["attempts"] < INGEST_JOB_MAX_ATTEMPTS:
+            delay = retry_delay_seconds(job["attempts"])
+            logger.warning(
+                "ingest_job_retry",
+                extra={"job_id": job["id"], "attempts": job["attempts"], "delay_seconds": delay, "error": error}
+            )
+            await _schedule_retry(job["id"], error, delay)
+        else:
+            logger.error("ingest_job_failed", extra={"job_id": job["id"], "attempts": job["attempts"], "error": error})
+            await _finish_job(job["id"], status="failed", error=error)
+        return
+
+    # Content now lives in documents/chunks; drop the queued copy
+    await _finish_job(
+        job["id"],
+        status="succeeded",
+        document_id=document_id,
+        chunks=num_chunks,
+        error=None,
+        content=""
+    )
+
+
+async def _schedule_retry(job_id: str, error: str, delay_seconds: float):
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                UPDATE ingest_jobs
+                SET status = 'queued',
+                    error = :error,
+                    next_attempt_at = NOW() + make_interval(secs => :delay_seconds),
+                    locked_until = NULL,
+                    updated_at = NOW()
+                WHERE id = :job_id
+            """),
+            {"job_id": job_id, "error": error, "delay_seconds": delay_seconds}
+        )
+
+
+async def _worker_loop(worker_id: int):
+    while True:
+        try:
+            job = await _claim_job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("ingest_worker_claim_failed", extra={"worker_id": worker_id, "error": str(e)})
+            job = None
+
+        if job is None:
+            # Idle: sleep until new work is enqueued locally or the poll interval passes
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=INGEST_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await _process_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Couldn't record the outcome; the lease expiry will hand the job out again
+            logger.warning("ingest_worker_update_failed", extra={"job_id": job["id"], "error": str(e)})
+
+
+def start_ingest_workers(concurrency: int = INGEST_WORKER_CONCURRENCY):
+    """
+    Start the ingestion worker pool (no-op if already running).
+
+    Args:
+        concurrency: Number of concurrent worker tasks
+    """
+    if _workers:
+        return
+    for worker_id in range(concurrency):
+        _workers.append(asyncio.create_task(_worker_loop(worker_id)))
+
+
+async def stop_ingest_workers():
+    """
+    Stop the worker pool. Jobs being processed are cancelled; their lease
+    expires and another worker (or the next process) retries them.
+    """
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
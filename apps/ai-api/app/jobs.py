@@ -0,0 +1,247 @@
+"""
+Background jobs for admin operations.
+
+Jobs run as asyncio tasks in the worker that started them; their status and
+progress live in the admin_jobs table, so GET /admin/jobs/{job_id} answers from
+any worker or replica. The running worker saves progress and renews a lease
+(locked_until) every ADMIN_JOB_HEARTBEAT_SECONDS; an unfinished job whose lease
+expired (its worker died) is reported as failed.
+
+Exclusive jobs (the default) run at most once per (kind, tenant): starting one
+while another is unfinished returns the existing job, whichever worker runs it.
+"""
+import os
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import text
+from app.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+ADMIN_JOB_HEARTBEAT_SECONDS = float(os.getenv("ADMIN_JOB_HEARTBEAT_SECONDS", "5"))
+ADMIN_JOB_LEASE_SECONDS = int(os.getenv("ADMIN_JOB_LEASE_SECONDS", "60"))
+# Finished jobs older than this are deleted when new jobs start
+ADMIN_JOB_RETENTION_HOURS = int(os.getenv("ADMIN_JOB_RETENTION_HOURS", "168"))
+
+_JOB_COLUMNS = "id, kind, tenant_id, status, progress, result, error, created_at, finished_at"
+
+
+class Job:
+    """Status and progress of a background job."""
+
+    def __init__(self, kind: str, tenant_id: str, job_id: Optional[str] = None):
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.tenant_id = tenant_id
+        self.status = "pending"
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        """Build a Job from an admin_jobs row (columns as in _JOB_COLUMNS)."""
+        job = cls(row[1], row[2], job_id=str(row[0]))
+        job.status = row[3]
+        job.progress = row[4] or {}
+        job.result = row[5]
+        job.error = row[6]
+        job.created_at = row[7]
+        job.finished_at = row[8]
+        return job
+
+    def update(self, **progress):
+        """Merge progress counters (e.g. deleted_postgres_chunks=500); saved on the next heartbeat."""
+        self.progress.update(progress)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "tenant_id": self.tenant_id,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# Jobs running in this process (fresher progress than the table between heartbeats)
+_running: Dict[str, Job] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _fail_abandoned_sql(where: str) -> str:
+    return f"""
+        UPDATE admin_jobs
+        SET status = 'failed',
+            error = COALESCE(error, 'Worker lost while running the job'),
+            locked_until = NULL,
+            finished_at = NOW()
+        WHERE finished_at IS NULL AND locked_until < NOW() AND {where}
+    """
+
+
+async def _save(job: Job):
+    """Write the job's status/progress and renew its lease (cleared once finished)."""
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                UPDATE admin_jobs
+                SET status = :status,
+                    progress = CAST(:progress AS JSONB),
+                    result = CAST(:result AS JSONB),
+                    error = :error,
+                    finished_at = :finished_at,
+                    locked_until = CASE WHEN CAST(:finished_at AS TIMESTAMPTZ) IS NULL
+                        THEN NOW() + make_interval(secs => :lease) END
+                WHERE id = :id
+            """),
+            {
+                "id": job.id,
+                "status": job.status,
+                "progress": json.dumps(job.progress, default=str),
+                "result": json.dumps(job.result, default=str) if job.result is not None else None,
+                "error": job.error,
+                "finished_at": job.finished_at,
+                "lease": ADMIN_JOB_LEASE_SECONDS,
+            }
+        )
+
+
+async def _heartbeat(job: Job):
+    while True:
+        try:
+            await _save(job)
+        except Exception as e:
+            # A missed heartbeat only delays progress; the lease covers a few of them
+            logger.warning("admin_job_heartbeat_failed", extra={"job_id": job.id, "error": str(e)})
+        await asyncio.sleep(ADMIN_JOB_HEARTBEAT_SECONDS)
+
+
+async def _run(job: Job, func: Callable[[Job], Awaitable[Dict[str, Any]]]):
+    job.status = "running"
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    try:
+        job.result = await func(job)
+        job.status = "succeeded"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        logger.exception("background job failed", extra={"job_id": job.id, "kind": job.kind})
+    finally:
+        heartbeat.cancel()
+        if job.status == "running":
+            # Cancelled (worker shutting down)
+            job.status = "failed"
+            job.error = "Job interrupted"
+        job.finished_at = datetime.now(timezone.utc)
+        try:
+            await _save(job)
+        except Exception as e:
+            logger.error("admin_job_save_failed", extra={"job_id": job.id, "error": str(e)})
+        _running.pop(job.id, None)
+        _tasks.pop(job.id, None)
+
+
+async def start_job(
+    kind: str,
+    tenant_id: str,
+    func: Callable[[Job], Awaitable[Dict[str, Any]]],
+    exclusive: bool = True
+) -> Job:
+    """
+    Start a background job in this process.
+
+    Args:
+        kind: Job type (e.g., "tenant_reset")
+        tenant_id: Tenant the job operates on ("*" for instance-wide jobs)
+        func: Coroutine function receiving the Job (for progress updates) and returning the result dict
+        exclusive: Return the unfinished job of the same kind for the tenant,
+            if any (on any worker), instead of starting another one
+
+    Returns:
+        The created (or already running) Job
+    """
+    job = Job(kind, tenant_id)
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                DELETE FROM admin_jobs
+                WHERE finished_at < NOW() - make_interval(hours => :retention_hours)
+            """),
+            {"retention_hours": ADMIN_JOB_RETENTION_HOURS}
+        )
+        if exclusive:
+            # Serializes starts of the same (kind, tenant) across workers until commit
+            await conn.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                {"key": f"admin_job:{kind}:{tenant_id}"}
+            )
+            await conn.execute(
+                text(_fail_abandoned_sql("kind = :kind AND tenant_id = :tenant_id")),
+                {"kind": kind, "tenant_id": tenant_id}
+            )
+            result = await conn.execute(
+                text(f"""
+                    SELECT {_JOB_COLUMNS} FROM admin_jobs
+                    WHERE kind = :kind AND tenant_id = :tenant_id AND finished_at IS NULL
+                    ORDER BY created_at
+                    LIMIT 1
+                """),
+                {"kind": kind, "tenant_id": tenant_id}
+            )
+            row = result.fetchone()
+            if row:
+                return _running.get(str(row[0])) or Job.from_row(row)
+
+        await conn.execute(
+            text("""
+                INSERT INTO admin_jobs (id, kind, tenant_id, status, created_at, locked_until)
+                VALUES (:id, :kind, :tenant_id, :status, :created_at, NOW() + make_interval(secs => :lease))
+            """),
+            {
+                "id": job.id,
+                "kind": kind,
+                "tenant_id": tenant_id,
+                "status": job.status,
+                "created_at": job.created_at,
+                "lease": ADMIN_JOB_LEASE_SECONDS,
+            }
+        )
+
+    _running[job.id] = job
+    _tasks[job.id] = asyncio.create_task(_run(job, func))
+    return job
+
+
+async def get_job(job_id: str) -> Optional[Job]:
+    """Get a job by ID (None if unknown or past retention)."""
+    if job_id in _running:
+        return _running[job_id]
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text(_fail_abandoned_sql("id = :id")), {"id": job_id})
+        result = await conn.execute(
+            text(f"SELECT {_JOB_COLUMNS} FROM admin_jobs WHERE id = :id"),
+            {"id": job_id}
+        )
+        row = result.fetchone()
+
+    return Job.from_row(row) if row else None
@@ -0,0 +1,85 @@
+"""
+Process lifecycle: connection warmup at startup, clean client shutdown on
+SIGTERM (rolling deploys).
+
+Startup warms every pool the first requests would otherwise pay TCP/TLS setup
+for: WARMUP_POSTGRES_CONNECTIONS connections to the primary (and the read
+replica), the Qdrant HTTP connection plus the shared collection's info, and
+the OpenAI HTTPS connection. Warmup failures are logged, never fatal.
+
+Draining is the server's job: on SIGTERM uvicorn closes its listeners, closes
+idle keep-alive connections and waits for in-flight requests before running
+the lifespan shutdown, which then stops the ingest workers and closes the
+Postgres, Qdrant and OpenAI clients. Under gunicorn that wait is bounded by
+graceful_timeout (see gunicorn.conf.py); a worker still busy after it is
+killed without closing its clients.
+"""
+import os
+import time
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.database import get_engine, get_read_engine, close_engines
+from app.openai_client import close_openai_client, get_openai_client
+from app.openai_chat import get_chat_model
+from app.qdrant_client import get_qdrant_client, close_qdrant_client
+
+logger = logging.getLogger(__name__)
+
+WARMUP_POSTGRES_CONNECTIONS = int(os.getenv("WARMUP_POSTGRES_CONNECTIONS", "2"))
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+
+
+async def _warm_postgres(get_pool_engine):
+    engine = get_pool_engine()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently, so the pool ends up with that many open connections
+    await asyncio.gather(*(ping() for _ in range(max(1, WARMUP_POSTGRES_CONNECTIONS))))
+
+
+async def _warm_qdrant():
+    # Collection listing: opens the connection without knowing which physical
+    # collection is active (see app/reembed.py)
+    qdrant = get_qdrant_client()
+    await asyncio.to_thread(qdrant.get_collections)
+
+
+async def _warm_openai():
+    client = get_openai_client()
+    # Metadata lookup: opens the HTTPS connection without spending tokens
+    await client.models.retrieve(get_chat_model())
+
+
+async def warm_up():
+    """Open and pre-warm the connection pools (best effort, bounded by WARMUP_TIMEOUT_SECONDS)."""
+    steps = {"postgres": _warm_postgres(get_engine), "qdrant": _warm_qdrant()}
+    if os.getenv("OPENAI_API_KEY"):
+        steps["openai"] = _warm_openai()
+    if get_read_engine() is not None:
+        steps["postgres_replica"] = _warm_postgres(get_read_engine)
+
+    async def run(name, step):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(step, timeout=WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning("warmup_failed", extra={"target": name, "error": str(e) or type(e).__name__})
+        else:
+            logger.info("warmup_done", extra={"target": name, "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    await asyncio.gather(*(run(name, step) for name, step in steps.items()))
+
+
+async def close_clients():
+    """Close the Postgres pools and the Qdrant and OpenAI clients."""
+    for name, close in (("postgres", close_engines), ("qdrant", close_qdrant_client), ("openai", close_openai_client)):
+        try:
+            await close()
+        except Exception as e:
+            logger.warning("client_close_failed", extra={"client": name, "error": str(e)})
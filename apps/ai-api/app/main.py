@@ -1,25 +1,91 @@
 import os
+import math
+import time
+import json
+import logging
+import tempfile
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, status, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from app.database import check_postgres, get_engine
-from app.qdrant_client import check_qdrant, ensure_collection_exists, COLLECTION_NAME, get_qdrant_client, delete_points_by_tenant
-from app.schema import ensure_schema_exists, delete_tenant_data
+from app.database import check_postgres, check_replica, get_engine, get_read_engine, read_connection
+from app.qdrant_client import check_qdrant, get_qdrant_client, COLLECTION_NAME
+from app.tenant_router import (
+    read_target, read_collection, delete_points, ensure_shared_collection, get_placement, migrate_tenant, PLACEMENTS
+)
+from app.reembed import reembed_collection, list_logical_collections
+from app.schema import ensure_schema_exists
+from app.tenant_reset import reset_tenant
+from app.reconcile import reconcile_tenant
+from app.chunk_storage import CHUNK_CONTENT_SQL, compact_chunk_storage
+from app.chunk_cache import get_chunk_cache
+from app.jobs import start_job, get_job
 from app.ingest import ingest_document
-from app.openai_client import get_embedding
+from app.ingest_queue import enqueue_ingest_job, get_ingest_job, start_ingest_workers, stop_ingest_workers
+from app.embeddings import get_embedding
+from app.resilience import call, run_blocking, circuit_states, UpstreamUnavailableError
+from app.tenant_quota import check_tenant_quota, get_tenant_usage, QuotaExceededError
 from app.openai_chat import generate_answer
+from app.context import assemble_contexts, ContextChunk
+from app.lifecycle import warm_up, close_clients
+from app.single_flight import SingleFlight
 from app.auth import verify_api_key, get_default_tenant_id
-from app.seed import get_seed_documents
+from app.seed_snapshot import seed_tenant
+from app.tenant_transfer import export_tenant, import_tenant_file
+from app.bundle import read_header as read_bundle_header
 from app.rate_limit import RateLimitMiddleware
+from app.admission import AdmissionControlMiddleware
 from app.request_id import RequestIDMiddleware
 from app.admin_ip import AdminIPAllowlistMiddleware
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+from app.metrics import MetricsMiddleware, stage_timer, render_metrics, CONTENT_TYPE_LATEST, CHAT_CONTEXT_TOKENS
+from app.server_timing import ServerTimingMiddleware, get_request_timings, record_timing
+from app.pagination import encode_cursor, decode_cursor
 from sqlalchemy import text
 
-app = FastAPI(title="AI API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: initialize schema and Qdrant collection, warm connection pools,
+    start ingest workers. Shutdown (SIGTERM, after the server has finished
+    in-flight requests): stop workers, close Postgres, Qdrant and OpenAI clients.
+    """
+    try:
+        # Apply pending Postgres schema migrations
+        await ensure_schema_exists()
+        
+        # Ensure the shared Qdrant collection exists
+        # Vector size comes from its recorded version, else from the configured
+        # embedding provider (known model sizes for OpenAI, configured size for the local embedder)
+        try:
+            await ensure_shared_collection()
+        except ValueError:
+            # OPENAI_API_KEY not set - collection will be created on first ingest
+            # This is acceptable for startup
+            pass
+    except Exception as e:
+        # Log error but don't fail startup
+        logger.warning("startup_initialization_failed", extra={"error": str(e)})
+    
+    # Open pools before traffic arrives, so the first requests don't pay connection setup
+    await warm_up()
+    
+    # Start async ingestion workers (jobs are persisted, so this also resumes queued work)
+    start_ingest_workers()
+    
+    yield
+    
+    # Jobs being processed are cancelled; their lease expires and they are retried elsewhere
+    await stop_ingest_workers()
+    await close_clients()
+
+
+app = FastAPI(title="AI API", version="1.0.0", lifespan=lifespan)
 
 # Environment defaults
 MIN_SCORE_DEFAULT = float(os.getenv("MIN_SCORE_DEFAULT", "0.45"))
@@ -27,11 +93,25 @@ MAX_CITATIONS_DEFAULT = int(os.getenv("MAX_CITATIONS_DEFAULT", "3"))
 TOP_K_DEFAULT = int(os.getenv("TOP_K_DEFAULT", "5"))
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "120"))
+DOCUMENTS_PAGE_SIZE = int(os.getenv("DOCUMENTS_PAGE_SIZE", "100"))
+DOCUMENTS_MAX_PAGE_SIZE = int(os.getenv("DOCUMENTS_MAX_PAGE_SIZE", "1000"))
+DOCUMENTS_STREAM_BATCH_SIZE = int(os.getenv("DOCUMENTS_STREAM_BATCH_SIZE", "500"))
+CONTEXT_NEIGHBOR_WINDOW = int(os.getenv("CONTEXT_NEIGHBOR_WINDOW", "0"))
+CONTEXT_NEIGHBOR_WINDOW_MAX = int(os.getenv("CONTEXT_NEIGHBOR_WINDOW_MAX", "3"))
+# Identical concurrent /chat requests share one embed + search + LLM call
+CHAT_SINGLE_FLIGHT = os.getenv("CHAT_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+
+_chat_flights = SingleFlight("chat")
 
 # Add middlewares (order matters - request_id first, then rate limit, then admin IP)
+app.add_middleware(ServerTimingMiddleware)
+# Admission control sits inside the rate limiter, so rate-limited requests never take a slot
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(RateLimitMiddleware)
 app.add_middleware(AdminIPAllowlistMiddleware)
+# Metrics wraps the guards above so rejected requests are counted too
+app.add_middleware(MetricsMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -45,6 +125,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing", "X-Next-Cursor"],
 )
 
 
@@ -54,6 +135,7 @@ class IngestRequest(BaseModel):
     title: str
     content: str
     tenant_id: Optional[str] = None
+    background: bool = False  # Queue for async ingestion, return 202 with job_id
 
 
 class IngestResponse(BaseModel):
@@ -62,11 +144,18 @@ class IngestResponse(BaseModel):
     qdrant_collection: str
 
 
+class IngestJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    tenant_id: str
+
+
 class SearchRequest(BaseModel):
     query: str
     top_k: Optional[int] = None
     min_score: Optional[float] = None
     tenant_id: Optional[str] = None
+    debug: bool = False  # Include per-stage timings in the response
 
 
 class SearchResult(BaseModel):
@@ -82,6 +171,7 @@ class SearchResult(BaseModel):
 class SearchResponse(BaseModel):
     query: str
     results: List[SearchResult]
+    timings: Optional[Dict[str, float]] = None  # Stage durations in ms (debug only)
 
 
 class ChatRequest(BaseModel):
@@ -89,7 +179,9 @@ class ChatRequest(BaseModel):
     top_k: Optional[int] = None
     min_score: Optional[float] = None
     max_citations: Optional[int] = None
+    neighbor_window: Optional[int] = None  # Also send chunks within this many positions of each hit
     tenant_id: Optional[str] = None
+    debug: bool = False  # Include per-stage timings in the response
 
 
 class Citation(BaseModel):
@@ -106,30 +198,7 @@ class ChatResponse(BaseModel):
     message: str
     answer: str
     citations: List[Citation]
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize schema and Qdrant collection on startup."""
-    try:
-        # Ensure Postgres schema exists
-        await ensure_schema_exists()
-        
-        # Ensure Qdrant collection exists
-        # We need to get the vector size from the embedding model
-        # For text-embedding-3-small, it's 1536
-        # We'll create a test embedding to get the actual size
-        try:
-            test_embedding = await get_embedding("test")
-            vector_size = len(test_embedding)
-            await ensure_collection_exists(vector_size)
-        except ValueError:
-            # OPENAI_API_KEY not set - collection will be created on first ingest
-            # This is acceptable for startup
-            pass
-    except Exception as e:
-        # Log error but don't fail startup
-        print(f"Warning: Startup initialization error: {e}")
+    timings: Optional[Dict[str, float]] = None  # Stage durations in ms (debug only)
 
 
 @app.get("/health")
@@ -143,12 +212,22 @@ async def ready():
     Readiness check endpoint.
     Verifies connectivity to Postgres and Qdrant.
     Returns 200 if both are healthy, 503 if either fails.
+    Circuit breaker states of upstream dependencies are reported under
+    "circuits"; an open OpenAI circuit alone doesn't make the instance unready
+    (every replica shares the same upstream, so failing over wouldn't help).
+    With DATABASE_READ_URL, the read replica's state and lag are reported
+    under "postgres_replica".
     """
     postgres_ok, postgres_error = await check_postgres()
     qdrant_ok, qdrant_error = check_qdrant()
+    circuits = circuit_states()
 
     if postgres_ok and qdrant_ok:
-        return {"status": "ready", "postgres": "ok", "qdrant": "ok"}
+        body = {"status": "ready", "postgres": "ok", "qdrant": "ok", "circuits": circuits}
+        if get_read_engine() is not None:
+            # Reads fall back to the primary, so an unusable replica doesn't make the instance unready
+            body["postgres_replica"] = await check_replica()
+        return body
 
     errors = {}
     if not postgres_ok:
@@ -160,7 +239,8 @@ async def ready():
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={
             "status": "not ready",
-            "errors": errors
+            "errors": errors,
+            "circuits": circuits
         }
     )
 
@@ -170,14 +250,45 @@ async def root():
     return {"name": "ai-api", "version": "1.0.0"}
 
 
-@app.post("/ingest", response_model=IngestResponse, status_code=status.HTTP_201_CREATED)
-async def ingest(request: IngestRequest, api_key: str = Depends(verify_api_key)):
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics endpoint (text exposition format).
+    Restricted by ADMIN_IP_ALLOWLIST when configured.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post(
+    "/ingest",
+    response_model=IngestResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": IngestJobAccepted}}
+)
+async def ingest(request: IngestRequest, http_request: Request, api_key: str = Depends(verify_api_key)):
     """
     Ingest a document: store in Postgres, chunk, embed, and store in Qdrant.
     Requires X-API-Key header.
+    With background=true the document is queued and 202 is returned with a
+    job_id; poll GET /ingest/jobs/{job_id}.
     """
     try:
         tenant_id = request.tenant_id or get_default_tenant_id()
+        http_request.state.tenant_id = tenant_id
+        check_tenant_quota(tenant_id)
+        
+        if request.background:
+            job_id = await enqueue_ingest_job(
+                source=request.source,
+                title=request.title,
+                content=request.content,
+                tenant_id=tenant_id
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=IngestJobAccepted(job_id=job_id, status="queued", tenant_id=tenant_id).model_dump()
+            )
+        
         document_id, num_chunks = await ingest_document(
             source=request.source,
             title=request.title,
@@ -188,8 +299,12 @@ async def ingest(request: IngestRequest, api_key: str = Depends(verify_api_key))
         return IngestResponse(
             document_id=document_id,
             chunks=num_chunks,
-            qdrant_collection=COLLECTION_NAME
+            qdrant_collection=await read_collection(tenant_id)
         )
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
+    except UpstreamUnavailableError as e:
+        raise _upstream_unavailable(e)
     except ValueError as e:
         # OPENAI_API_KEY missing or other configuration error
         raise HTTPException(
@@ -203,6 +318,163 @@ async def ingest(request: IngestRequest, api_key: str = Depends(verify_api_key))
         )
 
 
+@app.get("/ingest/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+async def ingest_job_status(job_id: str, tenant_id: Optional[str] = Query(None)):
+    """
+    Get the status of an async ingestion job.
+    Requires X-API-Key header.
+    """
+    try:
+        tenant_id = tenant_id or get_default_tenant_id()
+        job = await get_ingest_job(job_id, tenant_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch ingest job: {str(e)}"
+        )
+    
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingest job not found"
+        )
+    return job
+
+
+async def _search_points(query_embedding: List[float], collection_name: str, tenant_id: str, top_k: int):
+    """Nearest chunks of a tenant in Qdrant (with timeout, retries and circuit breaker)."""
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    qdrant = get_qdrant_client()
+    tenant_filter = Filter(
+        must=[
+            FieldCondition(
+                key="tenant_id",
+                match=MatchValue(value=tenant_id)
+            )
+        ]
+    )
+    return await call(
+        "qdrant",
+        lambda: run_blocking(
+            "qdrant",
+            qdrant.search,
+            collection_name=collection_name,
+            query_vector=query_embedding,
+            query_filter=tenant_filter,
+            limit=top_k
+        )
+    )
+
+
+async def _hydrate_hits(search_results, tenant_id: str, min_score: float) -> List[tuple]:
+    """
+    Load chunk rows for Qdrant hits scoring at least min_score: from the
+    chunk cache, and the rest in one query (none when all hits are cached).
+    Hits without a chunk row (or of another tenant) are dropped.
+
+    Returns:
+        List of (hit, row) pairs in hit order; row is
+        (id, document_id, chunk_index, content, source, title)
+    """
+    hits = [hit for hit in search_results if hit.score >= min_score]
+    if not hits:
+        return []
+    cache = get_chunk_cache()
+    revisions = {str(hit.id): (hit.payload or {}).get("revision") for hit in hits}
+    rows, missing = cache.get_many(tenant_id, revisions)
+    if not missing:
+        return [(hit, rows[str(hit.id)]) for hit in hits]
+    generation = cache.generation(tenant_id)
+    
+    async def fetch_rows() -> Dict[str, tuple]:
+        async with read_connection() as conn:
+            result = await conn.execute(
+                text(f"""
+                    SELECT c.id, c.document_id, c.chunk_index, {CHUNK_CONTENT_SQL},
+                           d.source, d.title
+                    FROM chunks c
+                    JOIN documents d ON c.document_id = d.id
+                    WHERE c.id = ANY(CAST(:chunk_ids AS UUID[])) AND c.tenant_id = :tenant_id
+                """),
+                {"chunk_ids": missing, "tenant_id": tenant_id}
+            )
+            return {str(row[0]): row for row in result.fetchall()}
+    
+    fetched = await call("postgres", fetch_rows)
+    cache.put_many(tenant_id, fetched.values(), revisions, generation)
+    rows.update(fetched)
+    return [(hit, rows[str(hit.id)]) for hit in hits if str(hit.id) in rows]
+
+
+async def _fetch_neighbors(hits: List[tuple], tenant_id: str, window: int) -> List[ContextChunk]:
+    """
+    Load the chunks within `window` positions of each hit in its document (one query).
+    Neighbors score as the best hit they surround, so the context assembler
+    merges them into that hit's passage.
+
+    Returns:
+        Neighbor chunks (the hits themselves excluded)
+    """
+    if window <= 0 or not hits:
+        return []
+    
+    async def fetch_rows() -> List[tuple]:
+        async with read_connection() as conn:
+            # Range scan per hit on the (document_id, chunk_index) unique index
+            result = await conn.execute(
+                text(f"""
+                    SELECT DISTINCT c.document_id, c.chunk_index, {CHUNK_CONTENT_SQL}
+                    FROM unnest(CAST(:document_ids AS UUID[]), CAST(:chunk_indexes AS INT[]))
+                         AS h(document_id, chunk_index)
+                    JOIN chunks c
+                      ON c.document_id = h.document_id
+                     AND c.chunk_index BETWEEN h.chunk_index - :window AND h.chunk_index + :window
+                    JOIN documents d ON c.document_id = d.id
+                    WHERE c.tenant_id = :tenant_id
+                """),
+                {
+                    "document_ids": [str(row[1]) for _, row in hits],
+                    "chunk_indexes": [row[2] for _, row in hits],
+                    "window": window,
+                    "tenant_id": tenant_id
+                }
+            )
+            return result.fetchall()
+    
+    rows = await call("postgres", fetch_rows)
+    hit_keys = {(str(row[1]), row[2]) for _, row in hits}
+    neighbors = []
+    for document_id, chunk_index, content in rows:
+        key = (str(document_id), chunk_index)
+        if key in hit_keys:
+            continue
+        score = max(
+            hit.score for hit, row in hits
+            if str(row[1]) == key[0] and abs(row[2] - chunk_index) <= window
+        )
+        neighbors.append(ContextChunk(key[0], chunk_index, content, score))
+    return neighbors
+
+
+def _upstream_unavailable(e: UpstreamUnavailableError) -> HTTPException:
+    """503 with Retry-After for a failed-fast or timed-out dependency."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+def _quota_exceeded(e: QuotaExceededError) -> HTTPException:
+    """429 with Retry-After for a tenant over its request or token budget."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest, http_request: Request):
     """
@@ -214,66 +486,47 @@ async def search(request: SearchRequest, http_request: Request):
         top_k = request.top_k if request.top_k is not None else TOP_K_DEFAULT
         min_score = request.min_score if request.min_score is not None else MIN_SCORE_DEFAULT
         request_id = getattr(http_request.state, "request_id", None)
+        http_request.state.tenant_id = tenant_id
+        check_tenant_quota(tenant_id)
         
-        # Embed the query
-        query_embedding = await get_embedding(request.query, tenant_id=tenant_id, request_id=request_id)
+        # Embed the query with the model of the collection serving the tenant
+        target = await read_target(tenant_id)
+        with stage_timer("embed"):
+            query_embedding = await get_embedding(
+                request.query, tenant_id=tenant_id, request_id=request_id,
+                model=target.model, dimensions=target.dimensions
+            )
         
         # Search Qdrant with tenant filter
-        qdrant = get_qdrant_client()
-        search_results = qdrant.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_embedding,
-            query_filter=Filter(
-                must=[
-                    FieldCondition(
-                        key="tenant_id",
-                        match=MatchValue(value=tenant_id)
-                    )
-                ]
-            ),
-            limit=top_k
-        )
+        with stage_timer("qdrant_search"):
+            search_results = await _search_points(query_embedding, target.collection, tenant_id, top_k)
         
         # Fetch chunk contents from Postgres (also filter by tenant_id for safety)
-        engine = get_engine()
-        results = []
+        with stage_timer("pg_hydration"):
+            hits = await _hydrate_hits(search_results, tenant_id, min_score)
         
-        async with engine.connect() as conn:
-            for hit in search_results:
-                # Filter by min_score
-                if hit.score < min_score:
-                    continue
-                
-                chunk_id = str(hit.id)
-                
-                # Fetch chunk content from Postgres with tenant filter
-                result = await conn.execute(
-                    text("""
-                        SELECT c.id, c.document_id, c.chunk_index, c.content,
-                               d.source, d.title
-                        FROM chunks c
-                        JOIN documents d ON c.document_id = d.id
-                        WHERE c.id = :chunk_id AND c.tenant_id = :tenant_id
-                    """),
-                    {"chunk_id": chunk_id, "tenant_id": tenant_id}
-                )
-                row = result.fetchone()
-                
-                if row:
-                    results.append(SearchResult(
-                        score=hit.score,
-                        chunk_id=str(row[0]),
-                        document_id=str(row[1]),
-                        source=row[4],
-                        title=row[5],
-                        chunk_index=row[2],
-                        content=row[3]
-                    ))
+        results = [
+            SearchResult(
+                score=hit.score,
+                chunk_id=str(row[0]),
+                document_id=str(row[1]),
+                source=row[4],
+                title=row[5],
+                chunk_index=row[2],
+                content=row[3]
+            )
+            for hit, row in hits
+        ]
         
         return SearchResponse(
             query=request.query,
-            results=results
+            results=results,
+            timings=get_request_timings(http_request) if request.debug else None
         )
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
+    except UpstreamUnavailableError as e:
+        raise _upstream_unavailable(e)
     except ValueError as e:
         # OPENAI_API_KEY missing or other configuration error
         raise HTTPException(
@@ -287,38 +540,112 @@ async def search(request: SearchRequest, http_request: Request):
         )
 
 
+# Keyset condition for "rows after the cursor" in (created_at DESC, id DESC) order.
+# The plain created_at bound lets Postgres range-scan idx_documents_tenant_created.
+DOCUMENTS_KEYSET_CONDITION = (
+    "AND created_at <= :cursor_created_at "
+    "AND (created_at, id) < (:cursor_created_at, :cursor_id)"
+)
+
+
+def _document_row_to_dict(row) -> dict:
+    return {
+        "id": str(row[0]),
+        "tenant_id": row[1],
+        "source": row[2],
+        "title": row[3],
+        "created_at": row[4].isoformat() if row[4] else None
+    }
+
+
+async def _stream_documents_ndjson(tenant_id: str, after: Optional[tuple]):
+    """
+    Stream a tenant's documents as NDJSON using a server-side cursor.
+    Rows are fetched in batches of DOCUMENTS_STREAM_BATCH_SIZE, so memory
+    stays flat regardless of tenant size.
+    """
+    params = {"tenant_id": tenant_id}
+    keyset = ""
+    if after:
+        keyset = DOCUMENTS_KEYSET_CONDITION
+        params["cursor_created_at"], params["cursor_id"] = after
+    
+    async with read_connection() as conn:
+        result = await conn.stream(
+            text(f"""
+                SELECT id, tenant_id, source, title, created_at
+                FROM documents
+                WHERE tenant_id = :tenant_id {keyset}
+                ORDER BY created_at DESC, id DESC
+            """).execution_options(yield_per=DOCUMENTS_STREAM_BATCH_SIZE),
+            params
+        )
+        async for rows in result.partitions():
+            yield "".join(json.dumps(_document_row_to_dict(row)) + "\n" for row in rows)
+
+
 @app.get("/documents", dependencies=[Depends(verify_api_key)])
-async def list_documents(tenant_id: Optional[str] = Query(None)):
+async def list_documents(
+    response: Response,
+    tenant_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=DOCUMENTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
     """
-    List documents for a tenant.
+    List documents for a tenant, newest first.
     Requires X-API-Key header.
+    
+    Keyset-paginated on (created_at, id): returns at most `limit` documents
+    (default DOCUMENTS_PAGE_SIZE) and sets X-Next-Cursor when more exist;
+    pass it back as `cursor` to get the next page.
+    format=ndjson streams every document (from `cursor`, if given) as
+    newline-delimited JSON instead.
     """
     try:
         tenant_id = tenant_id or get_default_tenant_id()
-        engine = get_engine()
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_documents_ndjson(tenant_id, after),
+            media_type="application/x-ndjson"
+        )
+    
+    try:
+        limit = limit or DOCUMENTS_PAGE_SIZE
+        params = {"tenant_id": tenant_id, "limit": limit + 1}
+        keyset = ""
+        if after:
+            keyset = DOCUMENTS_KEYSET_CONDITION
+            params["cursor_created_at"], params["cursor_id"] = after
         
-        async with engine.connect() as conn:
+        # Uses idx_documents_tenant_created (tenant_id, created_at)
+        async with read_connection() as conn:
             result = await conn.execute(
-                text("""
+                text(f"""
                     SELECT id, tenant_id, source, title, created_at
                     FROM documents
-                    WHERE tenant_id = :tenant_id
-                    ORDER BY created_at DESC
+                    WHERE tenant_id = :tenant_id {keyset}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT :limit
                 """),
-                {"tenant_id": tenant_id}
+                params
             )
             rows = result.fetchall()
-            
-            return [
-                {
-                    "id": str(row[0]),
-                    "tenant_id": row[1],
-                    "source": row[2],
-                    "title": row[3],
-                    "created_at": row[4].isoformat() if row[4] else None
-                }
-                for row in rows
-            ]
+        
+        # One extra row tells us whether there is a next page
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last[4], last[0])
+        
+        return [_document_row_to_dict(row) for row in rows]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -334,9 +661,8 @@ async def get_document(document_id: str, tenant_id: Optional[str] = Query(None))
     """
     try:
         tenant_id = tenant_id or get_default_tenant_id()
-        engine = get_engine()
         
-        async with engine.connect() as conn:
+        async with read_connection() as conn:
             result = await conn.execute(
                 text("""
                     SELECT id, tenant_id, source, title, content, created_at
@@ -377,10 +703,11 @@ async def delete_document(document_id: str, tenant_id: Optional[str] = Query(Non
     Requires X-API-Key header.
     Deletes from both Postgres and Qdrant.
     """
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
     try:
         tenant_id = tenant_id or get_default_tenant_id()
         engine = get_engine()
-        qdrant = get_qdrant_client()
         
         # Verify document exists and belongs to tenant
         async with engine.begin() as conn:
@@ -419,11 +746,13 @@ async def delete_document(document_id: str, tenant_id: Optional[str] = Query(Non
                 {"document_id": document_id, "tenant_id": tenant_id}
             )
         
+        get_chunk_cache().invalidate_document(tenant_id, document_id)
+        
         # Delete from Qdrant using filter
         if chunk_ids:
-            qdrant.delete(
-                collection_name=COLLECTION_NAME,
-                points_selector=Filter(
+            await delete_points(
+                tenant_id,
+                Filter(
                     must=[
                         FieldCondition(
                             key="document_id",
@@ -451,102 +780,132 @@ async def delete_document(document_id: str, tenant_id: Optional[str] = Query(Non
         )
 
 
+async def _answer_chat(
+    message: str,
+    tenant_id: str,
+    top_k: int,
+    min_score: float,
+    max_citations: int,
+    neighbor_window: int,
+    request_id: Optional[str]
+) -> tuple:
+    """
+    RAG pipeline of /chat: embed query, retrieve chunks, generate answer.
+
+    Returns:
+        Tuple of (answer, citations)
+    """
+    # 1. Embed the user query (same as /search)
+    target = await read_target(tenant_id)
+    with stage_timer("embed"):
+        query_embedding = await get_embedding(
+            message, tenant_id=tenant_id, request_id=request_id,
+            model=target.model, dimensions=target.dimensions
+        )
+    
+    # 2. Retrieve top_k chunks from Qdrant with tenant filter
+    with stage_timer("qdrant_search"):
+        search_results = await _search_points(query_embedding, target.collection, tenant_id, top_k)
+    
+    # 3. Fetch chunk contents from Postgres and build citations (also filter by tenant_id)
+    # Filter by min_score and collect contexts for LLM
+    with stage_timer("pg_hydration"):
+        hits = await _hydrate_hits(search_results, tenant_id, min_score)
+    
+    citations = [
+        Citation(
+            chunk_id=str(row[0]),
+            document_id=str(row[1]),
+            source=row[4],
+            title=row[5],
+            chunk_index=row[2],
+            content=row[3],
+            score=hit.score
+        )
+        for hit, row in hits
+    ]
+    # Optionally pull in the chunks around each hit: answers often straddle a chunk border
+    neighbors = []
+    if neighbor_window and hits:
+        with stage_timer("pg_neighbors"):
+            neighbors = await _fetch_neighbors(hits, tenant_id, neighbor_window)
+    
+    # Merge overlapping neighbours, drop duplicates and pack into the token budget
+    contexts, context_stats = assemble_contexts([
+        ContextChunk(str(row[1]), row[2], row[3], hit.score)
+        for hit, row in hits
+    ] + neighbors)
+    if contexts:
+        CHAT_CONTEXT_TOKENS.observe(context_stats["context_tokens"])
+    
+    # 4. Generate answer from contexts using lightweight chat model
+    # Only use filtered results (score >= min_score)
+    if not contexts:
+        return "I don't have enough information to answer that.", []
+    
+    with stage_timer("llm_generation"):
+        answer = await generate_answer(
+            message=message,
+            contexts=contexts,
+            tenant_id=tenant_id,
+            request_id=request_id
+        )
+    
+    # Limit citations to max_citations (highest score first)
+    # Citations are already sorted by score (descending) from Qdrant
+    return answer, citations[:max_citations]
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest, http_request: Request):
     """
     Chat endpoint with RAG: embed query, retrieve chunks, generate answer.
     Reuses existing Qdrant vectors (does not re-embed documents).
     Public endpoint - filters by tenant_id.
+    Identical concurrent requests (same tenant, message up to case and
+    whitespace, and retrieval parameters) are computed once and share the
+    response (CHAT_SINGLE_FLIGHT); each still counts against the tenant's quota.
     """
     try:
         tenant_id = request.tenant_id or get_default_tenant_id()
         top_k = request.top_k if request.top_k is not None else TOP_K_DEFAULT
         min_score = request.min_score if request.min_score is not None else MIN_SCORE_DEFAULT
         max_citations = request.max_citations if request.max_citations is not None else MAX_CITATIONS_DEFAULT
+        neighbor_window = request.neighbor_window if request.neighbor_window is not None else CONTEXT_NEIGHBOR_WINDOW
+        neighbor_window = max(0, min(neighbor_window, CONTEXT_NEIGHBOR_WINDOW_MAX))
         request_id = getattr(http_request.state, "request_id", None)
+        http_request.state.tenant_id = tenant_id
+        check_tenant_quota(tenant_id)
         
-        # 1. Embed the user query (same as /search)
-        query_embedding = await get_embedding(request.message, tenant_id=tenant_id, request_id=request_id)
-        
-        # 2. Retrieve top_k chunks from Qdrant with tenant filter
-        qdrant = get_qdrant_client()
-        search_results = qdrant.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_embedding,
-            query_filter=Filter(
-                must=[
-                    FieldCondition(
-                        key="tenant_id",
-                        match=MatchValue(value=tenant_id)
-                    )
-                ]
-            ),
-            limit=top_k
-        )
+        def compute():
+            return _answer_chat(
+                request.message, tenant_id, top_k, min_score, max_citations, neighbor_window, request_id
+            )
         
-        # 3. Fetch chunk contents from Postgres and build citations (also filter by tenant_id)
-        # Filter by min_score and collect contexts for LLM
-        engine = get_engine()
-        citations = []
-        contexts = []
-        
-        async with engine.connect() as conn:
-            for hit in search_results:
-                # Filter by min_score
-                if hit.score < min_score:
-                    continue
-                
-                chunk_id = str(hit.id)
-                
-                # Fetch chunk content from Postgres with tenant filter
-                result = await conn.execute(
-                    text("""
-                        SELECT c.id, c.document_id, c.chunk_index, c.content,
-                               d.source, d.title
-                        FROM chunks c
-                        JOIN documents d ON c.document_id = d.id
-                        WHERE c.id = :chunk_id AND c.tenant_id = :tenant_id
-                    """),
-                    {"chunk_id": chunk_id, "tenant_id": tenant_id}
-                )
-                row = result.fetchone()
-                
-                if row:
-                    citation = Citation(
-                        chunk_id=str(row[0]),
-                        document_id=str(row[1]),
-                        source=row[4],
-                        title=row[5],
-                        chunk_index=row[2],
-                        content=row[3],
-                        score=hit.score
-                    )
-                    citations.append(citation)
-                    contexts.append(row[3])  # Add content to contexts for answer generation
-        
-        # 4. Generate answer from contexts using lightweight chat model
-        # Only use filtered results (score >= min_score)
-        if not contexts:
-            answer = "I don't have enough information to answer that."
-            citations = []
-        else:
-            answer = await generate_answer(
-                message=request.message,
-                contexts=contexts,
-                tenant_id=tenant_id,
-                request_id=request_id
+        if CHAT_SINGLE_FLIGHT:
+            key = (
+                tenant_id, " ".join(request.message.split()).casefold(),
+                top_k, min_score, max_citations, neighbor_window
             )
-            
-            # Limit citations to max_citations (highest score first)
-            # Citations are already sorted by score (descending) from Qdrant
-            citations = citations[:max_citations]
+            started = time.perf_counter()
+            (answer, citations), shared = await _chat_flights.do(key, compute)
+            if shared:
+                # The stages ran in the leading request; this one only waited
+                record_timing("chat_single_flight_wait", (time.perf_counter() - started) * 1000)
+        else:
+            answer, citations = await compute()
         
         return ChatResponse(
             message=request.message,
             answer=answer,
             citations=citations,
-            request_id=request_id
+            request_id=request_id,
+            timings=get_request_timings(http_request) if request.debug else None
         )
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
+    except UpstreamUnavailableError as e:
+        raise _upstream_unavailable(e)
     except ValueError as e:
         # OPENAI_API_KEY missing or other configuration error
         raise HTTPException(
@@ -563,6 +922,7 @@ async def chat(request: ChatRequest, http_request: Request):
 # Admin endpoints for v0.8
 class AdminResetRequest(BaseModel):
     tenant_id: Optional[str] = None
+    background: bool = True  # /admin/reset only: run as a job, return 202 with job_id
 
 
 class AdminResetResponse(BaseModel):
@@ -573,6 +933,12 @@ class AdminResetResponse(BaseModel):
     deleted_qdrant_points: int
 
 
+class AdminJobAccepted(BaseModel):
+    status: str
+    job_id: str
+    tenant_id: str
+
+
 class DocumentSeedInfo(BaseModel):
     title: str
     document_id: str
@@ -592,29 +958,35 @@ class AdminResetSeedResponse(BaseModel):
     seed: AdminSeedResponse
 
 
-@app.post("/admin/reset", response_model=AdminResetResponse, status_code=status.HTTP_200_OK)
+@app.post(
+    "/admin/reset",
+    response_model=AdminResetResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
 async def admin_reset(request: AdminResetRequest, api_key: str = Depends(verify_api_key)):
     """
     Reset a tenant: delete all Postgres documents/chunks and Qdrant points.
     Requires X-API-Key header.
+    Runs as a job by default (202 with job_id; poll GET /admin/jobs/{job_id});
+    with background=false the request waits for the reset and returns the counts.
     """
     try:
         tenant_id = request.tenant_id or get_default_tenant_id()
-        engine = get_engine()
         
-        # Delete Postgres data
-        async with engine.begin() as conn:
-            docs_deleted, chunks_deleted = await delete_tenant_data(conn, tenant_id)
+        if request.background:
+            job = await start_job("tenant_reset", tenant_id, lambda job: reset_tenant(tenant_id, job))
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id=tenant_id).model_dump()
+            )
         
-        # Delete Qdrant points
-        qdrant_deleted = delete_points_by_tenant(tenant_id)
+        deleted = await reset_tenant(tenant_id)
         
         return AdminResetResponse(
             status="reset",
             tenant_id=tenant_id,
-            deleted_postgres_documents=docs_deleted,
-            deleted_postgres_chunks=chunks_deleted,
-            deleted_qdrant_points=qdrant_deleted
+            **deleted
         )
     except ValueError as e:
         raise HTTPException(
@@ -628,32 +1000,308 @@ async def admin_reset(request: AdminResetRequest, api_key: str = Depends(verify_
         )
 
 
+@app.get("/admin/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+async def admin_job_status(job_id: str):
+    """
+    Get status and progress of a background admin job.
+    Requires X-API-Key header.
+    """
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job.to_dict()
+
+
+class AdminImportResponse(BaseModel):
+    status: str
+    tenant_id: str
+    imported_documents: int
+    imported_chunks: int
+
+
+@app.get("/admin/export", dependencies=[Depends(verify_api_key)])
+async def admin_export(tenant_id: Optional[str] = Query(None)):
+    """
+    Export a tenant's documents, chunks and vectors as a bundle (streamed).
+    Requires X-API-Key header.
+    Load the file elsewhere with POST /admin/import; nothing is re-embedded.
+    """
+    tenant_id = tenant_id or get_default_tenant_id()
+    return StreamingResponse(
+        export_tenant(tenant_id),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{tenant_id}.bundle"'}
+    )
+
+
+@app.post(
+    "/admin/import",
+    response_model=AdminImportResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
+async def admin_import(
+    http_request: Request,
+    tenant_id: Optional[str] = Query(None),
+    force: bool = Query(False),
+    background: bool = Query(False),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Import a bundle produced by GET /admin/export (raw request body).
+    Requires X-API-Key header.
+    tenant_id defaults to the exported tenant; importing into another tenant
+    assigns new IDs. force=true skips the embedding model check.
+    With background=true the import runs as a job; poll GET /admin/jobs/{job_id}.
+    """
+    # Spool the upload to disk so the import can memory-map it
+    bundle_file = tempfile.TemporaryFile()
+    try:
+        async for data in http_request.stream():
+            bundle_file.write(data)
+    except Exception:
+        bundle_file.close()
+        raise
+
+    try:
+        if background:
+            target_tenant_id = tenant_id or read_bundle_header(bundle_file).get("tenant_id")
+            if not target_tenant_id:
+                raise ValueError("Bundle has no tenant_id; pass one explicitly")
+            job = await start_job(
+                "tenant_import",
+                target_tenant_id,
+                lambda job: import_tenant_file(bundle_file, tenant_id=tenant_id, force=force, job=job),
+                exclusive=False
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id=target_tenant_id).model_dump()
+            )
+
+        imported = await import_tenant_file(bundle_file, tenant_id=tenant_id, force=force)
+        return AdminImportResponse(status="imported", **imported)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import tenant: {str(e)}"
+        )
+
+
+class AdminReconcileRequest(BaseModel):
+    tenant_id: Optional[str] = None
+    repair: bool = False  # re-embed chunks missing vectors, delete orphaned points
+    background: bool = False
+
+
+@app.post(
+    "/admin/reconcile",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
+async def admin_reconcile(request: AdminReconcileRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Check a tenant's Postgres chunks against its Qdrant points and report drift
+    (chunks missing vectors, orphaned points); repair=true also fixes it.
+    Requires X-API-Key header.
+    With background=true the check runs as a job; poll GET /admin/jobs/{job_id}.
+    """
+    try:
+        tenant_id = request.tenant_id or get_default_tenant_id()
+        
+        if request.background:
+            job = await start_job(
+                "tenant_reconcile",
+                tenant_id,
+                lambda job: reconcile_tenant(tenant_id, repair=request.repair, job=job)
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id=tenant_id).model_dump()
+            )
+        
+        return await reconcile_tenant(tenant_id, repair=request.repair)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reconcile tenant: {str(e)}"
+        )
+
+
+@app.get("/admin/tenants/{tenant_id}/usage", dependencies=[Depends(verify_api_key)])
+async def admin_tenant_usage(tenant_id: str):
+    """
+    Request and token usage of a tenant against its quotas (this process).
+    Requires X-API-Key header.
+    """
+    return get_tenant_usage(tenant_id)
+
+
+class AdminReembedRequest(BaseModel):
+    collection: Optional[str] = None  # logical collection; default: all of them
+    model: Optional[str] = None  # default: EMBEDDING_MODEL
+    dimensions: Optional[int] = None  # default: the model's full size
+    background: bool = False
+
+
+@app.post(
+    "/admin/reembed",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
+async def admin_reembed(request: AdminReembedRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Rebuild Qdrant collections with another embedding model or size while
+    they keep serving traffic (build next to the old one, then switch).
+    Requires X-API-Key header.
+    With background=true the rebuild runs as a job; poll GET /admin/jobs/{job_id}.
+    """
+    async def run(job=None) -> Dict:
+        collections = [request.collection] if request.collection else await list_logical_collections()
+        results = []
+        for collection in collections:
+            if job:
+                job.update(collection=collection)
+            results.append(await reembed_collection(collection, request.model, request.dimensions, job=job))
+        return {"collections": results}
+    
+    try:
+        if request.background:
+            key = request.collection or "*"
+            job = await start_job("collection_reembed", key, run)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id=key).model_dump()
+            )
+        
+        return await run()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to re-embed collections: {str(e)}"
+        )
+
+
+class AdminChunkStorageRequest(BaseModel):
+    background: bool = False
+
+
+@app.post(
+    "/admin/chunk-storage/compact",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
+async def admin_compact_chunk_storage(request: AdminChunkStorageRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Convert stored chunks to the configured CHUNK_STORAGE mode (offsets into
+    the document instead of a copy of the text, or back). Safe to re-run.
+    Requires X-API-Key header.
+    With background=true the conversion runs as a job; poll GET /admin/jobs/{job_id}.
+    """
+    try:
+        if request.background:
+            job = await start_job("chunk_storage_compact", "*", compact_chunk_storage)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id="*").model_dump()
+            )
+        
+        return await compact_chunk_storage()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compact chunk storage: {str(e)}"
+        )
+
+
+class AdminPlacementRequest(BaseModel):
+    placement: str  # "shared" or "dedicated"
+    background: bool = False
+
+
+@app.get("/admin/tenants/{tenant_id}/placement", dependencies=[Depends(verify_api_key)])
+async def admin_get_placement(tenant_id: str):
+    """
+    Qdrant collection serving a tenant (and the migration target while it moves).
+    Requires X-API-Key header.
+    """
+    collection, migrating_to = await get_placement(tenant_id)
+    return {
+        "tenant_id": tenant_id,
+        "placement": "shared" if collection == COLLECTION_NAME else "dedicated",
+        "collection": collection,
+        "migrating_to": migrating_to
+    }
+
+
+@app.post(
+    "/admin/tenants/{tenant_id}/placement",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": AdminJobAccepted}}
+)
+async def admin_migrate_placement(tenant_id: str, request: AdminPlacementRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Move a tenant to the shared or to a dedicated Qdrant collection while it
+    keeps serving traffic (dual writes, copy, cutover, cleanup).
+    Requires X-API-Key header.
+    With background=true the move runs as a job; poll GET /admin/jobs/{job_id}.
+    """
+    if request.placement not in PLACEMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"placement must be one of: {', '.join(PLACEMENTS)}"
+        )
+    try:
+        if request.background:
+            job = await start_job(
+                "tenant_migration",
+                tenant_id,
+                lambda job: migrate_tenant(tenant_id, request.placement, job=job)
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=AdminJobAccepted(status=job.status, job_id=job.id, tenant_id=tenant_id).model_dump()
+            )
+        
+        return await migrate_tenant(tenant_id, request.placement)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to migrate tenant: {str(e)}"
+        )
+
+
 @app.post("/admin/seed", response_model=AdminSeedResponse, status_code=status.HTTP_201_CREATED)
 async def admin_seed(request: AdminResetRequest, api_key: str = Depends(verify_api_key)):
     """
     Seed a tenant with the default dataset.
     Requires X-API-Key header.
+    Idempotent: seed documents get deterministic IDs per tenant.
     """
     try:
         tenant_id = request.tenant_id or get_default_tenant_id()
-        seed_docs = get_seed_documents()
-        
-        # Ingest each seed document using existing ingest logic
-        document_results = []
-        for doc in seed_docs:
-            document_id, num_chunks = await ingest_document(
-                source=doc["source"],
-                title=doc["title"],
-                content=doc["content"],
-                tenant_id=tenant_id
-            )
-            document_results.append(
-                DocumentSeedInfo(
-                    title=doc["title"],
-                    document_id=document_id,
-                    chunks=num_chunks
-                )
-            )
+        
+        # Bulk-load the precomputed seed snapshot (falls back to ingest if none matches)
+        seeded = await seed_tenant(tenant_id)
+        document_results = [DocumentSeedInfo(**doc) for doc in seeded]
         
         return AdminSeedResponse(
             status="seeded",
@@ -681,8 +1329,9 @@ async def admin_reset_seed(request: AdminResetRequest, api_key: str = Depends(ve
     try:
         tenant_id = request.tenant_id or get_default_tenant_id()
         
-        # Call reset (create new request object)
-        reset_request_obj = AdminResetRequest(tenant_id=tenant_id)
+        # Call reset (create new request object); the seed must not start
+        # until the reset has finished, so it never runs as a background job
+        reset_request_obj = AdminResetRequest(tenant_id=tenant_id, background=False)
         reset_response = await admin_reset(reset_request_obj, api_key)
         
         # Call seed (create new request object)
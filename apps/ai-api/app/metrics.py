@@ -0,0 +1,456 @@
+"""
+Lightweight in-process Prometheus metrics.
+No prometheus_client, no external services: counters and histograms live in
+process memory and are rendered in the Prometheus text exposition format.
+"""
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.auth import DEFAULT_TENANT_ID
+from app.server_timing import record_timing
+
+# Latency buckets in seconds (covers fast Postgres lookups up to slow LLM calls)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"
+
+# Tenant IDs come from clients, so tenant label values are bounded: configured
+# tenants always keep their own label, the first METRICS_MAX_TENANTS others seen
+# get one too, and any further tenant is counted as "other"
+METRICS_TENANTS = {tenant.strip() for tenant in os.getenv("METRICS_TENANTS", "").split(",") if tenant.strip()}
+METRICS_MAX_TENANTS = int(os.getenv("METRICS_MAX_TENANTS", "50"))
+OTHER_TENANT = "other"
+
+_registry: List["_Metric"] = []
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for a labelled metric family."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get (or create) the child metric for the given label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment an unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        """Set an unlabelled gauge."""
+        self.labels().set(value)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per finite bucket plus the +Inf bucket (non-cumulative)
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """Bucketed latency histogram."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        """Observe a value on an unlabelled histogram."""
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bucket_labelnames = self.labelnames + ("le",)
+        for key, child in list(self._children.items()):
+            with child._lock:
+                bucket_counts = list(child.bucket_counts)
+                total_sum = child.sum
+                total_count = child.count
+            cumulative = 0
+            bounds = self.upper_bounds + (float("inf"),)
+            for bound, bucket_count in zip(bounds, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labelnames, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {total_count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    Render all registered metrics in Prometheus text exposition format.
+
+    Returns:
+        Metrics payload as a string
+    """
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# Metric definitions
+HTTP_REQUESTS = Counter(
+    "ai_api_http_requests_total",
+    "HTTP requests by endpoint, method, status and tenant.",
+    ("endpoint", "method", "status", "tenant")
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "ai_api_http_request_duration_seconds",
+    "HTTP request latency by endpoint and method.",
+    ("endpoint", "method")
+)
+
+STAGE_DURATION = Histogram(
+    "ai_api_stage_duration_seconds",
+    "Pipeline stage latency (embed, qdrant_search, pg_hydration, pg_neighbors, llm_generation, ingest_*).",
+    ("stage",)
+)
+
+CACHE_REQUESTS = Counter(
+    "ai_api_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ("cache", "result")
+)
+
+CHUNK_CACHE_ENTRIES = Gauge(
+    "ai_api_chunk_cache_entries",
+    "Chunk rows held in the in-process hydration cache.",
+    ()
+)
+
+POSTGRES_READS = Counter(
+    "ai_api_postgres_reads_total",
+    "Read-path connections by target (replica/primary).",
+    ("target",)
+)
+
+POSTGRES_REPLICA_LAG = Gauge(
+    "ai_api_postgres_replica_lag_seconds",
+    "Replay lag of the Postgres read replica at its last check.",
+    ()
+)
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "ai_api_single_flight_requests_total",
+    "Coalesced requests by name and role (leader computed, shared joined an in-flight computation).",
+    ("name", "role")
+)
+
+OPENAI_REQUESTS = Counter(
+    "ai_api_openai_requests_total",
+    "OpenAI HTTP requests by connection (new/reused) and HTTP version.",
+    ("connection", "http_version")
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "ai_api_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+    ("endpoint",)
+)
+
+UPSTREAM_CALLS = Counter(
+    "ai_api_upstream_calls_total",
+    "Upstream call attempts by dependency and outcome (success, error, timeout, rejected).",
+    ("dependency", "outcome")
+)
+
+UPSTREAM_RETRIES = Counter(
+    "ai_api_upstream_retries_total",
+    "Retried upstream calls by dependency.",
+    ("dependency",)
+)
+
+UPSTREAM_HEDGES = Counter(
+    "ai_api_upstream_hedges_total",
+    "Hedged second requests by dependency and winner (primary/hedge).",
+    ("dependency", "winner")
+)
+
+ADMISSION_LIMIT = Gauge(
+    "ai_api_admission_concurrency_limit",
+    "Current adaptive concurrency limit by endpoint.",
+    ("endpoint",)
+)
+
+ADMISSION_INFLIGHT = Gauge(
+    "ai_api_admission_inflight",
+    "Admitted requests in flight by endpoint.",
+    ("endpoint",)
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "ai_api_admission_queue_depth",
+    "Requests waiting for admission by endpoint.",
+    ("endpoint",)
+)
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "ai_api_admission_queue_wait_seconds",
+    "Time queued requests waited for admission.",
+    ("endpoint",)
+)
+
+ADMISSION_SHED = Counter(
+    "ai_api_admission_shed_total",
+    "Requests shed with 503 by endpoint and reason (queue_full, queue_timeout).",
+    ("endpoint", "reason")
+)
+
+TENANT_TOKENS = Counter(
+    "ai_api_tenant_tokens_total",
+    "OpenAI tokens used by tenant and kind (embedding/chat).",
+    ("tenant", "kind")
+)
+
+TENANT_QUOTA_REJECTIONS = Counter(
+    "ai_api_tenant_quota_rejections_total",
+    "Requests rejected by tenant and quota (requests_per_minute/tokens_per_hour).",
+    ("tenant", "quota")
+)
+
+FAIR_QUEUE_WAITING = Gauge(
+    "ai_api_llm_queue_waiting",
+    "LLM calls waiting for a fair-scheduled slot by tenant.",
+    ("tenant",)
+)
+
+CHAT_CONTEXT_TOKENS = Histogram(
+    "ai_api_chat_context_tokens",
+    "Estimated context tokens sent to the LLM per /chat request.",
+    (),
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000)
+)
+
+CIRCUIT_STATE = Gauge(
+    "ai_api_circuit_state",
+    "Circuit breaker state by dependency (0=closed, 1=half_open, 2=open).",
+    ("dependency",)
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Time a pipeline stage and record it in the stage latency histogram
+    and in the current request's Server-Timing breakdown.
+
+    Args:
+        stage: Stage name (e.g., "embed", "qdrant_search", "llm_generation")
+    """
+    child = STAGE_DURATION.labels(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        child.observe(duration)
+        record_timing(stage, duration * 1000)
+
+
+_known_tenants = set(METRICS_TENANTS) | {DEFAULT_TENANT_ID}
+_seen_tenants: set = set()
+_tenants_lock = threading.Lock()
+
+
+def register_tenant_labels(tenant_ids: Iterable[str]):
+    """Give configured tenants (e.g. those with quota overrides) their own label."""
+    with _tenants_lock:
+        _known_tenants.update(tenant_ids)
+
+
+def tenant_label(tenant_id: str) -> str:
+    """
+    Bounded label value for a tenant.
+
+    Args:
+        tenant_id: Tenant ID as supplied by the client
+
+    Returns:
+        The tenant ID if it is configured or among the first METRICS_MAX_TENANTS
+        seen, else "other"
+    """
+    if tenant_id in _known_tenants or tenant_id in _seen_tenants:
+        return tenant_id
+    with _tenants_lock:
+        if len(_seen_tenants) < METRICS_MAX_TENANTS:
+            _seen_tenants.add(tenant_id)
+            return tenant_id
+    return OTHER_TENANT
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """
+    Record a cache lookup result.
+
+    Args:
+        cache: Cache name
+        hit: True for a hit, False for a miss
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware to count requests and record request latency.
+    Endpoints are labelled by route template (e.g. /documents/{document_id})
+    to keep label cardinality bounded.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            # Endpoints set request.state.tenant_id once the tenant is resolved
+            tenant_id = getattr(request.state, "tenant_id", None) or request.query_params.get("tenant_id")
+            tenant = tenant_label(tenant_id) if tenant_id else "none"
+            HTTP_REQUESTS.labels(endpoint, request.method, str(status_code), tenant).inc()
+            HTTP_REQUEST_DURATION.labels(endpoint, request.method).observe(time.perf_counter() - start)
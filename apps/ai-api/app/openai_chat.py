@@ -5,7 +5,10 @@ import os
 import time
 import logging
 from typing import List, Optional
-from app.openai_client import get_openai_client
+from app.openai_client import get_openai_client, request_timeout
+from app.resilience import call
+from app.fair_queue import llm_slot
+from app.tenant_quota import record_token_usage
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +50,7 @@ async def generate_answer(
         
     Raises:
         ValueError: If OPENAI_API_KEY is not set
+        UpstreamUnavailableError: If OpenAI is unavailable (circuit open or timed out)
     """
     if not contexts:
         return "I don't have enough information to answer that."
@@ -76,15 +80,26 @@ Question: {message}
 
 Answer:"""
         
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.3  # Lower temperature for more focused answers
-        )
+        # Wait for a fair share of LLM capacity, then call with retries/breaker
+        async with llm_slot(tenant_id or "unknown"):
+            # Completions have no side effects, so a failed attempt can be retried
+            timeout = request_timeout("openai_chat")
+            response = await call(
+                "openai_chat",
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.3,  # Lower temperature for more focused answers
+                    timeout=timeout
+                )
+            )
+        
+        if tenant_id and response.usage:
+            record_token_usage(tenant_id, "chat", response.usage.total_tokens)
         
         answer = response.choices[0].message.content.strip()
         success = True
@@ -1,35 +1,144 @@
 """
 OpenAI client for generating embeddings.
+
+The client is asynchronous and shares one explicitly configured httpx
+transport per process. Embedding and chat calls multiplex over warm HTTP/2
+connections (OPENAI_HTTP2) instead of each burst opening new TLS
+connections, and a timed-out call is cancelled rather than left running in
+a thread. Connection reuse is exported as
+ai_api_openai_requests_total{connection="new|reused"}.
 """
 import os
 import time
 import logging
-from typing import List, Optional
-from openai import OpenAI
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+from app.metrics import OPENAI_REQUESTS
+from app.resilience import call, get_timeout
+from app.tenant_quota import record_token_usage
 
 logger = logging.getLogger(__name__)
 
-_openai_client: OpenAI | None = None
+# Shared transport
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() in ("1", "true", "yes")
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "120"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "3"))
+OPENAI_POOL_TIMEOUT_SECONDS = float(os.getenv("OPENAI_POOL_TIMEOUT_SECONDS", "5"))
+
+_openai_client: Optional["AsyncOpenAI"] = None
 _embedding_model: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Shortened output size (text-embedding-3-* only); unset = the model's full size
+_embedding_dimensions: Optional[int] = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+# Hedge single-text (query) embeddings after the recent p95 latency
+_embedding_hedge: bool = os.getenv("EMBEDDING_HEDGE", "false").lower() in ("1", "true", "yes")
+
+
+async def _trace_connection(request: "httpx.Request"):
+    # httpcore reports connection setup through the trace extension; a request
+    # that sees no connect event was sent on an already open connection
+    state = {"new": False}
+
+    async def trace(event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            state["new"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["openai_connection"] = state
+
+
+async def _record_connection(response: "httpx.Response"):
+    state = response.request.extensions.get("openai_connection", {})
+    OPENAI_REQUESTS.labels("new" if state.get("new") else "reused", response.http_version).inc()
+
+
+def request_timeout(name: str) -> "httpx.Timeout":
+    """
+    Timeouts for one OpenAI call: a short connect timeout, and the
+    dependency's per-attempt timeout (app.resilience) for reading the response.
+
+    Args:
+        name: Resilience dependency ("openai_embeddings" or "openai_chat")
+    """
+    import httpx
 
+    read = get_timeout(name)
+    return httpx.Timeout(read, connect=OPENAI_CONNECT_TIMEOUT_SECONDS, pool=OPENAI_POOL_TIMEOUT_SECONDS)
 
-def get_openai_client() -> OpenAI:
-    """Get or create the OpenAI client."""
+
+def _build_http_client() -> "httpx.AsyncClient":
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=OPENAI_HTTP2,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(
+            get_timeout("openai_chat"),
+            connect=OPENAI_CONNECT_TIMEOUT_SECONDS,
+            pool=OPENAI_POOL_TIMEOUT_SECONDS
+        ),
+        event_hooks={"request": [_trace_connection], "response": [_record_connection]}
+    )
+
+
+def get_openai_client() -> "AsyncOpenAI":
+    """
+    Get or create the OpenAI client (on the shared HTTP/2 transport).
+    The SDK is imported here, not at module import: it is one of the slowest
+    imports in the app and isn't needed at all with EMBEDDING_PROVIDER=local.
+    """
     global _openai_client
     if _openai_client is None:
+        from openai import AsyncOpenAI
+
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        _openai_client = OpenAI(api_key=api_key)
+        # Retries and timeouts are handled by app.resilience
+        _openai_client = AsyncOpenAI(api_key=api_key, max_retries=0, http_client=_build_http_client())
     return _openai_client
 
 
+def reset_openai_client():
+    """Forget the client (for forked worker processes; its HTTP connections belong to the parent)."""
+    global _openai_client
+    _openai_client = None
+
+
+async def close_openai_client():
+    """Close the client's HTTP connections and forget it (shutdown)."""
+    global _openai_client
+    client, _openai_client = _openai_client, None
+    if client is not None:
+        await client.close()
+
+
 def get_embedding_model() -> str:
     """Get the embedding model name."""
     return _embedding_model
 
 
-async def get_embeddings(texts: List[str], tenant_id: Optional[str] = None, request_id: Optional[str] = None) -> List[List[float]]:
+def get_embedding_dimensions() -> Optional[int]:
+    """Get the requested embedding size (None = the model's full size)."""
+    return _embedding_dimensions
+
+
+async def get_embeddings(
+    texts: List[str],
+    tenant_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None
+) -> List[List[float]]:
     """
     Generate embeddings for a list of texts.
     
@@ -37,27 +146,39 @@ async def get_embeddings(texts: List[str], tenant_id: Optional[str] = None, requ
         texts: List of text strings to embed
         tenant_id: Tenant ID for logging (optional)
         request_id: Request ID for logging (optional)
+        model: Embedding model (defaults to EMBEDDING_MODEL env var)
+        dimensions: Shortened output size (defaults to EMBEDDING_DIMENSIONS env var
+            when no model is given; with a model, None means the model's full size)
         
     Returns:
         List of embedding vectors (each is a list of floats)
         
     Raises:
         ValueError: If OPENAI_API_KEY is not set
+        UpstreamUnavailableError: If OpenAI is unavailable (circuit open or timed out)
     """
     client = get_openai_client()
+    if model is None:
+        # EMBEDDING_DIMENSIONS belongs to the configured model only
+        model = _embedding_model
+        dimensions = dimensions if dimensions is not None else _embedding_dimensions
     start_time = time.time()
     success = False
     error_type = None
     
     try:
-        # Use async-compatible approach (OpenAI SDK v1+)
-        # Note: OpenAI Python SDK doesn't have native async, but we can use it in async context
-        response = client.embeddings.create(
-            model=_embedding_model,
-            input=texts
+        timeout = request_timeout("openai_embeddings")
+        # Older models reject the dimensions parameter, so only send it when set
+        options = {"dimensions": dimensions} if dimensions else {}
+        response = await call(
+            "openai_embeddings",
+            lambda: client.embeddings.create(model=model, input=texts, timeout=timeout, **options),
+            hedge=_embedding_hedge and len(texts) == 1
         )
         
         embeddings = [item.embedding for item in response.data]
+        if tenant_id and response.usage:
+            record_token_usage(tenant_id, "embedding", response.usage.total_tokens)
         success = True
         return embeddings
     except Exception as e:
@@ -70,7 +191,8 @@ async def get_embeddings(texts: List[str], tenant_id: Optional[str] = None, requ
             extra={
                 "event": "openai_embedding",
                 "tenant_id": tenant_id or "unknown",
-                "model": _embedding_model,
+                "model": model,
+                "dimensions": dimensions,
                 "duration_ms": duration_ms,
                 "success": success,
                 "error_type": error_type,
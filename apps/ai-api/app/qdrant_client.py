@@ -1,22 +1,58 @@
 import os
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, Filter, FieldCondition, MatchValue
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+from app.metrics import record_cache_lookup
+from app.resilience import get_timeout
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
 
 _qdrant_url = os.getenv("QDRANT_URL", "")
-_client: QdrantClient | None = None
+_client: Optional["QdrantClient"] = None
 COLLECTION_NAME = "restaurant_knowledge"
 
+# Collections known to exist (avoids a get_collections round trip on every ingest)
+_known_collections: set[str] = set()
 
-def get_qdrant_client() -> QdrantClient:
-    """Get or create the Qdrant client."""
+
+def get_qdrant_client() -> "QdrantClient":
+    """
+    Get or create the Qdrant client.
+    The SDK (and its generated models, imported by the functions using them)
+    is imported on first use, not at module import: it is the slowest import
+    in the app.
+    """
     global _client
     if _client is None:
+        from qdrant_client import QdrantClient
+
         if not _qdrant_url:
             raise ValueError("QDRANT_URL environment variable is not set")
-        _client = QdrantClient(url=_qdrant_url)
+        if _qdrant_url == ":memory:":
+            # In-process Qdrant (benchmarks and local runs without a Qdrant server)
+            _client = QdrantClient(location=":memory:")
+        else:
+            _client = QdrantClient(url=_qdrant_url, timeout=max(1, round(get_timeout("qdrant"))))
     return _client
 
 
+def reset_qdrant_client():
+    """Forget the client and collection cache (for forked worker processes)."""
+    global _client
+    _client = None
+    _known_collections.clear()
+
+
+async def close_qdrant_client():
+    """Close the client's HTTP connections and forget it (shutdown)."""
+    global _client
+    client, _client = _client, None
+    _known_collections.clear()
+    if client is not None:
+        await asyncio.to_thread(client.close)
+
+
 def check_qdrant() -> tuple[bool, str]:
     """
     Check Qdrant connectivity.
@@ -31,41 +67,88 @@ def check_qdrant() -> tuple[bool, str]:
         return False, str(e)
 
 
-async def ensure_collection_exists(vector_size: int):
+async def ensure_collection_exists(vector_size: int, collection_name: str = COLLECTION_NAME):
     """
     Ensure the Qdrant collection exists with the correct configuration.
     Creates it if it doesn't exist.
     
     Args:
         vector_size: Size of the embedding vectors
+        collection_name: Collection to ensure (defaults to the shared collection)
     """
+    from qdrant_client.models import Distance, VectorParams
+
+    if collection_name in _known_collections:
+        record_cache_lookup("qdrant_collection", True)
+        return
+    record_cache_lookup("qdrant_collection", False)
+    
     client = get_qdrant_client()
     
     # Check if collection exists
     collections = client.get_collections()
     collection_names = [col.name for col in collections.collections]
     
-    if COLLECTION_NAME not in collection_names:
+    if collection_name not in collection_names:
         # Create collection
         client.create_collection(
-            collection_name=COLLECTION_NAME,
+            collection_name=collection_name,
             vectors_config=VectorParams(
                 size=vector_size,
                 distance=Distance.COSINE
             )
         )
+    
+    _known_collections.add(collection_name)
+
 
+async def collection_exists(collection_name: str, cached: bool = False) -> bool:
+    """
+    Whether a Qdrant collection exists.
 
-def delete_points_by_tenant(tenant_id: str) -> int:
+    Args:
+        collection_name: Collection to look up
+        cached: Trust collections this process already knows to exist instead
+            of asking Qdrant (another worker may have dropped one since; only
+            for callers that tolerate a missing collection)
+    """
+    if cached and collection_name in _known_collections:
+        record_cache_lookup("qdrant_collection", True)
+        return True
+    if cached:
+        record_cache_lookup("qdrant_collection", False)
+    collections = await asyncio.to_thread(get_qdrant_client().get_collections)
+    names = {existing.name for existing in collections.collections}
+    _known_collections.update(names)
+    return collection_name in names
+
+
+def forget_collection(collection_name: str):
+    """Drop a collection from this process's cache (it no longer exists in Qdrant)."""
+    _known_collections.discard(collection_name)
+
+
+async def drop_collection(collection_name: str):
+    """Delete a collection (e.g. a tenant's dedicated collection after it moved back)."""
+    await asyncio.to_thread(get_qdrant_client().delete_collection, collection_name)
+    _known_collections.discard(collection_name)
+
+
+async def delete_points_by_tenant(tenant_id: str, collection_name: str = COLLECTION_NAME) -> int:
     """
     Delete all Qdrant points for a specific tenant.
+    Runs the blocking client calls in a worker thread so the event loop
+    keeps serving requests while Qdrant deletes.
     
     Args:
         tenant_id: Tenant ID to delete points for
+        collection_name: Collection to delete from (defaults to the shared collection)
         
     Returns:
-        Number of points deleted, or -1 if count not available
+        Number of points deleted
     """
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
     client = get_qdrant_client()
     
     # Create filter for tenant_id
@@ -78,16 +161,25 @@ def delete_points_by_tenant(tenant_id: str) -> int:
         ]
     )
     
-    # Delete points matching the filter
-    # Note: Qdrant delete doesn't return count directly, so we'll return -1
-    # and note this in the response
+    # Qdrant delete doesn't return a count, so count the matching points first
     try:
-        client.delete(
-            collection_name=COLLECTION_NAME,
-            points_selector=tenant_filter
+        count_result = await asyncio.to_thread(
+            client.count,
+            collection_name=collection_name,
+            count_filter=tenant_filter,
+            exact=True
         )
-        # Qdrant doesn't return deleted count, so return -1
-        return -1
+        if count_result.count:
+            await asyncio.to_thread(
+                client.delete,
+                collection_name=collection_name,
+                points_selector=tenant_filter
+            )
+        return count_result.count
     except Exception as e:
+        if getattr(e, "status_code", None) == 404:
+            # Dropped since it was looked up (e.g. by another worker): nothing to delete
+            forget_collection(collection_name)
+            return 0
         # If deletion fails, raise the error
         raise ValueError(f"Failed to delete Qdrant points for tenant {tenant_id}: {str(e)}")
@@ -8,6 +8,7 @@ from collections import defaultdict
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from app.metrics import RATE_LIMIT_REJECTIONS
 
 # Rate limit configuration from environment
 RATE_LIMIT_MAX = int(os.getenv("RATE_LIMIT_MAX", "60"))
@@ -78,6 +79,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             ip = get_client_ip(request)
             
             if is_rate_limited(ip):
+                RATE_LIMIT_REJECTIONS.labels(request.url.path).inc()
                 return JSONResponse(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     content={"detail": "Rate limit exceeded. Try again later."}
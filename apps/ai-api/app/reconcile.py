@@ -0,0 +1,187 @@
+"""
+Postgres <-> Qdrant consistency reconciler.
+
+Ingest and delete touch Postgres and Qdrant in separate steps, so a failure in
+between leaves drift: chunks without vectors (never returned by search) or
+vectors without chunk rows (search hits that hydration silently drops).
+
+The reconciler walks one tenant in two sorted passes with bounded memory:
+    1. Postgres chunk IDs (keyset pagination) -> which are missing in Qdrant
+    2. Qdrant points (scroll)                  -> which are missing in Postgres
+With repair, missing vectors are re-embedded and orphaned points deleted.
+"""
+import os
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.chunk_storage import CHUNK_CONTENT_SQL, chunk_payload
+from app.database import get_engine
+from app.jobs import Job
+from app.qdrant_client import get_qdrant_client
+from app.resilience import call, run_blocking
+from app.tenant_router import read_collection, collection_exists, upsert_points, delete_points
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "500"))
+
+# IDs listed per drift kind in the report (counts are always complete)
+RECONCILE_SAMPLE_SIZE = 20
+
+
+async def _reembed_chunks(tenant_id: str, rows: List[tuple]):
+    """Embed chunk rows (id, document_id, chunk_index, content, title, source) and upsert their points."""
+    # Each collection the tenant is written to gets vectors from its own model
+    await upsert_points(
+        tenant_id,
+        ids=[str(row[0]) for row in rows],
+        payloads=[
+            chunk_payload(str(row[1]), str(row[0]), tenant_id, row[2], row[3], row[4], row[5])
+            for row in rows
+        ],
+        texts=[row[3] for row in rows]
+    )
+
+
+async def _check_postgres_chunks(tenant_id: str, collection: str, repair: bool, report: dict, job: Optional[Job]):
+    engine = get_engine()
+    qdrant = get_qdrant_client()
+    last_id = None
+
+    while True:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(f"""
+                    SELECT c.id, c.document_id, c.chunk_index, {CHUNK_CONTENT_SQL}, d.title, d.source
+                    FROM chunks c
+                    JOIN documents d ON c.document_id = d.id
+                    WHERE c.tenant_id = :tenant_id
+                      AND (CAST(:last_id AS UUID) IS NULL OR c.id > CAST(:last_id AS UUID))
+                    ORDER BY c.id
+                    LIMIT :limit
+                """),
+                {"tenant_id": tenant_id, "last_id": last_id, "limit": RECONCILE_BATCH_SIZE}
+            )
+            rows = result.fetchall()
+        if not rows:
+            return
+
+        points = []
+        if await collection_exists(collection):
+            points = await call(
+                "qdrant",
+                lambda rows=rows: run_blocking(
+                    "qdrant",
+                    qdrant.retrieve,
+                    collection_name=collection,
+                    ids=[str(row[0]) for row in rows],
+                    with_payload=False,
+                    with_vectors=False
+                )
+            )
+        present = {str(point.id) for point in points}
+        missing = [row for row in rows if str(row[0]) not in present]
+
+        report["postgres_chunks_checked"] += len(rows)
+        report["chunks_missing_vectors"] += len(missing)
+        report["sample_chunks_missing_vectors"].extend(
+            str(row[0]) for row in missing[:RECONCILE_SAMPLE_SIZE - len(report["sample_chunks_missing_vectors"])]
+        )
+        if missing and repair:
+            await _reembed_chunks(tenant_id, missing)
+            report["reembedded_chunks"] += len(missing)
+
+        last_id = str(rows[-1][0])
+        if job:
+            job.update(**{key: value for key, value in report.items() if not key.startswith("sample_")})
+
+
+async def _check_qdrant_points(tenant_id: str, collection: str, repair: bool, report: dict, job: Optional[Job]):
+    from qdrant_client.models import Filter, FieldCondition, MatchValue, PointIdsList
+
+    engine = get_engine()
+    qdrant = get_qdrant_client()
+    tenant_filter = Filter(must=[FieldCondition(key="tenant_id", match=MatchValue(value=tenant_id))])
+    offset = None
+
+    while True:
+        points, offset = await call(
+            "qdrant",
+            lambda offset=offset: run_blocking(
+                "qdrant",
+                qdrant.scroll,
+                collection_name=collection,
+                scroll_filter=tenant_filter,
+                limit=RECONCILE_BATCH_SIZE,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+        )
+        if points:
+            point_ids = [str(point.id) for point in points]
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT id FROM chunks WHERE id = ANY(CAST(:ids AS UUID[]))"),
+                    {"ids": point_ids}
+                )
+                known = {str(row[0]) for row in result.fetchall()}
+            orphaned = [point_id for point_id in point_ids if point_id not in known]
+
+            report["qdrant_points_checked"] += len(point_ids)
+            report["orphaned_points"] += len(orphaned)
+            report["sample_orphaned_points"].extend(
+                orphaned[:RECONCILE_SAMPLE_SIZE - len(report["sample_orphaned_points"])]
+            )
+            if orphaned and repair:
+                # Scroll continues from `offset` (a point ID), so deleting visited points is safe
+                await delete_points(tenant_id, PointIdsList(points=orphaned))
+                report["deleted_orphaned_points"] += len(orphaned)
+
+            if job:
+                job.update(**{key: value for key, value in report.items() if not key.startswith("sample_")})
+
+        if offset is None:
+            return
+
+
+async def reconcile_tenant(tenant_id: str, repair: bool = False, job: Optional[Job] = None) -> Dict:
+    """
+    Compare a tenant's Postgres chunks with its Qdrant points.
+    Safe to run while the API serves traffic: an ingest in flight may show up
+    as a chunk missing its vector, and repairing it upserts the same point
+    ID the ingest would write.
+
+    Args:
+        tenant_id: Tenant to check
+        repair: Re-embed chunks missing vectors and delete orphaned points
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Report dict with checked/drift/repair counts and sample IDs per drift kind
+    """
+    report = {
+        "tenant_id": tenant_id,
+        "repair": repair,
+        "postgres_chunks_checked": 0,
+        "chunks_missing_vectors": 0,
+        "reembedded_chunks": 0,
+        "qdrant_points_checked": 0,
+        "orphaned_points": 0,
+        "deleted_orphaned_points": 0,
+        "sample_chunks_missing_vectors": [],
+        "sample_orphaned_points": []
+    }
+
+    collection = await read_collection(tenant_id)
+    await _check_postgres_chunks(tenant_id, collection, repair, report, job)
+    if await collection_exists(collection):
+        await _check_qdrant_points(tenant_id, collection, repair, report, job)
+
+    logger.info(
+        "tenant_reconciled",
+        extra={key: value for key, value in report.items() if not key.startswith("sample_")}
+    )
+    return report
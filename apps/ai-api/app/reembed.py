@@ -0,0 +1,235 @@
+"""
+Re-embedding backfill: rebuild a logical Qdrant collection with another
+embedding model or size (e.g. text-embedding-3-small at 512 dimensions
+instead of 1536) while it keeps serving traffic.
+
+reembed_collection() runs in five steps:
+    1. create a new physical collection and register it as 'building': from
+       then on every write to the logical collection also goes there,
+       embedded with the new model
+    2. wait one routing TTL, so every worker has started writing to it
+    3. embed the collection's chunks from Postgres into it, in batches of
+       REEMBED_BATCH_SIZE with REEMBED_BATCH_DELAY_MS between them
+    4. switch: the new collection becomes 'active' in the collection_versions
+       table (one transaction), so reads and query embeddings follow within
+       one routing TTL
+    5. wait one routing TTL, then drop the old collection
+
+The collection_versions table is the only cutover: every read and write
+resolves the logical name to its physical collection and model there (see
+app/tenant_router.py), so no query is embedded with one model and searched in
+a collection built with another. Nothing addresses a physical collection by
+the logical name, so no Qdrant alias is kept; a collection created before
+versions existed carries the logical name itself and is dropped in step 5
+like any other retired version.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.chunk_storage import CHUNK_CONTENT_SQL, chunk_payload
+from app.database import get_engine
+from app.embeddings import get_embedding_provider, get_embeddings
+from app.jobs import Job
+from app.qdrant_client import get_qdrant_client, ensure_collection_exists, drop_collection, COLLECTION_NAME
+from app.resilience import call, run_blocking
+from app.tenant_router import (
+    VectorTarget, TENANT_ROUTING_TTL_SECONDS, collection_exists, forget_versions, load_versions
+)
+
+logger = logging.getLogger(__name__)
+
+REEMBED_BATCH_SIZE = int(os.getenv("REEMBED_BATCH_SIZE", "256"))
+REEMBED_BATCH_DELAY_SECONDS = float(os.getenv("REEMBED_BATCH_DELAY_MS", "200")) / 1000
+
+
+async def list_logical_collections() -> List[str]:
+    """The shared collection plus every collection a tenant is placed in or moving to."""
+    engine = get_engine()
+    async with engine.connect() as conn:
+        result = await conn.execute(text("""
+            SELECT collection FROM tenant_placements
+            UNION
+            SELECT migrating_to FROM tenant_placements WHERE migrating_to IS NOT NULL
+        """))
+        placed = {row[0] for row in result.fetchall()}
+    return [COLLECTION_NAME] + sorted(placed - {COLLECTION_NAME})
+
+
+async def _register_building(logical: str, target: VectorTarget):
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO collection_versions (name, logical, embedding_model, dimensions, status)
+                VALUES (:name, :logical, :model, :dimensions, 'building')
+                ON CONFLICT (name) DO NOTHING
+            """),
+            {"name": target.collection, "logical": logical, "model": target.model, "dimensions": target.dimensions}
+        )
+    forget_versions(logical)
+
+
+async def _discard_version(logical: str, name: str):
+    if await collection_exists(name):
+        await drop_collection(name)
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM collection_versions WHERE name = :name"), {"name": name})
+    forget_versions(logical)
+
+
+async def _activate(logical: str, name: str):
+    """Make `name` the active version of the logical collection (one transaction)."""
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE collection_versions SET status = 'retired' WHERE logical = :logical AND status = 'active'"),
+            {"logical": logical}
+        )
+        await conn.execute(
+            text("UPDATE collection_versions SET status = 'active' WHERE name = :name"),
+            {"name": name}
+        )
+    forget_versions(logical)
+
+
+async def _backfill(logical: str, target: VectorTarget, job: Optional[Job]) -> int:
+    """Embed every chunk served by the logical collection into the target (keyset walk)."""
+    from qdrant_client.models import Batch
+
+    engine = get_engine()
+    qdrant = get_qdrant_client()
+    last_id = None
+    embedded = 0
+
+    while True:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(f"""
+                    SELECT c.id, c.document_id, c.tenant_id, c.chunk_index, {CHUNK_CONTENT_SQL}, d.title, d.source
+                    FROM chunks c
+                    JOIN documents d ON c.document_id = d.id
+                    LEFT JOIN tenant_placements p ON p.tenant_id = c.tenant_id
+                    WHERE (COALESCE(p.collection, :shared) = :logical OR p.migrating_to = :logical)
+                      AND (CAST(:last_id AS UUID) IS NULL OR c.id > CAST(:last_id AS UUID))
+                    ORDER BY c.id
+                    LIMIT :limit
+                """),
+                {"shared": COLLECTION_NAME, "logical": logical, "last_id": last_id, "limit": REEMBED_BATCH_SIZE}
+            )
+            rows = result.fetchall()
+        if not rows:
+            return embedded
+
+        vectors = await get_embeddings(
+            [row[4] for row in rows], model=target.model, dimensions=target.dimensions
+        )
+        points = Batch(
+            ids=[str(row[0]) for row in rows],
+            vectors=vectors,
+            payloads=[
+                chunk_payload(str(row[1]), str(row[0]), row[2], row[3], row[4], row[5], row[6])
+                for row in rows
+            ]
+        )
+        await call(
+            "qdrant",
+            lambda: run_blocking("qdrant", qdrant.upsert, collection_name=target.collection, points=points)
+        )
+        embedded += len(rows)
+        last_id = str(rows[-1][0])
+        if job:
+            job.update(embedded_chunks=embedded)
+        # Throttle: leave embedding quota and Qdrant capacity for live traffic
+        await asyncio.sleep(REEMBED_BATCH_DELAY_SECONDS)
+
+
+async def reembed_collection(
+    logical: str = COLLECTION_NAME,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None,
+    job: Optional[Job] = None
+) -> Dict:
+    """
+    Rebuild a logical collection with another embedding model or size, online.
+    Re-running with the same model and size after a failure resumes the
+    unfinished build (upserts are idempotent); another model or size replaces it.
+
+    Args:
+        logical: Logical collection (COLLECTION_NAME or a tenant's dedicated collection)
+        model: Embedding model (defaults to the configured provider's)
+        dimensions: Vector size (defaults to EMBEDDING_DIMENSIONS for the configured
+            model, else the model's full size)
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with collection, from/to physical collection, model, dimensions and embedded_chunks
+
+    Raises:
+        ValueError: If the model/size is invalid (e.g. more dimensions than the model has)
+    """
+    if model is None and dimensions is None:
+        provider = get_embedding_provider()
+    else:
+        provider = get_embedding_provider(model or get_embedding_provider().model, dimensions)
+    spec_model, spec_dimensions = provider.model, await provider.get_dimension()
+    active, building = await load_versions(logical)
+    if (active.model, active.dimensions) == (spec_model, spec_dimensions) and not building:
+        # Already there: nothing to rebuild
+        return {
+            "collection": logical,
+            "from_collection": active.collection,
+            "to_collection": active.collection,
+            "embedding_model": spec_model,
+            "dimensions": spec_dimensions,
+            "embedded_chunks": 0
+        }
+
+    target = None
+    for version in building:
+        if (version.model, version.dimensions) == (spec_model, spec_dimensions) and target is None:
+            target = version
+        else:
+            # Superseded by this request: never served reads, so it can go
+            await _discard_version(logical, version.collection)
+    if target is None:
+        target = VectorTarget(f"{logical}_v{int(time.time())}_{uuid.uuid4().hex[:6]}", spec_model, spec_dimensions)
+
+    result = {
+        "collection": logical,
+        "from_collection": active.collection,
+        "to_collection": target.collection,
+        "embedding_model": spec_model,
+        "dimensions": spec_dimensions,
+        "embedded_chunks": 0
+    }
+
+    def progress(phase: str):
+        logger.info("collection_reembed", extra={**result, "phase": phase})
+        if job:
+            job.update(phase=phase)
+
+    progress("dual_write")
+    await ensure_collection_exists(spec_dimensions, target.collection)
+    await _register_building(logical, target)
+    await asyncio.sleep(TENANT_ROUTING_TTL_SECONDS)
+
+    progress("backfill")
+    result["embedded_chunks"] = await _backfill(logical, target, job)
+
+    progress("switch")
+    await _activate(logical, target.collection)
+    # Workers still using the old version pick up the switch within one TTL
+    await asyncio.sleep(TENANT_ROUTING_TTL_SECONDS)
+
+    progress("cleanup")
+    await _discard_version(logical, active.collection)
+
+    logger.info("collection_reembedded", extra=result)
+    return result
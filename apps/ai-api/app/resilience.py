@@ -0,0 +1,399 @@
+"""
+Resilience layer for upstream calls (OpenAI, Qdrant, Postgres).
+
+Each dependency gets:
+- a timeout per attempt ({NAME}_TIMEOUT_SECONDS)
+- jittered exponential retries on transient errors, for idempotent calls
+  only ({NAME}_MAX_RETRIES)
+- a circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failed calls
+  (a call fails once, however many attempts it made), calls fail fast for
+  CIRCUIT_RESET_SECONDS; then a single trial call decides whether the circuit
+  closes again
+- optionally a hedged second request once the first has run longer than the
+  dependency's recent p95 latency
+- for blocking clients (Qdrant), a bounded thread pool of {NAME}_MAX_THREADS
+  (see run_blocking)
+
+Breaker states are reported on /ready and exported as metrics.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.metrics import CIRCUIT_STATE, UPSTREAM_CALLS, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (timeout seconds, max retries) per dependency; override with {NAME}_TIMEOUT_SECONDS / {NAME}_MAX_RETRIES
+DEPENDENCY_DEFAULTS = {
+    "openai_embeddings": (10.0, 2),
+    "openai_chat": (30.0, 1),
+    "qdrant": (5.0, 2),
+    "postgres": (5.0, 2),
+}
+
+# Threads per dependency for blocking client calls; override with {NAME}_MAX_THREADS
+DEFAULT_MAX_THREADS = 16
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+RETRY_BASE_SECONDS = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.2"))
+RETRY_MAX_SECONDS = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "2"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_MS", "50")) / 1000
+
+# Latency samples kept per dependency; hedging starts once HEDGE_MIN_SAMPLES are in
+LATENCY_WINDOW = 256
+HEDGE_MIN_SAMPLES = 20
+
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class UpstreamUnavailableError(Exception):
+    """An upstream dependency is unavailable; the request may succeed later."""
+
+    def __init__(self, dependency: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised without calling the dependency while its circuit is open."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(dependency, f"{dependency} is unavailable (circuit open)", retry_after)
+
+
+class UpstreamTimeoutError(UpstreamUnavailableError):
+    """The dependency didn't answer within its timeout."""
+
+    def __init__(self, dependency: str, timeout: float):
+        super().__init__(dependency, f"{dependency} timed out after {timeout:g}s", timeout)
+
+
+# Failures of the connection or the wait, not of the request itself
+_TRANSIENT_ERRORS = (
+    UpstreamUnavailableError,
+    asyncio.TimeoutError,
+    OSError,  # includes ConnectionError
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+    OperationalError,  # connection lost, server shutting down
+    InterfaceError
+)
+_TRANSIENT_STATUS_CODES = (408, 429)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Decide whether a failed upstream call is worth retrying.
+    Only failures that say nothing about the request itself are transient:
+    timeouts, network errors, database connection errors and 5xx/408/429
+    responses. Everything else (bad requests, constraint violations, bugs)
+    is permanent.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True if the call may succeed when retried
+    """
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500 or status_code in _TRANSIENT_STATUS_CODES
+    # Client libraries are imported lazily: if one isn't loaded, the error can't be its own
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(error, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    qdrant_exceptions = sys.modules.get("qdrant_client.http.exceptions")
+    if qdrant_exceptions is not None and isinstance(error, qdrant_exceptions.ResponseHandlingException):
+        # Wraps the transport error of a request that got no usable response
+        return isinstance(error.source, Exception) and is_transient_error(error.source)
+    return False
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half_open -> closed)."""
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning("circuit_state_changed", extra={"dependency": self.name, "state": state})
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed."""
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def before_call(self):
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial already running
+        """
+        if self.state == "open":
+            if self.retry_after() > 0:
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._set_state("half_open")
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.name, self.reset_seconds)
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_in_flight = False
+        self._set_state("closed")
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+    def release(self):
+        """Give up a trial slot without an outcome (e.g. the caller was cancelled)."""
+        self._trial_in_flight = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {"state": self.state, "consecutive_failures": self.failures}
+        if self.state == "open":
+            status["retry_after_seconds"] = round(self.retry_after(), 1)
+        return status
+
+
+class Dependency:
+    """Timeout, retry and breaker settings plus recent latencies for one upstream."""
+
+    def __init__(self, name: str, timeout: float, max_retries: int, max_threads: int = DEFAULT_MAX_THREADS):
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_threads = max_threads
+        self.breaker = CircuitBreaker(name)
+        self.thread_slots = threading.BoundedSemaphore(max_threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool for this dependency's blocking calls (created on first use)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix=self.name)
+        return self._executor
+
+    def observe(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of recent successful calls (None until enough samples)."""
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return max(HEDGE_MIN_DELAY_SECONDS, ordered[int(0.95 * (len(ordered) - 1))])
+
+
+_dependencies: Dict[str, Dependency] = {}
+
+
+def get_dependency(name: str) -> Dependency:
+    """Get (or create from env/defaults) the settings for a dependency."""
+    dependency = _dependencies.get(name)
+    if dependency is None:
+        default_timeout, default_retries = DEPENDENCY_DEFAULTS.get(name, (10.0, 0))
+        prefix = name.upper()
+        dependency = Dependency(
+            name,
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT_SECONDS", str(default_timeout))),
+            max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", str(default_retries))),
+            max_threads=max(1, int(os.getenv(f"{prefix}_MAX_THREADS", str(DEFAULT_MAX_THREADS))))
+        )
+        _dependencies[name] = dependency
+    return dependency
+
+
+def get_timeout(name: str) -> float:
+    """Per-attempt timeout of a dependency (for configuring client-side timeouts)."""
+    return get_dependency(name).timeout
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state of every dependency called so far (for /ready)."""
+    return {name: dependency.breaker.to_dict() for name, dependency in sorted(_dependencies.items())}
+
+
+async def run_blocking(name: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking client call on the dependency's own bounded thread pool.
+
+    call() stops waiting for an attempt at its timeout, but a thread can't be
+    interrupted: it runs until the client's own timeout (set from
+    get_timeout()) ends the request. The pool bounds how many such threads a
+    slow dependency can hold; once all {NAME}_MAX_THREADS are busy, further
+    calls fail fast (transient) instead of queueing behind them, and other
+    dependencies and the default executor are unaffected.
+
+    Args:
+        name: Dependency name (e.g., "qdrant")
+        func: Blocking callable
+        *args, **kwargs: Arguments for func
+
+    Returns:
+        The result of func(*args, **kwargs)
+
+    Raises:
+        UpstreamUnavailableError: If all of the dependency's threads are busy
+    """
+    dependency = get_dependency(name)
+    if not dependency.thread_slots.acquire(blocking=False):
+        raise UpstreamUnavailableError(
+            name,
+            f"{name} is saturated ({dependency.max_threads} blocking calls in flight)",
+            retry_after=dependency.timeout
+        )
+
+    def run():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            dependency.thread_slots.release()
+
+    future = dependency.executor().submit(run)
+    # A call cancelled before its thread started never runs, so run() can't release
+    future.add_done_callback(lambda f: dependency.thread_slots.release() if f.cancelled() else None)
+    return await asyncio.wrap_future(future)
+
+
+def _backoff_seconds(attempt: int) -> float:
+    # Full jitter: spreads retries from many requests instead of synchronizing them
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (attempt - 1))))
+
+
+async def _hedged(dependency: Dependency, func: Callable[[], Awaitable[T]]) -> T:
+    delay = dependency.hedge_delay()
+    if delay is None:
+        return await func()
+
+    primary = asyncio.ensure_future(func())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    hedge = asyncio.ensure_future(func())
+    labels = {primary: "primary", hedge: "hedge"}
+    try:
+        pending = set(labels)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    UPSTREAM_HEDGES.labels(dependency.name, labels[task]).inc()
+                    return task.result()
+        # Both failed: report the primary's error
+        return primary.result()
+    finally:
+        for task in labels:
+            if not task.done():
+                task.cancel()
+
+
+async def call(
+    name: str,
+    func: Callable[[], Awaitable[T]],
+    idempotent: bool = True,
+    hedge: bool = False
+) -> T:
+    """
+    Call an upstream dependency with timeout, retries and circuit breaker.
+
+    Args:
+        name: Dependency name (e.g., "openai_embeddings", "qdrant", "postgres")
+        func: Zero-argument coroutine function performing one attempt
+        idempotent: Retry transient failures (only safe if repeating the call has no extra effect)
+        hedge: Send a second request if the first exceeds the recent p95 latency
+
+    Returns:
+        The result of func()
+
+    Raises:
+        CircuitOpenError: If the dependency's circuit is open
+        UpstreamTimeoutError: If the last attempt timed out
+        Exception: The last attempt's error otherwise
+    """
+    dependency = get_dependency(name)
+    attempts = 1 + (dependency.max_retries if idempotent else 0)
+
+    # The breaker sees the logical call: admitted once, one outcome after the last attempt
+    try:
+        dependency.breaker.before_call()
+    except CircuitOpenError:
+        UPSTREAM_CALLS.labels(name, "rejected").inc()
+        raise
+
+    for attempt in range(1, attempts + 1):
+        start = time.perf_counter()
+        try:
+            attempt_call = _hedged(dependency, func) if hedge else func()
+            result = await asyncio.wait_for(attempt_call, timeout=dependency.timeout)
+        except asyncio.CancelledError:
+            dependency.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            error: Exception = UpstreamTimeoutError(name, dependency.timeout)
+            outcome = "timeout"
+        except Exception as e:
+            error = e
+            outcome = "error"
+        else:
+            dependency.breaker.record_success()
+            dependency.observe(time.perf_counter() - start)
+            UPSTREAM_CALLS.labels(name, "success").inc()
+            return result
+
+        UPSTREAM_CALLS.labels(name, outcome).inc()
+        if not is_transient_error(error):
+            # The dependency answered; a bad request says nothing about its health
+            dependency.breaker.record_success()
+            raise error
+
+        if attempt == attempts:
+            dependency.breaker.record_failure()
+            raise error
+
+        UPSTREAM_RETRIES.labels(name).inc()
+        delay = _backoff_seconds(attempt)
+        logger.warning(
+            "upstream_retry",
+            extra={"dependency": name, "attempt": attempt, "delay_seconds": round(delay, 3), "error": str(error)}
+        )
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            dependency.breaker.release()
+            raise
@@ -1,144 +1,317 @@
 """
 Postgres schema creation and management.
-Lightweight schema initialization without Alembic.
+Lightweight versioned migrations without Alembic.
+
+MIGRATIONS is an ordered list; schema_version records the ones applied.
+A boot whose schema is current costs one query. Otherwise the booting replica
+takes an advisory lock (so replicas starting together migrate once, one after
+the other) and applies the pending migrations in order.
+
+Migrations must be idempotent (IF NOT EXISTS): databases created before
+schema_version existed already have the objects of the early ones.
+A transactional migration runs in one transaction together with its
+schema_version row. A non-transactional one runs statement by statement in
+autocommit, which CREATE/DROP INDEX CONCURRENTLY requires, so new indexes on
+large tables are built without blocking writes. Append new migrations at the
+end; never edit or reorder applied ones.
 """
+import os
 import uuid
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from app.database import get_engine
 
+logger = logging.getLogger(__name__)
+
+# Rows deleted per transaction during tenant reset
+RESET_BATCH_SIZE = int(os.getenv("RESET_BATCH_SIZE", "5000"))
+
+# pg_advisory_lock key serializing migrations across replicas
+SCHEMA_LOCK_KEY = 7_310_044
+
+# Replaced with the configured default tenant (as a SQL literal) in statements
+DEFAULT_TENANT = "{default_tenant}"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change."""
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+    transactional: bool = True
+    # Indexes built CONCURRENTLY; an INVALID leftover of a failed attempt is dropped first
+    concurrent_indexes: Tuple[str, ...] = ()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "documents_and_chunks", (
+        f"""
+        CREATE TABLE IF NOT EXISTS documents (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            tenant_id TEXT NOT NULL DEFAULT {DEFAULT_TENANT},
+            source TEXT NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        # v0.6: tables created before multi-tenancy
+        f"ALTER TABLE documents ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT {DEFAULT_TENANT}",
+        f"""
+        CREATE TABLE IF NOT EXISTS chunks (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+            tenant_id TEXT NOT NULL DEFAULT {DEFAULT_TENANT},
+            chunk_index INT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            UNIQUE(document_id, chunk_index)
+        )
+        """,
+        f"ALTER TABLE chunks ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT {DEFAULT_TENANT}",
+        "CREATE INDEX IF NOT EXISTS idx_chunks_document_id ON chunks(document_id)",
+    )),
+    Migration(2, "tenant_indexes", (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_tenant_created ON documents(tenant_id, created_at)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_tenant_document ON chunks(tenant_id, document_id)",
+    ), transactional=False, concurrent_indexes=("idx_documents_tenant_created", "idx_chunks_tenant_document")),
+    # Neighbor lookups (document_id, chunk_index BETWEEN ...) use the index behind
+    # UNIQUE(document_id, chunk_index); a chunk_index-only index never helped any query
+    Migration(3, "drop_chunk_index_index", (
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_chunks_chunk_index",
+    ), transactional=False),
+    # Async ingestion job queue (see app/ingest_queue.py)
+    Migration(4, "ingest_jobs", (
+        """
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            id UUID PRIMARY KEY,
+            tenant_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INT NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            locked_until TIMESTAMPTZ,
+            document_id UUID,
+            chunks INT,
+            error TEXT,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_ingest_jobs_status_next ON ingest_jobs(status, next_attempt_at)",
+    )),
+    # Qdrant routing table: tenants outside the shared collection (see app/tenant_router.py)
+    Migration(5, "tenant_placements", (
+        """
+        CREATE TABLE IF NOT EXISTS tenant_placements (
+            tenant_id TEXT PRIMARY KEY,
+            collection TEXT NOT NULL,
+            migrating_to TEXT,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+    )),
+    # Physical collections behind each logical one and their embedding model/size (see app/reembed.py)
+    Migration(6, "collection_versions", (
+        """
+        CREATE TABLE IF NOT EXISTS collection_versions (
+            name TEXT PRIMARY KEY,
+            logical TEXT NOT NULL,
+            embedding_model TEXT NOT NULL,
+            dimensions INT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_collection_versions_logical ON collection_versions(logical, status)",
+    )),
+    # Offset chunk storage (see app/chunk_storage.py): chunks may reference their
+    # document's text instead of copying it; existing rows are converted by
+    # POST /admin/chunk-storage/compact, not here (no long rewrite at boot)
+    Migration(7, "chunk_offsets", (
+        "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS start_offset INT",
+        "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS end_offset INT",
+        "ALTER TABLE chunks ALTER COLUMN content DROP NOT NULL",
+    )),
+    # Admin background jobs, visible from every worker (see app/jobs.py)
+    Migration(8, "admin_jobs", (
+        """
+        CREATE TABLE IF NOT EXISTS admin_jobs (
+            id UUID PRIMARY KEY,
+            kind TEXT NOT NULL,
+            tenant_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress JSONB NOT NULL DEFAULT '{}',
+            result JSONB,
+            error TEXT,
+            locked_until TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            finished_at TIMESTAMPTZ
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_admin_jobs_active ON admin_jobs(kind, tenant_id) WHERE finished_at IS NULL",
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+async def get_schema_version() -> int:
+    """Highest applied migration (0 on a database without schema_version)."""
+    engine = get_engine()
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT MAX(version) FROM schema_version"))
+            return result.scalar() or 0
+    except DBAPIError:
+        # UndefinedTable: first boot, or a database from before versioned migrations
+        return 0
+
+
+async def _drop_invalid_indexes(conn, names: Tuple[str, ...]):
+    result = await conn.execute(
+        text("""
+            SELECT c.relname FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE NOT i.indisvalid AND c.relname = ANY(:names)
+        """),
+        {"names": list(names)}
+    )
+    for (name,) in result.fetchall():
+        logger.warning("schema_invalid_index_dropped", extra={"index": name})
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+async def _apply(migration: Migration, default_tenant: str):
+    engine = get_engine()
+    statements = [
+        statement.replace(DEFAULT_TENANT, _sql_literal(default_tenant))
+        for statement in migration.statements
+    ]
+    record = text("INSERT INTO schema_version (version, name) VALUES (:version, :name)")
+    params = {"version": migration.version, "name": migration.name}
+
+    if migration.transactional:
+        async with engine.begin() as conn:
+            for statement in statements:
+                await conn.execute(text(statement))
+            await conn.execute(record, params)
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if migration.concurrent_indexes:
+            await _drop_invalid_indexes(conn, migration.concurrent_indexes)
+        for statement in statements:
+            await conn.execute(text(statement))
+        await conn.execute(record, params)
+
 
 async def ensure_schema_exists():
     """
-    Create Postgres tables if they don't exist.
-    Runs on startup to ensure schema is initialized.
-    Handles v0.6 tenant_id migration for existing tables.
+    Apply pending schema migrations.
+    Runs on startup; a no-op (one query) when the schema is current.
     """
     from app.auth import get_default_tenant_id
-    
+
+    if await get_schema_version() >= LATEST_VERSION:
+        return
+
     engine = get_engine()
-    default_tenant = get_default_tenant_id()
-    
-    async with engine.begin() as conn:
-        # Create documents table
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS documents (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                tenant_id TEXT NOT NULL DEFAULT :default_tenant,
-                source TEXT NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW()
-            )
-        """), {"default_tenant": default_tenant})
-        
-        # Add tenant_id column if table exists but column doesn't (migration)
-        # Use format to inject default value since DO blocks don't support parameters
-        await conn.execute(text(f"""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns 
-                    WHERE table_name = 'documents' AND column_name = 'tenant_id'
-                ) THEN
-                    ALTER TABLE documents ADD COLUMN tenant_id TEXT NOT NULL DEFAULT '{default_tenant}';
-                END IF;
-            END $$;
-        """))
-        
-        # Create chunks table
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS chunks (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
-                tenant_id TEXT NOT NULL DEFAULT :default_tenant,
-                chunk_index INT NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                UNIQUE(document_id, chunk_index)
-            )
-        """), {"default_tenant": default_tenant})
-        
-        # Add tenant_id column if table exists but column doesn't (migration)
-        # Use format to inject default value since DO blocks don't support parameters
-        await conn.execute(text(f"""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns 
-                    WHERE table_name = 'chunks' AND column_name = 'tenant_id'
-                ) THEN
-                    ALTER TABLE chunks ADD COLUMN tenant_id TEXT NOT NULL DEFAULT '{default_tenant}';
-                END IF;
-            END $$;
-        """))
-        
-        # Create indexes for faster lookups
-        await conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_chunks_document_id 
-            ON chunks(document_id)
-        """))
-        
-        await conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_chunks_chunk_index 
-            ON chunks(chunk_index)
-        """))
-        
-        # Create tenant_id indexes for v0.6
-        await conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_documents_tenant_created 
-            ON documents(tenant_id, created_at)
-        """))
-        
-        await conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_chunks_tenant_document 
-            ON chunks(tenant_id, document_id)
-        """))
+    # Session-level advisory lock on its own connection, held across all
+    # migrations (each runs on its own connection/transaction)
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        try:
+            await lock_conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """))
+            # Another replica may have migrated while we waited for the lock
+            result = await lock_conn.execute(text("SELECT version FROM schema_version"))
+            applied = {row[0] for row in result.fetchall()}
+            default_tenant = get_default_tenant_id()
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                await _apply(migration, default_tenant)
+                logger.info("schema_migrated", extra={"version": migration.version, "migration": migration.name})
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
 
 
-async def delete_tenant_data(conn, tenant_id: str) -> tuple[int, int]:
+async def delete_tenant_data(
+    tenant_id: str,
+    batch_size: int = RESET_BATCH_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> tuple[int, int]:
     """
-    Delete all data for a tenant from Postgres.
+    Delete all data for a tenant from Postgres in bounded batches.
+    Each batch runs in its own short transaction, so locks are held briefly
+    and a large tenant cannot stall other writers or time out the request.
+    Counts come from the DELETE row counts (no separate COUNT(*) scans).
     
     Args:
-        conn: SQLAlchemy connection (async)
         tenant_id: Tenant ID to delete data for
+        batch_size: Maximum rows deleted per transaction
+        on_progress: Optional callback(documents_deleted, chunks_deleted) after each batch
         
     Returns:
         Tuple of (documents_deleted, chunks_deleted)
     """
-    # First, count chunks before deletion (for return value)
-    chunks_result = await conn.execute(
-        text("""
-            SELECT COUNT(*) FROM chunks WHERE tenant_id = :tenant_id
-        """),
-        {"tenant_id": tenant_id}
-    )
-    chunks_count = chunks_result.scalar() or 0
-    
-    # Count documents before deletion
-    docs_result = await conn.execute(
-        text("""
-            SELECT COUNT(*) FROM documents WHERE tenant_id = :tenant_id
-        """),
-        {"tenant_id": tenant_id}
-    )
-    docs_count = docs_result.scalar() or 0
+    engine = get_engine()
+    docs_deleted = 0
+    chunks_deleted = 0
     
     # Delete chunks first (they reference documents via FK)
-    # Note: CASCADE should handle this, but being explicit
-    await conn.execute(
-        text("""
-            DELETE FROM chunks WHERE tenant_id = :tenant_id
-        """),
-        {"tenant_id": tenant_id}
-    )
+    # Note: CASCADE would handle this, but batching chunks keeps each transaction small
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("""
+                    DELETE FROM chunks
+                    WHERE id IN (
+                        SELECT id FROM chunks WHERE tenant_id = :tenant_id LIMIT :batch_size
+                    )
+                """),
+                {"tenant_id": tenant_id, "batch_size": batch_size}
+            )
+        chunks_deleted += result.rowcount
+        if on_progress:
+            on_progress(docs_deleted, chunks_deleted)
+        if result.rowcount < batch_size:
+            break
     
     # Delete documents
-    await conn.execute(
-        text("""
-            DELETE FROM documents WHERE tenant_id = :tenant_id
-        """),
-        {"tenant_id": tenant_id}
-    )
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("""
+                    DELETE FROM documents
+                    WHERE id IN (
+                        SELECT id FROM documents WHERE tenant_id = :tenant_id LIMIT :batch_size
+                    )
+                """),
+                {"tenant_id": tenant_id, "batch_size": batch_size}
+            )
+        docs_deleted += result.rowcount
+        if on_progress:
+            on_progress(docs_deleted, chunks_deleted)
+        if result.rowcount < batch_size:
+            break
     
-    return docs_count, chunks_count
\ No newline at end of file
+    return docs_deleted, chunks_deleted
@@ -0,0 +1,243 @@
+"""
+Precomputed seed snapshot: the seed documents, their chunks and vectors in a
+bundle file (see app/bundle.py), one per embedding model, shipped with the app.
+
+Seeding bulk-loads the snapshot into Postgres and Qdrant without embedding
+calls. If no snapshot matches the configured embedding model or seed.py has
+changed since it was built, seeding falls back to regular ingestion.
+
+Regenerate after editing seed.py (uses the configured embedding provider):
+    python -m app.seed_snapshot
+    EMBEDDING_PROVIDER=local python -m app.seed_snapshot
+"""
+import json
+import uuid
+import hashlib
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.bundle import read_bundle, write_bundle
+from app.chunk_storage import chunk_spans, chunk_payload, stored_content
+from app.database import get_engine
+from app.embeddings import get_embedding_provider
+from app.ingest import chunk_text, ingest_document, make_chunk_id, CHUNK_SIZE, CHUNK_OVERLAP
+from app.tenant_router import read_target, upsert_points
+from app.seed import get_seed_documents
+
+logger = logging.getLogger(__name__)
+
+SEED_SNAPSHOT_DIR = Path(__file__).resolve().parent / "seed_snapshots"
+
+# Namespace for deterministic seed document IDs
+SEED_NAMESPACE = uuid.UUID("6f1c1c9e-3f0b-5e7a-9a7e-2b8d4a1e9c55")
+
+_snapshot_cache: Dict[str, Optional[tuple]] = {}
+
+
+def seed_fingerprint() -> str:
+    """Hash of the seed dataset; a snapshot is stale when this changes."""
+    payload = json.dumps(get_seed_documents(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def seed_document_id(tenant_id: str, title: str) -> str:
+    """
+    Deterministic document ID for a seed document of a tenant.
+    Re-seeding the same tenant therefore never duplicates documents.
+    """
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{tenant_id}:{title}"))
+
+
+def snapshot_path(embedding_model: str) -> Path:
+    """Snapshot file for an embedding model."""
+    return SEED_SNAPSHOT_DIR / f"{embedding_model}.bundle"
+
+
+async def build_seed_snapshot() -> Path:
+    """
+    Build the seed snapshot for the configured embedding provider.
+
+    Returns:
+        Path of the written snapshot file
+    """
+    provider = get_embedding_provider()
+    dimension = await provider.get_dimension()
+
+    documents = []
+    chunk_records = []
+    for doc_index, doc in enumerate(get_seed_documents()):
+        documents.append({"index": doc_index, "source": doc["source"], "title": doc["title"], "content": doc["content"]})
+        for chunk_index, chunk_content in enumerate(chunk_text(doc["content"])):
+            chunk_records.append({"document": doc_index, "chunk_index": chunk_index, "content": chunk_content})
+
+    # One embedding call for the whole dataset
+    vectors = await provider.embed([record["content"] for record in chunk_records])
+
+    header = {
+        "kind": "seed_snapshot",
+        "dimension": dimension,
+        "embedding_provider": provider.name,
+        "embedding_model": provider.model,
+        "seed_fingerprint": seed_fingerprint(),
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+    path = snapshot_path(provider.model)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_bundle(str(path), header, documents, list(zip(chunk_records, vectors)))
+    return path
+
+
+def load_seed_snapshot(embedding_model: str, dimension: int) -> Optional[tuple]:
+    """
+    Load the snapshot for an embedding model if it is usable.
+
+    Args:
+        embedding_model: Configured embedding model
+        dimension: Configured vector size
+
+    Returns:
+        Tuple of (header, documents, chunks, vectors), or None if missing or stale
+    """
+    if embedding_model in _snapshot_cache:
+        return _snapshot_cache[embedding_model]
+
+    path = snapshot_path(embedding_model)
+    snapshot = None
+    if not path.exists():
+        logger.info("seed_snapshot_missing", extra={"embedding_model": embedding_model})
+    else:
+        header, documents, chunks, vectors = read_bundle(path.read_bytes())
+        if header.get("seed_fingerprint") != seed_fingerprint():
+            logger.warning("seed_snapshot_stale", extra={"path": str(path)})
+        elif header.get("dimension") != dimension:
+            logger.warning("seed_snapshot_dimension_mismatch", extra={"path": str(path)})
+        else:
+            snapshot = (header, documents, chunks, vectors)
+
+    _snapshot_cache[embedding_model] = snapshot
+    return snapshot
+
+
+async def _load_snapshot_into_tenant(tenant_id: str, snapshot: tuple) -> List[dict]:
+    header, documents, chunks, vectors = snapshot
+    document_ids = {doc["index"]: seed_document_id(tenant_id, doc["title"]) for doc in documents}
+    documents_by_index = {doc["index"]: doc for doc in documents}
+
+    # Offsets of each chunk in its document (a document's chunks are listed in chunk_index order)
+    spans = {}
+    for doc in documents:
+        doc_chunks = [chunk for chunk in chunks if chunk["document"] == doc["index"]]
+        located = chunk_spans(doc["content"], [chunk["content"] for chunk in doc_chunks])
+        spans.update(((chunk["document"], chunk["chunk_index"]), span) for chunk, span in zip(doc_chunks, located))
+
+    chunk_rows = []
+    for chunk in chunks:
+        document_id = document_ids[chunk["document"]]
+        span = spans[(chunk["document"], chunk["chunk_index"])]
+        chunk_rows.append({
+            "id": make_chunk_id(document_id, chunk["chunk_index"]),
+            "document_id": document_id,
+            "tenant_id": tenant_id,
+            "chunk_index": chunk["chunk_index"],
+            "content": stored_content(chunk["content"], span),
+            "start_offset": span[0] if span else None,
+            "end_offset": span[1] if span else None
+        })
+
+    # Bulk insert: one transaction, one executemany per table
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO documents (id, tenant_id, source, title, content)
+                VALUES (:id, :tenant_id, :source, :title, :content)
+                ON CONFLICT (id) DO NOTHING
+            """),
+            [
+                {
+                    "id": document_ids[doc["index"]],
+                    "tenant_id": tenant_id,
+                    "source": doc["source"],
+                    "title": doc["title"],
+                    "content": doc["content"]
+                }
+                for doc in documents
+            ]
+        )
+        await conn.execute(
+            text("""
+                INSERT INTO chunks (id, document_id, tenant_id, chunk_index, content, start_offset, end_offset)
+                VALUES (:id, :document_id, :tenant_id, :chunk_index, :content, :start_offset, :end_offset)
+                ON CONFLICT (id) DO NOTHING
+            """),
+            chunk_rows
+        )
+
+    # One Qdrant upsert for all points, vectors straight from the snapshot
+    await upsert_points(
+        tenant_id,
+        ids=[row["id"] for row in chunk_rows],
+        payloads=[
+            chunk_payload(
+                row["document_id"], row["id"], tenant_id, row["chunk_index"], chunk["content"],
+                documents_by_index[chunk["document"]]["title"], documents_by_index[chunk["document"]]["source"]
+            )
+            for row, chunk in zip(chunk_rows, chunks)
+        ],
+        texts=[chunk["content"] for chunk in chunks],
+        vectors=vectors.tolist(),
+        model=header["embedding_model"]
+    )
+
+    chunk_counts: Dict[int, int] = {}
+    for chunk in chunks:
+        chunk_counts[chunk["document"]] = chunk_counts.get(chunk["document"], 0) + 1
+
+    return [
+        {"title": doc["title"], "document_id": document_ids[doc["index"]], "chunks": chunk_counts.get(doc["index"], 0)}
+        for doc in documents
+    ]
+
+
+async def seed_tenant(tenant_id: str) -> List[dict]:
+    """
+    Seed a tenant with the default dataset.
+    Uses the precomputed snapshot when it matches the embedding model and
+    size of the tenant's collection, otherwise ingests (and embeds) each seed document.
+
+    Args:
+        tenant_id: Tenant ID to seed
+
+    Returns:
+        List of dicts with title, document_id, chunks
+    """
+    target = await read_target(tenant_id)
+    snapshot = load_seed_snapshot(target.model, target.dimensions)
+    if snapshot is not None:
+        return await _load_snapshot_into_tenant(tenant_id, snapshot)
+
+    results = []
+    for doc in get_seed_documents():
+        document_id, num_chunks = await ingest_document(
+            source=doc["source"],
+            title=doc["title"],
+            content=doc["content"],
+            tenant_id=tenant_id,
+            document_id=seed_document_id(tenant_id, doc["title"])
+        )
+        results.append({"title": doc["title"], "document_id": document_id, "chunks": num_chunks})
+    return results
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    written = asyncio.run(build_seed_snapshot())
+    print(f"Seed snapshot written to {written}")
@@ -0,0 +1,77 @@
+"""
+Per-request stage timings exposed via the Server-Timing header.
+"""
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# Timings for the request being handled ({stage: duration_ms})
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def record_timing(stage: str, duration_ms: float):
+    """
+    Add a stage duration to the current request's timings.
+    No-op outside of a request (e.g. startup or background jobs).
+
+    Args:
+        stage: Stage name (e.g., "embed", "qdrant_search")
+        duration_ms: Stage duration in milliseconds
+    """
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + duration_ms
+
+
+def get_request_timings(request: Request) -> Dict[str, float]:
+    """
+    Get the stage timings recorded so far for a request.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        Dict of stage name to duration in milliseconds (rounded to 0.1ms)
+    """
+    timings = getattr(request.state, "timings", None) or {}
+    return {stage: round(duration, 1) for stage, duration in timings.items()}
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """
+    Format timings as a Server-Timing header value.
+
+    Args:
+        timings: Dict of stage name to duration in milliseconds
+
+    Returns:
+        Header value, e.g. "embed;dur=120.4, qdrant_search;dur=8.2"
+    """
+    return ", ".join(f"{stage};dur={duration:.1f}" for stage, duration in timings.items())
+
+
+class ServerTimingMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware to collect per-stage timings in request.state.timings
+    and return them in a Server-Timing header.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        timings: Dict[str, float] = {}
+        request.state.timings = timings
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+
+        try:
+            response = await call_next(request)
+        finally:
+            _request_timings.reset(token)
+
+        # Only annotate requests that recorded stages (/search, /chat, /ingest)
+        if timings:
+            timings["total"] = (time.perf_counter() - start) * 1000
+            response.headers["Server-Timing"] = format_server_timing(timings)
+
+        return response
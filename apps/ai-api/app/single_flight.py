@@ -0,0 +1,71 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+When a promotion goes live, many users send the same /chat question within
+seconds. The first request for a key starts the computation; identical
+requests arriving while it runs await the same task and get the same result.
+Nothing is kept once the task completes: the next request for the key
+computes again (this is not a cache).
+
+The computation runs as its own task, so a caller that disconnects doesn't
+cancel it for the others; it is cancelled only when every caller waiting on
+it has gone.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.metrics import SINGLE_FLIGHT_REQUESTS
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one computation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run func() for key, or join the run already in flight.
+
+        Args:
+            key: Identity of the work (requests with equal keys share one result)
+            func: Coroutine function computing the result
+
+        Returns:
+            Tuple of (result, shared); shared is True when this call joined
+            another caller's computation
+
+        Raises:
+            Whatever func() raises, to every caller sharing the computation
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        SINGLE_FLIGHT_REQUESTS.labels(self.name, "shared" if shared else "leader").inc()
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if self._waiters.get(key, 0) <= 1 and not task.done():
+                # Last interested caller gone: stop the computation
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(key, 0) - 1
+            if remaining > 0:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when no caller is left to await it
+            task.exception()
@@ -0,0 +1,198 @@
+"""
+Per-tenant request and token budgets (in-memory, per process).
+
+Requests to /search, /chat and /ingest count against a per-minute request
+budget. OpenAI token usage (the `usage` field of embedding and chat
+responses) counts against a sliding one-hour token budget; a tenant over
+budget is rejected with 429 until enough usage ages out of the window.
+
+Budgets default to TENANT_REQUESTS_PER_MINUTE / TENANT_TOKENS_PER_HOUR
+(0 = unlimited). TENANT_QUOTAS overrides them per tenant and sets the
+tenant's weight for fair LLM scheduling (see app/fair_queue.py):
+    TENANT_QUOTAS='{"acme": {"requests_per_minute": 600, "tokens_per_hour": 2000000, "weight": 3}}'
+
+Budgets are configured for the whole instance but counted in each worker
+process, so each of the WEB_CONCURRENCY workers enforces its share
+(limit / workers, rounded up). Requests spread evenly across workers, so the
+instance as a whole stays close to the configured budget.
+"""
+import os
+import json
+import math
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from app.metrics import TENANT_QUOTA_REJECTIONS, TENANT_TOKENS, register_tenant_labels, tenant_label
+
+TENANT_REQUESTS_PER_MINUTE = int(os.getenv("TENANT_REQUESTS_PER_MINUTE", "0"))
+TENANT_TOKENS_PER_HOUR = int(os.getenv("TENANT_TOKENS_PER_HOUR", "0"))
+TENANT_DEFAULT_WEIGHT = int(os.getenv("TENANT_DEFAULT_WEIGHT", "1"))
+
+REQUEST_WINDOW_SECONDS = 60
+TOKEN_WINDOW_SECONDS = 3600
+# Token usage is kept in per-minute buckets, so memory per tenant stays bounded
+_TOKEN_BUCKET_SECONDS = 60
+# Tenants with nothing left in their windows are forgotten this often, so
+# client-supplied tenant IDs don't accumulate
+_SWEEP_INTERVAL_SECONDS = 60
+
+
+def _load_overrides() -> Dict[str, dict]:
+    raw = os.getenv("TENANT_QUOTAS", "")
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"TENANT_QUOTAS is not valid JSON: {e}")
+    if not isinstance(overrides, dict):
+        raise ValueError("TENANT_QUOTAS must be a JSON object keyed by tenant ID")
+    return overrides
+
+
+_overrides = _load_overrides()
+register_tenant_labels(_overrides)
+
+# {tenant: deque of request timestamps}
+_request_times: Dict[str, Deque[float]] = {}
+# {tenant: deque of [bucket_start, tokens]}
+_token_buckets: Dict[str, Deque[list]] = {}
+_last_sweep = 0.0
+
+
+class QuotaExceededError(Exception):
+    """A tenant exceeded one of its budgets."""
+
+    def __init__(self, tenant_id: str, quota: str, limit: int, retry_after: float):
+        super().__init__(f"Tenant '{tenant_id}' exceeded its {quota} quota ({limit})")
+        self.tenant_id = tenant_id
+        self.quota = quota
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def get_tenant_limits(tenant_id: str) -> Dict[str, int]:
+    """
+    Effective budgets and scheduling weight of a tenant.
+
+    Returns:
+        Dict with requests_per_minute, tokens_per_hour (0 = unlimited) and weight
+    """
+    override = _overrides.get(tenant_id, {})
+    return {
+        "requests_per_minute": int(override.get("requests_per_minute", TENANT_REQUESTS_PER_MINUTE)),
+        "tokens_per_hour": int(override.get("tokens_per_hour", TENANT_TOKENS_PER_HOUR)),
+        "weight": max(1, int(override.get("weight", TENANT_DEFAULT_WEIGHT))),
+    }
+
+
+def worker_count() -> int:
+    """Worker processes sharing the instance's limits (gunicorn's post_fork sets WEB_CONCURRENCY)."""
+    return max(1, int(os.getenv("WEB_CONCURRENCY") or "1"))
+
+
+def per_worker(limit: int) -> int:
+    """This process's share of an instance-wide limit (0 = unlimited stays 0)."""
+    if limit <= 0:
+        return 0
+    return math.ceil(limit / worker_count())
+
+
+def _sweep_idle_tenants(now: float):
+    global _last_sweep
+    if now - _last_sweep < _SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep = now
+    for tenant_id in [t for t, times in _request_times.items() if not times or times[-1] <= now - REQUEST_WINDOW_SECONDS]:
+        del _request_times[tenant_id]
+    for tenant_id in [t for t, buckets in _token_buckets.items() if not buckets or buckets[-1][0] <= now - TOKEN_WINDOW_SECONDS]:
+        del _token_buckets[tenant_id]
+
+
+def _prune_tokens(tenant_id: str, now: float) -> int:
+    buckets = _token_buckets.get(tenant_id)
+    if buckets is None:
+        return 0
+    while buckets and buckets[0][0] <= now - TOKEN_WINDOW_SECONDS:
+        buckets.popleft()
+    return sum(tokens for _, tokens in buckets)
+
+
+def check_tenant_quota(tenant_id: str):
+    """
+    Admit a request for a tenant and count it against the request budget.
+
+    Args:
+        tenant_id: Tenant ID
+
+    Raises:
+        QuotaExceededError: If the request or token budget is exhausted
+    """
+    limits = get_tenant_limits(tenant_id)
+    tokens_per_hour = per_worker(limits["tokens_per_hour"])
+    requests_per_minute = per_worker(limits["requests_per_minute"])
+    now = time.time()
+    _sweep_idle_tenants(now)
+
+    if tokens_per_hour:
+        used = _prune_tokens(tenant_id, now)
+        if used >= tokens_per_hour:
+            buckets = _token_buckets[tenant_id]
+            retry_after = buckets[0][0] + TOKEN_WINDOW_SECONDS - now if buckets else TOKEN_WINDOW_SECONDS
+            TENANT_QUOTA_REJECTIONS.labels(tenant_label(tenant_id), "tokens_per_hour").inc()
+            raise QuotaExceededError(tenant_id, "tokens_per_hour", limits["tokens_per_hour"], retry_after)
+
+    if requests_per_minute:
+        times = _request_times.setdefault(tenant_id, deque())
+        while times and times[0] <= now - REQUEST_WINDOW_SECONDS:
+            times.popleft()
+        if len(times) >= requests_per_minute:
+            TENANT_QUOTA_REJECTIONS.labels(tenant_label(tenant_id), "requests_per_minute").inc()
+            raise QuotaExceededError(
+                tenant_id, "requests_per_minute", limits["requests_per_minute"],
+                times[0] + REQUEST_WINDOW_SECONDS - now
+            )
+        times.append(now)
+
+
+def record_token_usage(tenant_id: str, kind: str, tokens: int):
+    """
+    Count OpenAI tokens used on behalf of a tenant.
+
+    Args:
+        tenant_id: Tenant ID
+        kind: "embedding" or "chat"
+        tokens: Total tokens reported by the API
+    """
+    if not tokens:
+        return
+    TENANT_TOKENS.labels(tenant_label(tenant_id), kind).inc(tokens)
+
+    now = time.time()
+    _sweep_idle_tenants(now)
+    bucket_start = now - now % _TOKEN_BUCKET_SECONDS
+    buckets = _token_buckets.setdefault(tenant_id, deque())
+    if buckets and buckets[-1][0] == bucket_start:
+        buckets[-1][1] += tokens
+    else:
+        buckets.append([bucket_start, tokens])
+    _prune_tokens(tenant_id, now)
+
+
+def get_tenant_usage(tenant_id: str) -> Dict[str, object]:
+    """Current usage against the tenant's budgets (this process only, against its share)."""
+    now = time.time()
+    times = _request_times.get(tenant_id, ())
+    limits = get_tenant_limits(tenant_id)
+    return {
+        "tenant_id": tenant_id,
+        "limits": limits,
+        "workers": worker_count(),
+        "worker_limits": {
+            "requests_per_minute": per_worker(limits["requests_per_minute"]),
+            "tokens_per_hour": per_worker(limits["tokens_per_hour"]),
+        },
+        "requests_last_minute": sum(1 for t in times if t > now - REQUEST_WINDOW_SECONDS),
+        "tokens_last_hour": _prune_tokens(tenant_id, now),
+    }
@@ -0,0 +1,48 @@
+"""
+Tenant reset: delete a tenant's Postgres rows and Qdrant points.
+Used synchronously by /admin/reset and as a background job.
+"""
+import asyncio
+from typing import Optional
+from app.jobs import Job
+from app.schema import delete_tenant_data
+from app.tenant_router import delete_tenant_points
+from app.chunk_cache import get_chunk_cache
+
+
+async def reset_tenant(tenant_id: str, job: Optional[Job] = None) -> dict:
+    """
+    Delete all data for a tenant.
+    Postgres batches and the Qdrant delete run concurrently.
+
+    Args:
+        tenant_id: Tenant ID to reset
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with deleted_postgres_documents, deleted_postgres_chunks, deleted_qdrant_points
+    """
+    def on_progress(docs_deleted: int, chunks_deleted: int):
+        if job:
+            job.update(deleted_postgres_documents=docs_deleted, deleted_postgres_chunks=chunks_deleted)
+
+    async def delete_qdrant() -> int:
+        deleted = await delete_tenant_points(tenant_id)
+        if job:
+            job.update(deleted_qdrant_points=deleted)
+        return deleted
+
+    if job:
+        job.update(deleted_postgres_documents=0, deleted_postgres_chunks=0, deleted_qdrant_points=None)
+
+    (docs_deleted, chunks_deleted), qdrant_deleted = await asyncio.gather(
+        delete_tenant_data(tenant_id, on_progress=on_progress),
+        delete_qdrant()
+    )
+    get_chunk_cache().invalidate_tenant(tenant_id)
+
+    return {
+        "deleted_postgres_documents": docs_deleted,
+        "deleted_postgres_chunks": chunks_deleted,
+        "deleted_qdrant_points": qdrant_deleted,
+    }
@@ -0,0 +1,430 @@
+"""
+Tenant placement: which Qdrant collection holds a tenant's vectors.
+
+Small tenants share COLLECTION_NAME and are separated by the tenant_id payload
+filter. A large tenant can be moved to a dedicated collection, so its points
+no longer inflate the shared index that every other tenant's filtered search
+walks. Placements live in the tenant_placements table (no row = shared) and
+are cached per process for TENANT_ROUTING_TTL_SECONDS.
+
+Placements name logical collections. Each logical collection is served by one
+active physical collection and, while it is being re-embedded (see
+app/reembed.py), also written to a building one; the collection_versions
+table records the embedding model and size of each. A logical collection
+without versions is served by the collection of the same name, embedded with
+the configured provider.
+
+Every Qdrant read goes to read_target(tenant_id) and embeds queries with its
+model; every write goes to all of write_targets(tenant_id), which during a
+migration or re-embedding include the target collection.
+
+migrate_tenant() moves a tenant online:
+    1. mark the tenant as migrating: writes go to both collections
+    2. wait one routing TTL, so every worker has started dual-writing
+    3. copy the tenant's points to the target collection in batches
+    4. switch reads to the target
+    5. wait one routing TTL, so no worker still reads the source
+    6. delete the tenant's points from the source
+"""
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.chunk_storage import load_chunk_texts
+from app.database import get_engine
+from app.embeddings import get_embedding_provider, get_embeddings
+from app.jobs import Job
+from app.qdrant_client import (
+    get_qdrant_client, ensure_collection_exists, collection_exists, forget_collection,
+    delete_points_by_tenant, drop_collection, COLLECTION_NAME
+)
+from app.resilience import call, run_blocking
+
+logger = logging.getLogger(__name__)
+
+TENANT_ROUTING_TTL_SECONDS = float(os.getenv("TENANT_ROUTING_TTL_SECONDS", "30"))
+MIGRATION_BATCH_SIZE = int(os.getenv("TENANT_MIGRATION_BATCH_SIZE", "500"))
+
+PLACEMENTS = ("shared", "dedicated")
+
+
+class VectorTarget(NamedTuple):
+    """A physical Qdrant collection and the embedding model/size of its vectors."""
+    collection: str
+    model: str
+    dimensions: int
+
+
+# {tenant: (expires_at, (collection, migrating_to))}
+_placements: Dict[str, Tuple[float, Tuple[str, Optional[str]]]] = {}
+# {logical collection: (expires_at, (active, building))}
+_versions: Dict[str, Tuple[float, Tuple[VectorTarget, List[VectorTarget]]]] = {}
+
+
+def dedicated_collection_name(tenant_id: str) -> str:
+    """Name of a tenant's dedicated collection (readable slug plus a hash against collisions)."""
+    slug = re.sub(r"[^a-z0-9]+", "_", tenant_id.lower()).strip("_")[:40]
+    digest = hashlib.sha1(tenant_id.encode("utf-8")).hexdigest()[:8]
+    return f"{COLLECTION_NAME}__{slug}_{digest}"
+
+
+async def _load_placement(tenant_id: str) -> Tuple[str, Optional[str]]:
+    engine = get_engine()
+
+    async def fetch_row():
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT collection, migrating_to FROM tenant_placements WHERE tenant_id = :tenant_id"),
+                {"tenant_id": tenant_id}
+            )
+            return result.fetchone()
+
+    row = await call("postgres", fetch_row)
+    return (row[0], row[1]) if row else (COLLECTION_NAME, None)
+
+
+async def get_placement(tenant_id: str) -> Tuple[str, Optional[str]]:
+    """
+    Current placement of a tenant (cached for TENANT_ROUTING_TTL_SECONDS).
+
+    Returns:
+        Tuple of (collection serving reads, collection being migrated to or None)
+    """
+    cached = _placements.get(tenant_id)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+    placement = await _load_placement(tenant_id)
+    _placements[tenant_id] = (now + TENANT_ROUTING_TTL_SECONDS, placement)
+    return placement
+
+
+async def load_versions(logical: str) -> Tuple[VectorTarget, List[VectorTarget]]:
+    """
+    Physical collections of a logical collection, read from Postgres (uncached).
+
+    Returns:
+        Tuple of (active target, targets being built)
+    """
+    engine = get_engine()
+
+    async def fetch_rows():
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("""
+                    SELECT name, embedding_model, dimensions, status
+                    FROM collection_versions
+                    WHERE logical = :logical AND status IN ('active', 'building')
+                    ORDER BY created_at
+                """),
+                {"logical": logical}
+            )
+            return result.fetchall()
+
+    rows = await call("postgres", fetch_rows)
+    active = None
+    building = []
+    for name, model, dimensions, status in rows:
+        if status == "active":
+            active = VectorTarget(name, model, dimensions)
+        else:
+            building.append(VectorTarget(name, model, dimensions))
+    if active is None:
+        provider = get_embedding_provider()
+        active = VectorTarget(logical, provider.model, await provider.get_dimension())
+    return active, building
+
+
+async def get_versions(logical: str) -> Tuple[VectorTarget, List[VectorTarget]]:
+    """Physical collections of a logical collection (cached for TENANT_ROUTING_TTL_SECONDS)."""
+    cached = _versions.get(logical)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+    versions = await load_versions(logical)
+    _versions[logical] = (now + TENANT_ROUTING_TTL_SECONDS, versions)
+    return versions
+
+
+def forget_versions(logical: str):
+    """Drop a logical collection's cached versions (after changing them)."""
+    _versions.pop(logical, None)
+
+
+async def read_target(tenant_id: str) -> VectorTarget:
+    """Collection to search/scroll/retrieve a tenant's points in, and the model to embed queries with."""
+    collection, _ = await get_placement(tenant_id)
+    active, _ = await get_versions(collection)
+    return active
+
+
+async def read_collection(tenant_id: str) -> str:
+    """Collection to search/scroll/retrieve a tenant's points in."""
+    return (await read_target(tenant_id)).collection
+
+
+async def write_targets(tenant_id: str) -> List[VectorTarget]:
+    """Collections a tenant's points must be written to (more than one while migrating or re-embedding)."""
+    collection, migrating_to = await get_placement(tenant_id)
+    targets = []
+    for logical in ([collection, migrating_to] if migrating_to else [collection]):
+        active, building = await get_versions(logical)
+        targets.extend([active] + building)
+    return targets
+
+
+async def ensure_shared_collection():
+    """Create the shared collection's physical collections if missing (startup)."""
+    active, building = await get_versions(COLLECTION_NAME)
+    for target in [active] + building:
+        await ensure_collection_exists(target.dimensions, target.collection)
+
+
+async def _upsert_into(
+    targets: Sequence[VectorTarget],
+    tenant_id: str,
+    ids: List[str],
+    payloads: List[dict],
+    texts: List[str],
+    vectors: Optional[List[List[float]]] = None,
+    model: Optional[str] = None
+):
+    from qdrant_client.models import Batch
+
+    if not ids:
+        return
+    qdrant = get_qdrant_client()
+    embedded: Dict[Tuple[str, int], List[List[float]]] = {}
+    if vectors is not None and model is not None:
+        embedded[(model, len(vectors[0]))] = vectors
+    for target in targets:
+        spec = (target.model, target.dimensions)
+        if spec not in embedded:
+            embedded[spec] = await get_embeddings(
+                texts, tenant_id=tenant_id, model=target.model, dimensions=target.dimensions
+            )
+        await ensure_collection_exists(target.dimensions, target.collection)
+        points = Batch(ids=ids, vectors=embedded[spec], payloads=payloads)
+        await call(
+            "qdrant",
+            lambda target=target, points=points: run_blocking(
+                "qdrant", qdrant.upsert, collection_name=target.collection, points=points
+            )
+        )
+
+
+async def upsert_points(
+    tenant_id: str,
+    ids: List[str],
+    payloads: List[dict],
+    texts: List[str],
+    vectors: Optional[List[List[float]]] = None,
+    model: Optional[str] = None
+):
+    """
+    Upsert a tenant's points into every collection it is written to.
+    Precomputed vectors are used where the collection's model and size match;
+    other collections (e.g. one being re-embedded) get the texts embedded for them.
+
+    Args:
+        tenant_id: Tenant the points belong to
+        ids: Point IDs (chunk IDs)
+        payloads: Point payloads
+        texts: Chunk texts (embedded for collections the vectors don't fit)
+        vectors: Precomputed vectors (optional)
+        model: Embedding model of the precomputed vectors
+    """
+    await _upsert_into(await write_targets(tenant_id), tenant_id, ids, payloads, texts, vectors, model)
+
+
+async def delete_points(tenant_id: str, points_selector):
+    """Delete points of a tenant (by ID list or filter) from every collection it is written to."""
+    qdrant = get_qdrant_client()
+    for target in await write_targets(tenant_id):
+        # Deletes run per document: don't list collections each time
+        if not await collection_exists(target.collection, cached=True):
+            continue
+        try:
+            await call(
+                "qdrant",
+                lambda target=target: run_blocking(
+                    "qdrant", qdrant.delete, collection_name=target.collection, points_selector=points_selector
+                )
+            )
+        except Exception as e:
+            if getattr(e, "status_code", None) != 404:
+                raise
+            # Collection dropped since it was cached: its points are gone too
+            forget_collection(target.collection)
+
+
+async def delete_tenant_points(tenant_id: str) -> int:
+    """Delete all points of a tenant from every collection it is written to."""
+    deleted = 0
+    for target in await write_targets(tenant_id):
+        if await collection_exists(target.collection, cached=True):
+            deleted += await delete_points_by_tenant(tenant_id, target.collection)
+    return deleted
+
+
+async def _save_placement(tenant_id: str, collection: str, migrating_to: Optional[str]):
+    engine = get_engine()
+    async with engine.begin() as conn:
+        if collection == COLLECTION_NAME and migrating_to is None:
+            # Shared is the default: no row
+            await conn.execute(
+                text("DELETE FROM tenant_placements WHERE tenant_id = :tenant_id"),
+                {"tenant_id": tenant_id}
+            )
+        else:
+            await conn.execute(
+                text("""
+                    INSERT INTO tenant_placements (tenant_id, collection, migrating_to, updated_at)
+                    VALUES (:tenant_id, :collection, :migrating_to, NOW())
+                    ON CONFLICT (tenant_id) DO UPDATE
+                    SET collection = EXCLUDED.collection,
+                        migrating_to = EXCLUDED.migrating_to,
+                        updated_at = NOW()
+                """),
+                {"tenant_id": tenant_id, "collection": collection, "migrating_to": migrating_to}
+            )
+    _placements.pop(tenant_id, None)
+
+
+async def _drop_logical(logical: str):
+    """Drop every physical collection of a logical collection."""
+    active, building = await load_versions(logical)
+    for target in [active] + building:
+        if await collection_exists(target.collection):
+            await drop_collection(target.collection)
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM collection_versions WHERE logical = :logical"), {"logical": logical})
+    forget_versions(logical)
+
+
+async def _copy_points(
+    tenant_id: str,
+    source: VectorTarget,
+    targets: List[VectorTarget],
+    job: Optional[Job]
+) -> int:
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    qdrant = get_qdrant_client()
+    tenant_filter = Filter(must=[FieldCondition(key="tenant_id", match=MatchValue(value=tenant_id))])
+    copied = 0
+    offset = None
+    while True:
+        points, offset = await call(
+            "qdrant",
+            lambda offset=offset: run_blocking(
+                "qdrant",
+                qdrant.scroll,
+                collection_name=source.collection,
+                scroll_filter=tenant_filter,
+                limit=MIGRATION_BATCH_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+        )
+        if points:
+            # Stored vectors are reused; a target with another model re-embeds the chunk text,
+            # read from Postgres when payloads don't carry it (offsets chunk storage)
+            ids = [str(point.id) for point in points]
+            texts = [point.payload.get("text") for point in points]
+            if None in texts and any((t.model, t.dimensions) != (source.model, source.dimensions) for t in targets):
+                stored = await load_chunk_texts([point_id for point_id, chunk in zip(ids, texts) if chunk is None])
+                texts = [chunk if chunk is not None else stored.get(point_id, "") for point_id, chunk in zip(ids, texts)]
+            await _upsert_into(
+                targets,
+                tenant_id,
+                ids=ids,
+                payloads=[point.payload for point in points],
+                texts=texts,
+                vectors=[point.vector for point in points],
+                model=source.model
+            )
+            copied += len(points)
+            if job:
+                job.update(copied_points=copied)
+        if offset is None:
+            return copied
+
+
+async def migrate_tenant(tenant_id: str, placement: str, job: Optional[Job] = None) -> Dict:
+    """
+    Move a tenant's points to the shared or to a dedicated collection while it serves traffic.
+    Re-running after a failure resumes: copying is an idempotent upsert.
+    A document deleted while the copy runs can leave orphaned points in the
+    target; /admin/reconcile with repair=true removes them.
+
+    Args:
+        tenant_id: Tenant to move
+        placement: "shared" or "dedicated"
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with tenant_id, placement, from_collection, to_collection, copied_points, deleted_source_points
+
+    Raises:
+        ValueError: If the placement is unknown
+    """
+    if placement not in PLACEMENTS:
+        raise ValueError(f"Unknown placement '{placement}' (expected one of {', '.join(PLACEMENTS)})")
+    target = COLLECTION_NAME if placement == "shared" else dedicated_collection_name(tenant_id)
+    source, _ = await _load_placement(tenant_id)
+    result = {
+        "tenant_id": tenant_id,
+        "placement": placement,
+        "from_collection": source,
+        "to_collection": target,
+        "copied_points": 0,
+        "deleted_source_points": 0
+    }
+    if source == target:
+        await _save_placement(tenant_id, source, None)
+        return result
+
+    source_active, source_building = await load_versions(source)
+    if await collection_exists(source_active.collection):
+        target_active, target_building = await load_versions(target)
+        await ensure_collection_exists(target_active.dimensions, target_active.collection)
+
+        def progress(phase: str):
+            logger.info("tenant_migration", extra={**result, "phase": phase})
+            if job:
+                job.update(phase=phase)
+
+        progress("dual_write")
+        await _save_placement(tenant_id, source, target)
+        await asyncio.sleep(TENANT_ROUTING_TTL_SECONDS)
+
+        progress("copy")
+        result["copied_points"] = await _copy_points(
+            tenant_id, source_active, [target_active] + target_building, job
+        )
+
+        progress("cutover")
+        await _save_placement(tenant_id, target, None)
+        await asyncio.sleep(TENANT_ROUTING_TTL_SECONDS)
+
+        progress("cleanup")
+        for version in [source_active] + source_building:
+            if await collection_exists(version.collection):
+                result["deleted_source_points"] += await delete_points_by_tenant(tenant_id, version.collection)
+        if source != COLLECTION_NAME:
+            await _drop_logical(source)
+    else:
+        # Nothing stored yet: just route future writes to the target
+        await _save_placement(tenant_id, target, None)
+
+    logger.info("tenant_migrated", extra=result)
+    return result
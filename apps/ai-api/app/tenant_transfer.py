@@ -0,0 +1,346 @@
+"""
+Tenant export/import as a bundle (see app/bundle.py).
+Moves a tenant's documents, chunks and vectors between environments without
+re-embedding: export streams rows and vectors, import bulk-loads Postgres
+and upserts Qdrant in large batches.
+"""
+import os
+import mmap
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import IO, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.bundle import BundleReader, BundleWriter
+from app.chunk_storage import CHUNK_CONTENT_SQL, chunk_payload, stored_content
+from app.database import get_engine
+from app.embeddings import get_embedding_provider
+from app.ingest import make_chunk_id
+from app.jobs import Job
+from app.qdrant_client import get_qdrant_client
+from app.resilience import call, run_blocking
+from app.tenant_router import read_target, upsert_points
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_BATCH_SIZE = int(os.getenv("TRANSFER_BATCH_SIZE", "1000"))
+
+
+async def export_tenant(tenant_id: str) -> AsyncIterator[bytes]:
+    """
+    Stream a tenant as a bundle.
+    Documents and chunks are read through server-side cursors; chunk vectors
+    are fetched from Qdrant per batch and spooled until the metadata is done,
+    so memory stays bounded regardless of tenant size.
+
+    Args:
+        tenant_id: Tenant to export
+
+    Yields:
+        Bundle bytes
+    """
+    qdrant = get_qdrant_client()
+    target = await read_target(tenant_id)
+    collection_name = target.collection
+    provider = get_embedding_provider(target.model, target.dimensions)
+
+    writer = BundleWriter({
+        "kind": "tenant_export",
+        "tenant_id": tenant_id,
+        "dimension": target.dimensions,
+        "embedding_provider": provider.name,
+        "embedding_model": target.model,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    })
+    yield writer.start()
+
+    engine = get_engine()
+    skipped = 0
+    async with engine.connect() as conn:
+        documents = await conn.stream(
+            text("""
+                SELECT id, source, title, content, created_at
+                FROM documents
+                WHERE tenant_id = :tenant_id
+                ORDER BY id
+            """).execution_options(yield_per=TRANSFER_BATCH_SIZE),
+            {"tenant_id": tenant_id}
+        )
+        async for rows in documents.partitions():
+            yield b"".join(
+                writer.add_document({
+                    "id": str(row[0]),
+                    "source": row[1],
+                    "title": row[2],
+                    "content": row[3],
+                    "created_at": row[4].isoformat() if row[4] else None
+                })
+                for row in rows
+            )
+
+        chunks = await conn.stream(
+            text(f"""
+                SELECT c.id, c.document_id, c.chunk_index, {CHUNK_CONTENT_SQL}, c.start_offset, c.end_offset
+                FROM chunks c
+                JOIN documents d ON c.document_id = d.id
+                WHERE c.tenant_id = :tenant_id
+                ORDER BY c.id
+            """).execution_options(yield_per=TRANSFER_BATCH_SIZE),
+            {"tenant_id": tenant_id}
+        )
+        async for rows in chunks.partitions():
+            points = await call(
+                "qdrant",
+                lambda rows=rows: run_blocking(
+                    "qdrant",
+                    qdrant.retrieve,
+                    collection_name=collection_name,
+                    ids=[str(row[0]) for row in rows],
+                    with_payload=False,
+                    with_vectors=True
+                )
+            )
+            vectors = {str(point.id): point.vector for point in points}
+            pieces = []
+            for row in rows:
+                vector = vectors.get(str(row[0]))
+                if vector is None:
+                    # Chunk without a vector (interrupted ingest): nothing to transfer
+                    skipped += 1
+                    continue
+                pieces.append(writer.add_chunk(
+                    {
+                        "id": str(row[0]),
+                        "document_id": str(row[1]),
+                        "chunk_index": row[2],
+                        "content": row[3],
+                        "start_offset": row[4],
+                        "end_offset": row[5]
+                    },
+                    vector
+                ))
+            yield b"".join(pieces)
+
+    for data in writer.finish():
+        yield data
+
+    logger.info(
+        "tenant_export",
+        extra={"tenant_id": tenant_id, "chunks": writer.vector_count, "skipped_chunks": skipped}
+    )
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    # Bundles carry ISO-8601 strings; asyncpg only binds datetimes to TIMESTAMPTZ
+    return datetime.fromisoformat(value) if value else None
+
+
+def _remap_id(old_id: str, tenant_id: str, source_tenant_id: str) -> str:
+    # Importing into another tenant of the same database needs fresh primary keys
+    if tenant_id == source_tenant_id:
+        return old_id
+    return str(uuid.uuid5(uuid.UUID(old_id), tenant_id))
+
+
+async def import_tenant(
+    buffer,
+    tenant_id: Optional[str] = None,
+    force: bool = False,
+    job: Optional[Job] = None
+) -> Dict[str, int]:
+    """
+    Bulk-load a tenant bundle into Postgres and Qdrant (no embedding calls).
+    Vectors are read zero-copy from `buffer` (bytes or mmap). Rows that
+    already exist are skipped, so re-running an import is safe.
+
+    Args:
+        buffer: Bundle contents
+        tenant_id: Target tenant (defaults to the exported tenant)
+        force: Import even if the bundle was embedded with a different model
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with tenant_id, imported_documents and imported_chunks (rows
+        inserted; rows that already existed are not counted)
+
+    Raises:
+        ValueError: If the bundle is invalid or incompatible with this environment
+    """
+    reader = BundleReader(buffer)
+    header = reader.header
+    source_tenant_id = header.get("tenant_id")
+    tenant_id = tenant_id or source_tenant_id
+    if not tenant_id:
+        raise ValueError("Bundle has no tenant_id; pass one explicitly")
+
+    target = await read_target(tenant_id)
+    if not force and header.get("embedding_model") != target.model:
+        raise ValueError(
+            f"Bundle was embedded with '{header.get('embedding_model')}' but the tenant's collection uses "
+            f"'{target.model}'; searches would not match (use force to import anyway)"
+        )
+    if target.dimensions != reader.dimension:
+        raise ValueError(
+            f"Bundle vectors have {reader.dimension} dimensions, "
+            f"collection has {target.dimensions}"
+        )
+
+    engine = get_engine()
+    documents: List[dict] = []
+    chunks: List[dict] = []
+    chunk_vector_rows: List[int] = []
+    document_meta: Dict[str, dict] = {}
+    imported = {"imported_documents": 0, "imported_chunks": 0}
+
+    async def flush_documents():
+        if not documents:
+            return
+        # One statement per batch; RETURNING counts only the rows actually inserted
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("""
+                    INSERT INTO documents (id, tenant_id, source, title, content, created_at)
+                    SELECT d.id, :tenant_id, d.source, d.title, d.content, COALESCE(d.created_at, NOW())
+                    FROM unnest(
+                        CAST(:ids AS UUID[]), CAST(:sources AS TEXT[]), CAST(:titles AS TEXT[]),
+                        CAST(:contents AS TEXT[]), CAST(:created_ats AS TIMESTAMPTZ[])
+                    ) AS d(id, source, title, content, created_at)
+                    ON CONFLICT (id) DO NOTHING
+                    RETURNING id
+                """),
+                {
+                    "tenant_id": tenant_id,
+                    "ids": [document["id"] for document in documents],
+                    "sources": [document["source"] for document in documents],
+                    "titles": [document["title"] for document in documents],
+                    "contents": [document["content"] for document in documents],
+                    "created_ats": [document["created_at"] for document in documents],
+                }
+            )
+            imported["imported_documents"] += len(result.fetchall())
+        documents.clear()
+
+    async def flush_chunks():
+        if not chunks:
+            return
+        # Documents referenced by these chunks must exist first (FK)
+        await flush_documents()
+        # Bundles from before offset storage carry no offsets: those chunks keep their text inline
+        spans = [
+            (chunk["start_offset"], chunk["end_offset"]) if chunk["start_offset"] is not None else None
+            for chunk in chunks
+        ]
+
+        async def insert_rows() -> int:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    text("""
+                        INSERT INTO chunks (id, document_id, tenant_id, chunk_index, content, start_offset, end_offset)
+                        SELECT c.id, c.document_id, :tenant_id, c.chunk_index, c.content, c.start_offset, c.end_offset
+                        FROM unnest(
+                            CAST(:ids AS UUID[]), CAST(:document_ids AS UUID[]), CAST(:chunk_indexes AS INT[]),
+                            CAST(:contents AS TEXT[]), CAST(:start_offsets AS INT[]), CAST(:end_offsets AS INT[])
+                        ) AS c(id, document_id, chunk_index, content, start_offset, end_offset)
+                        ON CONFLICT (id) DO NOTHING
+                        RETURNING id
+                    """),
+                    {
+                        "tenant_id": tenant_id,
+                        "ids": [chunk["id"] for chunk in chunks],
+                        "document_ids": [chunk["document_id"] for chunk in chunks],
+                        "chunk_indexes": [chunk["chunk_index"] for chunk in chunks],
+                        "contents": [stored_content(chunk["content"], span) for chunk, span in zip(chunks, spans)],
+                        "start_offsets": [chunk["start_offset"] for chunk in chunks],
+                        "end_offsets": [chunk["end_offset"] for chunk in chunks],
+                    }
+                )
+                return len(result.fetchall())
+
+        payloads = [
+            chunk_payload(
+                chunk["document_id"], chunk["id"], tenant_id, chunk["chunk_index"], chunk["content"],
+                document_meta[chunk["document_id"]]["title"], document_meta[chunk["document_id"]]["source"]
+            )
+            for chunk in chunks
+        ]
+        # Postgres and Qdrant batches load concurrently; the bundle's vectors
+        # count as the tenant collection's model (checked above, or forced)
+        inserted, _ = await asyncio.gather(
+            insert_rows(),
+            upsert_points(
+                tenant_id,
+                ids=[chunk["id"] for chunk in chunks],
+                payloads=payloads,
+                texts=[chunk["content"] for chunk in chunks],
+                vectors=reader.vectors[chunk_vector_rows[0]:chunk_vector_rows[-1] + 1].tolist(),
+                model=target.model
+            )
+        )
+        imported["imported_chunks"] += inserted
+        chunks.clear()
+        chunk_vector_rows.clear()
+        if job:
+            job.update(**imported)
+
+    for record, vector_index in reader.records():
+        if vector_index < 0:
+            document_id = _remap_id(record["id"], tenant_id, source_tenant_id)
+            document_meta[document_id] = {"title": record["title"], "source": record["source"]}
+            documents.append({
+                "id": document_id,
+                "source": record["source"],
+                "title": record["title"],
+                "content": record["content"],
+                "created_at": _parse_timestamp(record.get("created_at"))
+            })
+            if len(documents) >= TRANSFER_BATCH_SIZE:
+                await flush_documents()
+        else:
+            document_id = _remap_id(record["document_id"], tenant_id, source_tenant_id)
+            chunk_id = record["id"] if document_id == record["document_id"] else make_chunk_id(document_id, record["chunk_index"])
+            chunks.append({
+                "id": chunk_id,
+                "document_id": document_id,
+                "chunk_index": record["chunk_index"],
+                "content": record["content"],
+                "start_offset": record.get("start_offset"),
+                "end_offset": record.get("end_offset")
+            })
+            chunk_vector_rows.append(vector_index)
+            if len(chunks) >= TRANSFER_BATCH_SIZE:
+                await flush_chunks()
+
+    await flush_documents()
+    await flush_chunks()
+    return {"tenant_id": tenant_id, **imported}
+
+
+async def import_tenant_file(
+    file: IO[bytes],
+    tenant_id: Optional[str] = None,
+    force: bool = False,
+    job: Optional[Job] = None
+) -> Dict[str, int]:
+    """
+    Import a bundle from an open file, memory-mapped so vectors are never copied
+    into Python memory wholesale. The file is closed afterwards.
+
+    Args:
+        file: Bundle file opened in binary mode
+        tenant_id: Target tenant (defaults to the exported tenant)
+        force: Import even if the bundle was embedded with a different model
+        job: Background job to report progress on (optional)
+
+    Returns:
+        Dict with tenant_id, imported_documents and imported_chunks
+    """
+    try:
+        file.flush()
+        # The mapping outlives the file handle and is released with the last vector view
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return await import_tenant(buffer, tenant_id=tenant_id, force=force, job=job)
+    finally:
+        file.close()
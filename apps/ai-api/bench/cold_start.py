@@ -0,0 +1,155 @@
+"""
+Cold-start benchmark: time from process start to the first 200 on /ready.
+
+Runs each server mode several times and reports min/median/max seconds,
+plus the slowest imports of `app.main` (python -X importtime), so import
+regressions show up next to the startup numbers.
+
+Modes:
+    uvicorn         single process (uvicorn app.main:app)
+    gunicorn:<N>    gunicorn.conf.py with N workers (preloaded app)
+
+Usage (from apps/ai-api, with the bench Postgres running):
+    docker compose -f bench/docker-compose.bench.yml up -d
+    python -m bench.cold_start --modes uvicorn gunicorn:2 gunicorn:4 --runs 5
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from bench.run import APP_DIR, BENCH_DIR, BENCH_API_KEY, DEFAULT_DATABASE_URL, git_commit
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+
+def server_command(mode: str, port: int) -> List[str]:
+    """Command line for a server mode."""
+    if mode == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ]
+    if mode.startswith("gunicorn:"):
+        return [
+            sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+            "--workers", mode.split(":", 1)[1], "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+            "app.main:app",
+        ]
+    raise ValueError(f"Unknown mode '{mode}' (expected 'uvicorn' or 'gunicorn:<workers>')")
+
+
+def time_to_ready(command: List[str], env: dict, ready_url: str, timeout: float) -> float:
+    """Start the server, return seconds until /ready answers 200, then stop it."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=APP_DIR, env=env)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited early: {' '.join(command)}")
+            try:
+                if httpx.get(ready_url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"Timed out waiting for {ready_url}")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def slowest_imports(env: dict, top: int) -> Dict:
+    """Total import time of app.main and its slowest top-level dependencies (cumulative ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, name = int(match.group(1)), match.group(2)
+        if name == "app.main":
+            total_us = cumulative_us
+        # Third-party top-level packages, wherever in the import tree they were first imported
+        elif "." not in name and name != "app" and name not in sys.stdlib_module_names:
+            modules[name] = max(modules.get(name, 0), cumulative_us)
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "app_main_ms": round(total_us / 1000, 1),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start to first ready")
+    parser.add_argument("--modes", nargs="+", default=["uvicorn", "gunicorn:2"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top-imports", type=int, default=10)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--api-port", type=int, default=8910)
+    parser.add_argument("--output", help="Result JSON path (default: bench/results/cold-start-<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url,
+        "QDRANT_URL": args.qdrant_url,
+        "API_KEY": BENCH_API_KEY,
+        # Startup must not depend on a reachable OpenAI endpoint
+        "EMBEDDING_PROVIDER": env.get("EMBEDDING_PROVIDER", "local"),
+    })
+    ready_url = f"http://127.0.0.1:{args.api_port}/ready"
+
+    results = {}
+    for mode in args.modes:
+        command = server_command(mode, args.api_port)
+        samples = [time_to_ready(command, env, ready_url, args.timeout) for _ in range(args.runs)]
+        results[mode] = {
+            "runs": args.runs,
+            "seconds": {
+                "min": round(min(samples), 3),
+                "median": round(statistics.median(samples), 3),
+                "max": round(max(samples), 3),
+            },
+        }
+
+    commit = git_commit()
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(), "git_commit": commit, "cpus": os.cpu_count()},
+        "cold_start": results,
+        "imports": slowest_imports(env, args.top_imports),
+    }
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"cold-start-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(f"{'mode':<14} {'min':>7} {'median':>7} {'max':>7}")
+    for mode, result in results.items():
+        seconds = result["seconds"]
+        print(f"{mode:<14} {seconds['min']:>7.2f} {seconds['median']:>7.2f} {seconds['max']:>7.2f}")
+    print(f"import app.main: {report['imports']['app_main_ms']} ms")
+    for name, ms in report["imports"]["slowest_ms"].items():
+        print(f"  {name:<32} {ms:>8.1f} ms")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
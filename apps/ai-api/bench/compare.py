@@ -0,0 +1,67 @@
+"""
+Compare two benchmark result files (see bench.run).
+
+Usage:
+    python -m bench.compare bench/results/base.json bench/results/head.json --threshold 10
+
+Exits with status 1 if any endpoint's p95 latency regressed by more than
+--threshold percent (or RPS dropped by more than that).
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+
+def pct_change(base: Optional[float], head: Optional[float]) -> Optional[float]:
+    if not base or head is None:
+        return None
+    return (head - base) / base * 100
+
+
+def format_change(change: Optional[float]) -> str:
+    return "n/a" if change is None else f"{change:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed p95 latency increase / RPS decrease in percent")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base: {base['meta'].get('git_commit')}  head: {head['meta'].get('git_commit')}")
+    print(f"{'endpoint':<8} {'metric':<6} {'base':>10} {'head':>10} {'change':>9}")
+
+    regressions = []
+    for name, head_result in head["endpoints"].items():
+        base_result = base["endpoints"].get(name)
+        if base_result is None:
+            continue
+
+        for metric in ("p50", "p95", "p99"):
+            base_value = base_result["latency_ms"][metric]
+            head_value = head_result["latency_ms"][metric]
+            change = pct_change(base_value, head_value)
+            print(f"{name:<8} {metric:<6} {base_value or 0:>10.1f} {head_value or 0:>10.1f} {format_change(change):>9}")
+            if metric == "p95" and change is not None and change > args.threshold:
+                regressions.append(f"{name} p95 {format_change(change)}")
+
+        change = pct_change(base_result["rps"], head_result["rps"])
+        print(f"{name:<8} {'rps':<6} {base_result['rps']:>10.1f} {head_result['rps']:>10.1f} {format_change(change):>9}")
+        if change is not None and change < -args.threshold:
+            regressions.append(f"{name} rps {format_change(change)}")
+
+    if regressions:
+        print("Regressions: " + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Fake OpenAI HTTP server for benchmarks.
+Implements /v1/embeddings and /v1/chat/completions with configurable latency
+and deterministic vectors, so load tests never call (or pay) the real API.
+
+Usage:
+    python -m bench.fake_openai --port 8901 --embedding-latency-ms 50 --chat-latency-ms 400 --dim 1536
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import math
+import os
+import random
+import struct
+import time
+import uuid
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI(title="Fake OpenAI")
+
+# Configured from CLI flags (or env when imported directly by uvicorn)
+EMBEDDING_LATENCY_MS = float(os.getenv("FAKE_OPENAI_EMBEDDING_LATENCY_MS", "50"))
+CHAT_LATENCY_MS = float(os.getenv("FAKE_OPENAI_CHAT_LATENCY_MS", "400"))
+LATENCY_JITTER = float(os.getenv("FAKE_OPENAI_LATENCY_JITTER", "0.2"))
+EMBEDDING_DIM = int(os.getenv("FAKE_OPENAI_DIM", "1536"))
+
+
+def deterministic_vector(text: str, dim: int) -> List[float]:
+    """
+    Build a unit vector seeded from the text hash (same text -> same vector).
+
+    Args:
+        text: Input text
+        dim: Vector dimension
+
+    Returns:
+        Normalized vector as a list of floats
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+async def simulate_latency(base_ms: float):
+    """Sleep for base_ms +/- jitter to mimic upstream latency."""
+    if base_ms <= 0:
+        return
+    jitter = base_ms * LATENCY_JITTER
+    await asyncio.sleep(max(0.0, random.uniform(base_ms - jitter, base_ms + jitter)) / 1000)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars per token)."""
+    return max(1, len(text) // 4)
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dim = int(body.get("dimensions") or EMBEDDING_DIM)
+    use_base64 = body.get("encoding_format") == "base64"
+
+    await simulate_latency(EMBEDDING_LATENCY_MS)
+
+    data = []
+    for index, text in enumerate(inputs):
+        vector = deterministic_vector(text, dim)
+        if use_base64:
+            embedding = base64.b64encode(struct.pack(f"<{dim}f", *vector)).decode("ascii")
+        else:
+            embedding = vector
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+    tokens = sum(count_tokens(text) for text in inputs)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "text-embedding-3-small"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+
+    await simulate_latency(CHAT_LATENCY_MS)
+
+    answer = "This is a benchmark answer generated from the provided context."
+    completion_tokens = count_tokens(answer)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": []}
+
+
+def main():
+    global EMBEDDING_LATENCY_MS, CHAT_LATENCY_MS, LATENCY_JITTER, EMBEDDING_DIM
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--embedding-latency-ms", type=float, default=EMBEDDING_LATENCY_MS)
+    parser.add_argument("--chat-latency-ms", type=float, default=CHAT_LATENCY_MS)
+    parser.add_argument("--jitter", type=float, default=LATENCY_JITTER, help="Relative latency jitter (0.2 = +/-20%%)")
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    args = parser.parse_args()
+
+    EMBEDDING_LATENCY_MS = args.embedding_latency_ms
+    CHAT_LATENCY_MS = args.chat_latency_ms
+    LATENCY_JITTER = args.jitter
+    EMBEDDING_DIM = args.dim
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
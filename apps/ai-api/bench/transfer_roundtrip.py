@@ -0,0 +1,162 @@
+"""
+Round-trip check for tenant export/import (GET /admin/export, POST /admin/import).
+
+Ingests a few documents into a source tenant, exports it, imports the bundle
+into a fresh target tenant and verifies the target matches: same documents
+(source, title, created_at), same number of chunks, and the same search
+results for every bench query. Exits non-zero on any mismatch.
+
+Uses the same local stand-ins as bench.run (fake OpenAI, in-memory or local
+Qdrant, bench Postgres).
+
+Usage (from apps/ai-api):
+    docker compose -f bench/docker-compose.bench.yml up -d
+    python -m bench.transfer_roundtrip
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+import httpx
+
+from bench.run import BENCH_API_KEY, DEFAULT_DATABASE_URL, QUERIES, seed_content, start_process
+
+SOURCE_TENANT_ID = "roundtrip-source"
+TARGET_TENANT_ID = "roundtrip-target"
+
+
+def list_documents(client: httpx.Client, tenant_id: str) -> List[dict]:
+    """Every document of a tenant (NDJSON export, no paging)."""
+    response = client.get("/documents", params={"tenant_id": tenant_id, "format": "ndjson"})
+    response.raise_for_status()
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def search_titles(client: httpx.Client, tenant_id: str, query: str, top_k: int) -> List[tuple]:
+    """(title, chunk_index, content) of the top hits for a query."""
+    response = client.post(
+        "/search",
+        json={"query": query, "top_k": top_k, "min_score": -1.0, "tenant_id": tenant_id}
+    )
+    response.raise_for_status()
+    return [(hit["title"], hit["chunk_index"], hit["content"]) for hit in response.json()["results"]]
+
+
+def run_roundtrip(args, api_url: str) -> List[str]:
+    """Ingest, export, import and compare; returns the mismatches found."""
+    problems = []
+    with httpx.Client(base_url=api_url, headers={"X-API-Key": BENCH_API_KEY}, timeout=args.timeout) as client:
+        for tenant_id in (SOURCE_TENANT_ID, TARGET_TENANT_ID):
+            client.post("/admin/reset", json={"tenant_id": tenant_id, "background": False}).raise_for_status()
+
+        chunks = 0
+        for i in range(args.documents):
+            response = client.post("/ingest", json={
+                "source": "roundtrip",
+                "title": f"Roundtrip document {i}",
+                "content": seed_content(i, args.doc_size),
+                "tenant_id": SOURCE_TENANT_ID,
+            })
+            response.raise_for_status()
+            chunks += response.json()["chunks"]
+
+        bundle = client.get("/admin/export", params={"tenant_id": SOURCE_TENANT_ID})
+        bundle.raise_for_status()
+        response = client.post(
+            "/admin/import",
+            params={"tenant_id": TARGET_TENANT_ID},
+            content=bundle.content,
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        if response.status_code != 200:
+            return [f"import failed: {response.status_code} {response.text}"]
+        imported = response.json()
+        print(f"[roundtrip] exported {len(bundle.content)} bytes, imported {imported}", file=sys.stderr)
+
+        if imported["imported_documents"] != args.documents:
+            problems.append(f"imported {imported['imported_documents']} documents, expected {args.documents}")
+        if imported["imported_chunks"] != chunks:
+            problems.append(f"imported {imported['imported_chunks']} chunks, expected {chunks}")
+
+        def document_keys(tenant_id: str) -> Dict[str, tuple]:
+            return {doc["title"]: (doc["source"], doc["created_at"]) for doc in list_documents(client, tenant_id)}
+
+        source_documents = document_keys(SOURCE_TENANT_ID)
+        target_documents = document_keys(TARGET_TENANT_ID)
+        if source_documents != target_documents:
+            problems.append(f"documents differ: source {source_documents}, target {target_documents}")
+
+        for query in QUERIES:
+            expected = search_titles(client, SOURCE_TENANT_ID, query, args.top_k)
+            actual = search_titles(client, TARGET_TENANT_ID, query, args.top_k)
+            if expected != actual:
+                problems.append(f"search results differ for '{query}'")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify that a tenant survives export and import unchanged")
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--doc-size", type=int, default=3000, help="Characters per ingested document")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--qdrant-url", default=":memory:", help="Qdrant URL, or :memory: for in-process Qdrant")
+    parser.add_argument("--api-port", type=int, default=8900)
+    parser.add_argument("--openai-port", type=int, default=8901)
+    args = parser.parse_args()
+
+    openai_url = f"http://127.0.0.1:{args.openai_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    fake_openai = start_process(
+        [
+            sys.executable, "-m", "bench.fake_openai",
+            "--port", str(args.openai_port),
+            "--embedding-latency-ms", "0",
+            "--chat-latency-ms", "0",
+            "--dim", str(args.dim),
+        ],
+        dict(os.environ),
+        f"{openai_url}/v1/models",
+    )
+
+    app_env = dict(os.environ)
+    app_env.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "DATABASE_URL": args.database_url,
+        "QDRANT_URL": args.qdrant_url,
+        "API_KEY": BENCH_API_KEY,
+        "RATE_LIMIT_MAX": "1000000000",
+    })
+
+    api = None
+    try:
+        api = start_process(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(args.api_port), "--log-level", "warning",
+            ],
+            app_env,
+            f"{api_url}/ready",
+        )
+        problems = run_roundtrip(args, api_url)
+    finally:
+        for process in (api, fake_openai):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    if problems:
+        for problem in problems:
+            print(f"MISMATCH: {problem}")
+        sys.exit(1)
+    print("Export/import round trip OK")
+
+
+if __name__ == "__main__":
+    main()
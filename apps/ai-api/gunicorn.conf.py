@@ -0,0 +1,69 @@
+"""
+Gunicorn configuration: multi-process serving with uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (preload_app) and forked, so import
+cost is paid once and the imported code is shared copy-on-write between
+workers. Clients (Postgres engine, Qdrant, OpenAI) are created lazily; the
+post_fork hook makes sure no worker inherits one from the master.
+
+Environment:
+    WEB_CONCURRENCY     Worker processes (default: CPUs available to the container;
+                        set in each worker so the app can split per-instance limits)
+    PORT                Listen port (default 8000)
+    GUNICORN_TIMEOUT    Seconds before a silent worker is restarted (default 60)
+"""
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honoring cgroup v2 quotas and CPU affinity."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+# One async worker per CPU: each runs its own event loop
+workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = None
+
+
+def on_starting(server):
+    """Import the client SDKs (deferred by the app) once in the master, so workers share them."""
+    import openai  # noqa: F401
+    import qdrant_client  # noqa: F401
+    import qdrant_client.models  # noqa: F401
+
+
+def post_fork(server, worker):
+    """Drop any client created in the master before this worker uses it."""
+    from app.database import reset_engine
+    from app.embeddings import reset_embedding_provider
+    from app.fair_queue import reset_llm_scheduler
+    from app.openai_client import reset_openai_client
+    from app.qdrant_client import reset_qdrant_client
+
+    # Final worker count (including -w on the command line): tenant budgets
+    # and LLM slots are split across the workers
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    reset_llm_scheduler()
+    reset_engine()
+    reset_qdrant_client()
+    reset_openai_client()
+    reset_embedding_provider()
@@ -0,0 +1,13 @@
+"""
+Shared fixtures for the ai-api unit tests.
+
+Run from apps/ai-api:
+    python -m pytest -q
+
+These tests do not need Postgres, Qdrant or OpenAI; anything that would
+talk to them is monkeypatched.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+"""Regression test: /admin/reset-seed resets synchronously before seeding."""
+from fastapi.testclient import TestClient
+
+import app.auth
+import app.main
+
+API_KEY = "test-key"
+
+
+def test_reset_seed_waits_for_reset_before_seeding(monkeypatch):
+    calls = []
+
+    async def fake_reset_tenant(tenant_id, job=None):
+        calls.append(("reset", tenant_id, job))
+        return {
+            "deleted_postgres_documents": 2,
+            "deleted_postgres_chunks": 7,
+            "deleted_qdrant_points": 7,
+        }
+
+    async def fake_seed_tenant(tenant_id):
+        calls.append(("seed", tenant_id, None))
+        return [{"title": "Menu", "document_id": "doc-1", "chunks": 3}]
+
+    monkeypatch.setattr(app.auth, "API_KEY", API_KEY)
+    monkeypatch.setattr(app.main, "reset_tenant", fake_reset_tenant)
+    monkeypatch.setattr(app.main, "seed_tenant", fake_seed_tenant)
+
+    client = TestClient(app.main.app)
+    response = client.post(
+        "/admin/reset-seed",
+        json={"tenant_id": "acme"},
+        headers={"X-API-Key": API_KEY},
+    )
+
+    assert response.status_code == 201, response.text
+    assert calls == [("reset", "acme", None), ("seed", "acme", None)]
+    body = response.json()
+    assert body["status"] == "reset-seeded"
+    assert body["reset"]["status"] == "reset"
+    assert body["reset"]["deleted_postgres_chunks"] == 7
+    assert body["seed"]["documents"][0]["document_id"] == "doc-1"
@@ -0,0 +1,99 @@
+"""AIMD limit adaptation and queueing of app.admission.AdaptiveLimiter."""
+import asyncio
+
+import pytest
+
+from app.admission import ADMISSION_BACKOFF_RATIO, AdaptiveLimiter, LoadShedError
+
+
+def make_limiter(initial=4, minimum=2, maximum=8, queue_size=2, queue_timeout=0.05):
+    return AdaptiveLimiter(
+        "/test", initial_limit=initial, min_limit=minimum, max_limit=maximum,
+        queue_size=queue_size, queue_timeout=queue_timeout
+    )
+
+
+def run_requests(limiter, latencies, success=True):
+    async def main():
+        for latency in latencies:
+            await limiter.acquire()
+            limiter.release(latency, success=success)
+    asyncio.run(main())
+
+
+def test_fast_requests_raise_the_limit_additively():
+    limiter = make_limiter(initial=4)
+    run_requests(limiter, [0.1])
+    assert limiter.limit == pytest.approx(4.25)
+    run_requests(limiter, [0.1] * 40)
+    assert limiter.limit == 8  # clamped at max_limit
+
+
+def test_slow_request_cuts_the_limit_multiplicatively():
+    limiter = make_limiter(initial=6)
+    run_requests(limiter, [0.1])
+    before = limiter.limit
+    run_requests(limiter, [1.0])  # > ADMISSION_LATENCY_TOLERANCE x baseline
+    assert limiter.limit == pytest.approx(before * ADMISSION_BACKOFF_RATIO)
+    # Congested samples don't move the baseline
+    assert limiter.baseline == pytest.approx(0.1)
+
+
+def test_failures_cut_the_limit_down_to_min_limit():
+    limiter = make_limiter(initial=4, minimum=2)
+    run_requests(limiter, [0.1] * 50, success=False)
+    assert limiter.limit == 2
+
+
+def test_release_without_latency_does_not_adapt():
+    limiter = make_limiter(initial=4)
+
+    async def main():
+        await limiter.acquire()
+        limiter.release(None, success=False)
+
+    asyncio.run(main())
+    assert limiter.limit == 4
+    assert limiter.inflight == 0
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    limiter = make_limiter(initial=2, minimum=2, queue_timeout=1.0)
+    order = []
+
+    async def request(name):
+        await limiter.acquire()
+        order.append(name)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.acquire()
+        waiters = [asyncio.create_task(request(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.inflight == 2 and order == []
+        limiter.release(None, success=True)
+        limiter.release(None, success=True)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert order == ["first", "second"]
+    assert limiter.inflight == 2
+
+
+def test_full_queue_and_queue_timeout_shed_load():
+    limiter = make_limiter(initial=2, minimum=2, queue_size=1, queue_timeout=0.05)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(LoadShedError) as full:
+            await limiter.acquire()
+        assert full.value.reason == "queue_full"
+        with pytest.raises(LoadShedError) as timed_out:
+            await queued
+        assert timed_out.value.reason == "queue_timeout"
+        assert limiter.inflight == 2
+
+    asyncio.run(main())
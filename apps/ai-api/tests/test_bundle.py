@@ -0,0 +1,137 @@
+"""Bundle format round trip and reader checks (app.bundle)."""
+import io
+import mmap
+
+import numpy as np
+import pytest
+
+from app.bundle import MAGIC, BundleReader, BundleWriter, read_bundle, read_header, write_bundle
+
+DIMENSION = 3
+
+
+def make_bundle(documents, chunks, header=None):
+    """Bundle bytes built with the streaming writer."""
+    writer = BundleWriter(header or {"dimension": DIMENSION, "embedding_model": "test-model"})
+    data = writer.start()
+    for document in documents:
+        data += writer.add_document(document)
+    for chunk, vector in chunks:
+        data += writer.add_chunk(chunk, vector)
+    return data + b"".join(writer.finish())
+
+
+def sample(title="Menu"):
+    documents = [{"id": "d1", "title": title, "content": "Pizza\nPasta"}]
+    chunks = [
+        ({"id": f"c{i}", "document_id": "d1", "chunk_index": i, "content": f"part {i}"}, [i, i + 0.5, -i])
+        for i in range(4)
+    ]
+    return documents, chunks
+
+
+def test_round_trip_preserves_header_records_and_vectors(tmp_path):
+    documents, chunks = sample()
+    path = tmp_path / "seed.bundle"
+    write_bundle(str(path), {"dimension": DIMENSION, "embedding_model": "test-model"}, documents, chunks)
+
+    header, read_documents, read_chunks, vectors = read_bundle(path.read_bytes())
+    assert header == {"dimension": DIMENSION, "embedding_model": "test-model"}
+    assert read_documents == [{"type": "document", **document} for document in documents]
+    assert read_chunks == [{"type": "chunk", **chunk} for chunk, _ in chunks]
+    np.testing.assert_array_equal(vectors, np.array([vector for _, vector in chunks], dtype=np.float32))
+
+
+def test_streamed_bundle_equals_written_file(tmp_path):
+    documents, chunks = sample()
+    path = tmp_path / "seed.bundle"
+    write_bundle(str(path), {"dimension": DIMENSION, "embedding_model": "test-model"}, documents, chunks)
+    assert make_bundle(documents, chunks) == path.read_bytes()
+
+
+@pytest.mark.parametrize("title", ["M", "Me", "Men", "Menu"])
+def test_vector_block_is_aligned_whatever_the_metadata_length(title):
+    data = make_bundle(*sample(title))
+    reader = BundleReader(data)
+    assert (len(data) - reader.vectors.nbytes) % 4 == 0
+    assert reader.vectors[2].tolist() == [2.0, 2.5, -2.0]
+
+
+def test_vectors_are_a_zero_copy_view_of_an_mmap(tmp_path):
+    path = tmp_path / "seed.bundle"
+    path.write_bytes(make_bundle(*sample()))
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    reader = BundleReader(buffer)
+    assert not reader.vectors.flags.owndata
+    assert [vector_index for _, vector_index in reader.records()] == [-1, 0, 1, 2, 3]
+    del reader
+    buffer.close()
+
+
+def test_bad_magic_is_rejected():
+    with pytest.raises(ValueError, match="bad magic"):
+        BundleReader(b"NOT-A-BUNDLE\n{}\n\n")
+
+
+def test_truncated_metadata_is_rejected():
+    data = make_bundle(*sample())
+    cut = data.index(b'{"type":"chunk"')
+    with pytest.raises(ValueError, match="Truncated bundle metadata"):
+        BundleReader(data[:cut])
+
+
+@pytest.mark.parametrize("title", ["M", "Me", "Men", "Menu"])
+def test_bundle_cut_in_the_terminator_or_padding_is_rejected(title):
+    documents, _ = sample(title)
+    data = make_bundle(documents, [])
+    with pytest.raises(ValueError):
+        BundleReader(data[:-1])
+
+
+def test_partial_vector_row_is_rejected():
+    data = make_bundle(*sample())
+    with pytest.raises(ValueError, match="not a multiple"):
+        BundleReader(data[:-2])
+
+
+def test_missing_vector_rows_are_detected_while_reading_records():
+    data = make_bundle(*sample())
+    reader = BundleReader(data[:-DIMENSION * 4])
+    with pytest.raises(ValueError, match="more chunk records than vectors"):
+        list(reader.records())
+
+
+def test_extra_vector_rows_are_detected_after_the_last_record():
+    data = make_bundle(*sample()) + np.zeros(DIMENSION, dtype="<f4").tobytes()
+    with pytest.raises(ValueError, match="5 vectors but 4 chunk records"):
+        list(BundleReader(data).records())
+
+
+def test_unknown_record_type_is_rejected():
+    writer = BundleWriter({"dimension": DIMENSION})
+    # The record's own "type" overrides the writer's
+    data = writer.start() + writer.add_document({"type": "bogus"}) + b"".join(writer.finish())
+    with pytest.raises(ValueError, match="Unknown bundle record type"):
+        list(BundleReader(data).records())
+
+
+def test_writer_rejects_vectors_of_the_wrong_size():
+    writer = BundleWriter({"dimension": DIMENSION})
+    writer.start()
+    with pytest.raises(ValueError, match="expected"):
+        writer.add_chunk({"id": "c0"}, [1.0, 2.0])
+
+
+def test_writer_requires_a_dimension():
+    with pytest.raises(ValueError):
+        BundleWriter({"embedding_model": "test-model"})
+
+
+def test_read_header_restores_the_file_position():
+    file = io.BytesIO(make_bundle(*sample()))
+    file.seek(7)
+    assert read_header(file)["embedding_model"] == "test-model"
+    assert file.tell() == 7
+    with pytest.raises(ValueError):
+        read_header(io.BytesIO(b"x" * len(MAGIC)))
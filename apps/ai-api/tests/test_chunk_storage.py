@@ -0,0 +1,55 @@
+"""Chunk offsets and storage modes (app.chunk_storage)."""
+import pytest
+
+from app import chunk_storage
+from app.chunk_storage import chunk_payload, chunk_spans, stored_content
+from app.ingest import chunk_text
+
+
+def test_spans_of_overlapping_chunks_slice_back_to_the_chunks():
+    content = "".join(f"Line {i}: the kitchen closes at ten. " for i in range(60))
+    chunks = chunk_text(content, chunk_size=200, overlap=40)
+    spans = chunk_spans(content, chunks)
+    assert len(spans) == len(chunks)
+    for chunk, (start, end) in zip(chunks, spans):
+        assert content[start:end] == chunk
+    # Overlap: each chunk starts before the previous one ends
+    assert all(later[0] < earlier[1] for earlier, later in zip(spans, spans[1:]))
+
+
+def test_repeated_text_is_located_in_order():
+    content = "abcabcabc"
+    assert chunk_spans(content, ["abc", "abc", "abc"]) == [(0, 3), (3, 6), (6, 9)]
+
+
+def test_chunk_out_of_order_is_found_from_the_start():
+    assert chunk_spans("alpha beta", ["beta", "alpha"]) == [(6, 10), (0, 5)]
+
+
+def test_chunk_not_in_the_document_has_no_span():
+    assert chunk_spans("alpha beta", ["alpha", "gamma"]) == [(0, 5), None]
+
+
+@pytest.mark.parametrize("mode, span, expected", [
+    ("inline", (0, 4), "text"),
+    ("inline", None, "text"),
+    ("offsets", (0, 4), None),
+    ("offsets", None, "text"),  # span unknown: text stays inline
+])
+def test_stored_content_per_mode(monkeypatch, mode, span, expected):
+    monkeypatch.setattr(chunk_storage, "CHUNK_STORAGE", mode)
+    assert stored_content("text", span) == expected
+
+
+@pytest.mark.parametrize("mode, has_text", [("inline", True), ("offsets", False)])
+def test_payload_carries_text_only_inline(monkeypatch, mode, has_text):
+    monkeypatch.setattr(chunk_storage, "CHUNK_STORAGE", mode)
+    payload = chunk_payload("doc", "chunk", "tenant", 3, "hello", "Title", "faq")
+    assert ("text" in payload) is has_text
+    assert payload["chunk_index"] == 3 and payload["tenant_id"] == "tenant"
+
+
+def test_every_payload_write_gets_a_new_revision():
+    first = chunk_payload("doc", "chunk", "tenant", 0, "hello", "Title", "faq")
+    second = chunk_payload("doc", "chunk", "tenant", 0, "hello", "Title", "faq")
+    assert first["revision"] != second["revision"]
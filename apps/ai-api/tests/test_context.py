@@ -0,0 +1,72 @@
+"""Merging, deduplication and packing of /chat contexts (app.context)."""
+from app.context import CONTEXT_CHARS_PER_TOKEN, ContextChunk, Passage, assemble_contexts, merge_chunks, pack_passages
+
+
+def test_consecutive_chunks_merge_with_the_overlap_written_once():
+    chunks = [
+        ContextChunk("doc", 1, "delivery until 10pm. Orders over 20", 0.7),
+        ContextChunk("doc", 0, "We deliver daily, delivery until 10pm.", 0.9),
+    ]
+    passages = merge_chunks(chunks, max_overlap=20)
+    assert len(passages) == 1
+    assert passages[0].text == "We deliver daily, delivery until 10pm. Orders over 20"
+    assert passages[0].chunk_indexes == [0, 1]
+    assert passages[0].score == 0.9
+
+
+def test_gaps_and_other_documents_start_new_passages():
+    chunks = [
+        ContextChunk("a", 0, "first", 0.5),
+        ContextChunk("a", 2, "third", 0.6),
+        ContextChunk("b", 1, "other", 0.4),
+    ]
+    passages = merge_chunks(chunks)
+    assert sorted((p.document_id, p.first_index, p.last_index) for p in passages) == [
+        ("a", 0, 0), ("a", 2, 2), ("b", 1, 1)
+    ]
+
+
+def test_duplicate_chunks_keep_the_best_score():
+    chunks = [ContextChunk("a", 0, "menu", 0.2), ContextChunk("a", 0, "menu", 0.8)]
+    passages = merge_chunks(chunks)
+    assert len(passages) == 1 and passages[0].score == 0.8
+
+
+def test_passage_contained_in_a_better_one_is_dropped():
+    contexts, stats = assemble_contexts([
+        ContextChunk("a", 0, "Opening hours: Mon-Fri 9-17, Sat 10-14.", 0.9),
+        ContextChunk("b", 0, "opening   hours: mon-fri 9-17", 0.8),  # same text ingested again
+    ], token_budget=0)
+    assert contexts == ["Opening hours: Mon-Fri 9-17, Sat 10-14."]
+    assert stats["input_chunks"] == 2 and stats["passages"] == 1
+
+
+def test_packing_skips_passages_that_do_not_fit_in_favour_of_smaller_ones():
+    budget = 10
+    big = "x" * int(8 * CONTEXT_CHARS_PER_TOKEN)
+    too_big = "y" * int(5 * CONTEXT_CHARS_PER_TOKEN)
+    small = "z" * int(2 * CONTEXT_CHARS_PER_TOKEN)
+    passages = [
+        Passage("a", 0, 0, big, 0.9, [0]),
+        Passage("b", 0, 0, too_big, 0.8, [0]),
+        Passage("c", 0, 0, small, 0.7, [0]),
+    ]
+    picked = pack_passages(passages, token_budget=budget)
+    assert [p.document_id for p in picked] == ["a", "c"]
+
+
+def test_best_passage_is_truncated_when_it_alone_exceeds_the_budget():
+    text = "w" * int(50 * CONTEXT_CHARS_PER_TOKEN)
+    contexts, stats = assemble_contexts([ContextChunk("a", 0, text, 0.9)], token_budget=10)
+    assert len(contexts) == 1
+    assert len(contexts[0]) == int(10 * CONTEXT_CHARS_PER_TOKEN)
+    assert stats["context_tokens"] == 10
+
+
+def test_contexts_are_ordered_best_score_first():
+    contexts, _ = assemble_contexts([
+        ContextChunk("a", 0, "low", 0.1),
+        ContextChunk("b", 0, "high", 0.9),
+        ContextChunk("c", 0, "mid", 0.5),
+    ], token_budget=0)
+    assert contexts == ["high", "mid", "low"]
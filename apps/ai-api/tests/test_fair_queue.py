@@ -0,0 +1,163 @@
+"""Fair LLM slot scheduling (app.fair_queue) and per-worker limits."""
+import asyncio
+
+import pytest
+
+from app import fair_queue, tenant_quota
+from app.fair_queue import FairScheduler
+from app.resilience import UpstreamUnavailableError
+
+
+@pytest.fixture
+def weights(monkeypatch):
+    values = {}
+    monkeypatch.setattr(fair_queue, "get_tenant_limits", lambda tenant_id: {"weight": values.get(tenant_id, 1)})
+    return values
+
+
+async def _grant_order(scheduler, requests):
+    """Queue `requests` (tenant IDs) behind a held slot and record the order they are granted."""
+    order = []
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("holder"):
+            await gate.wait()
+
+    async def request(tenant_id):
+        async with scheduler.slot(tenant_id):
+            order.append(tenant_id)
+            await asyncio.sleep(0)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = []
+    for tenant_id in requests:
+        tasks.append(asyncio.create_task(request(tenant_id)))
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+def test_grants_follow_tenant_weights(weights):
+    weights["heavy"] = 3
+    scheduler = FairScheduler("test", 1, 5)
+    order = asyncio.run(_grant_order(scheduler, ["heavy"] * 6 + ["light"] * 6))
+    # Both tenants wait for the first eight grants: three heavy per light
+    assert order[:8].count("heavy") == 6 and order[:8].count("light") == 2
+    assert order[:4].count("light") == 1
+    assert scheduler.inflight == 0
+
+
+def test_single_request_is_not_stuck_behind_a_backlog(weights):
+    scheduler = FairScheduler("test", 1, 5)
+    order = asyncio.run(_grant_order(scheduler, ["busy"] * 20 + ["quiet"]))
+    assert order.index("quiet") <= 1
+
+
+def test_capacity_is_never_exceeded(weights):
+    scheduler = FairScheduler("test", 3, 5)
+    peak = 0
+
+    async def request(tenant_id):
+        nonlocal peak
+        async with scheduler.slot(tenant_id):
+            peak = max(peak, scheduler.inflight)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        await asyncio.gather(*(request(f"t{i % 4}") for i in range(20)))
+
+    asyncio.run(main())
+    assert peak == 3
+    assert scheduler.inflight == 0
+
+
+def test_queue_timeout_raises_unavailable(weights):
+    scheduler = FairScheduler("test", 1, 0.02)
+
+    async def main():
+        async with scheduler.slot("holder"):
+            with pytest.raises(UpstreamUnavailableError):
+                async with scheduler.slot("waiting"):
+                    pass
+            assert not scheduler._queues
+        async with scheduler.slot("waiting"):
+            pass
+
+    asyncio.run(main())
+    assert scheduler.inflight == 0
+
+
+def test_cancelled_waiter_leaves_the_queue(weights):
+    scheduler = FairScheduler("test", 1, 5)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("holder"):
+                await gate.wait()
+
+        async def wait():
+            async with scheduler.slot("cancelled"):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not scheduler._queues
+        gate.set()
+        await holder
+
+    asyncio.run(main())
+    assert scheduler.inflight == 0
+
+
+def test_cancelled_holder_releases_its_slot(weights):
+    scheduler = FairScheduler("test", 1, 5)
+
+    async def main():
+        async def hold():
+            async with scheduler.slot("holder"):
+                await asyncio.sleep(10)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert scheduler.inflight == 1
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+        async with scheduler.slot("next"):
+            pass
+
+    asyncio.run(main())
+    assert scheduler.inflight == 0
+
+
+@pytest.mark.parametrize("workers, limit, expected", [
+    (None, 10, 10),
+    ("3", 10, 4),
+    ("4", 8, 2),
+    ("3", 0, 0),
+])
+def test_per_worker_splits_instance_limits(monkeypatch, workers, limit, expected):
+    if workers is None:
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("WEB_CONCURRENCY", workers)
+    assert tenant_quota.per_worker(limit) == expected
+
+
+def test_llm_scheduler_is_sized_per_worker(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setattr(fair_queue, "LLM_MAX_CONCURRENCY", 10)
+    fair_queue.reset_llm_scheduler()
+    try:
+        assert fair_queue.get_llm_scheduler().capacity == 3
+    finally:
+        fair_queue.reset_llm_scheduler()
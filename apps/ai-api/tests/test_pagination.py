@@ -0,0 +1,43 @@
+"""Keyset cursors of GET /documents (app.pagination)."""
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_the_sort_key():
+    created_at = datetime(2024, 5, 17, 12, 30, 45, 123456, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, str(row_id))
+
+
+def test_cursor_keeps_non_utc_offsets():
+    created_at = datetime(2024, 1, 1, 8, 0, tzinfo=timezone(timedelta(hours=2)))
+    decoded, _ = decode_cursor(encode_cursor(created_at, uuid.uuid4()))
+    assert decoded == created_at and decoded.utcoffset() == timedelta(hours=2)
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    for _ in range(20):
+        cursor = encode_cursor(datetime.now(timezone.utc), uuid.uuid4())
+        assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not-a-cursor",
+    "W10",  # "[]"
+    encode_cursor(datetime(2024, 1, 1), uuid.uuid4())[:-4],  # truncated
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_with_an_invalid_id_is_rejected():
+    cursor = base64.urlsafe_b64encode(b'["2024-01-01T00:00:00","42"]').decode().rstrip("=")
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,147 @@
+"""Retries, circuit breaker and bounded threads of app.resilience."""
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app import resilience
+from app.resilience import (
+    CircuitBreaker, CircuitOpenError, Dependency, UpstreamTimeoutError, UpstreamUnavailableError,
+    call, is_transient_error, run_blocking
+)
+
+
+@pytest.fixture
+def dependency(monkeypatch):
+    """A fresh dependency ("test") with 2 retries and no backoff delay."""
+    dep = Dependency("test", timeout=0.2, max_retries=2, max_threads=2)
+    dep.breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    monkeypatch.setitem(resilience._dependencies, "test", dep)
+    monkeypatch.setattr(resilience, "RETRY_BASE_SECONDS", 0.0)
+    return dep
+
+
+def failing(error, calls):
+    async def attempt():
+        calls.append(1)
+        raise error
+    return attempt
+
+
+def test_transient_errors_are_retried_and_count_once_against_the_breaker(dependency):
+    calls = []
+    with pytest.raises(ConnectionError):
+        asyncio.run(call("test", failing(ConnectionError("reset"), calls)))
+    assert len(calls) == 3
+    assert dependency.breaker.failures == 1
+    assert dependency.breaker.state == "closed"
+
+
+def test_non_idempotent_calls_are_not_retried(dependency):
+    calls = []
+    with pytest.raises(ConnectionError):
+        asyncio.run(call("test", failing(ConnectionError("reset"), calls), idempotent=False))
+    assert len(calls) == 1
+
+
+def test_permanent_errors_are_raised_at_once_and_keep_the_circuit_closed(dependency):
+    calls = []
+    with pytest.raises(KeyError):
+        asyncio.run(call("test", failing(KeyError("bad request"), calls)))
+    assert len(calls) == 1
+    assert dependency.breaker.failures == 0
+
+
+def test_retry_succeeds_after_a_transient_failure(dependency):
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused")
+        return "ok"
+
+    assert asyncio.run(call("test", flaky)) == "ok"
+    assert dependency.breaker.failures == 0
+
+
+def test_timeout_raises_upstream_timeout_error(dependency):
+    dependency.max_retries = 0
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(UpstreamTimeoutError):
+        asyncio.run(call("test", slow))
+    assert dependency.breaker.failures == 1
+
+
+def test_circuit_opens_after_threshold_and_rejects_without_calling(dependency):
+    calls = []
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(call("test", failing(ConnectionError("reset"), calls)))
+    assert dependency.breaker.state == "open"
+
+    calls.clear()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call("test", failing(ConnectionError("reset"), calls)))
+    assert calls == []
+
+
+def test_half_open_admits_one_trial_that_closes_the_circuit():
+    breaker = CircuitBreaker("trial", failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker("trial", failure_threshold=5, reset_seconds=0)
+    for _ in range(5):
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+@pytest.mark.parametrize("error, transient", [
+    (ConnectionError("reset"), True),
+    (asyncio.TimeoutError(), True),
+    (httpx.ReadTimeout("slow"), True),
+    (UpstreamUnavailableError("x", "down", 1), True),
+    (ValueError("bad input"), False),
+    (KeyError("missing"), False),
+])
+def test_is_transient_error(error, transient):
+    assert is_transient_error(error) is transient
+
+
+@pytest.mark.parametrize("status_code, transient", [(500, True), (503, True), (429, True), (408, True), (400, False), (404, False)])
+def test_is_transient_error_by_status_code(status_code, transient):
+    error = Exception("response")
+    error.status_code = status_code
+    assert is_transient_error(error) is transient
+
+
+def test_run_blocking_fails_fast_when_all_threads_are_busy(dependency):
+    release = threading.Event()
+
+    async def main():
+        busy = [asyncio.ensure_future(run_blocking("test", release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(UpstreamUnavailableError):
+            await run_blocking("test", lambda: "never runs")
+        release.set()
+        await asyncio.gather(*busy)
+        # Threads are free again
+        return await run_blocking("test", lambda: "ran")
+
+    assert asyncio.run(main()) == "ran"
@@ -0,0 +1,115 @@
+"""Coalescing of identical concurrent work (app.single_flight)."""
+import asyncio
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_the_same_key_share_one_computation():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("question", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert runs == [1]
+    assert [result for result, _ in results] == ["answer"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def compute(key):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        return await asyncio.gather(flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b")))
+
+    assert [result for result, _ in asyncio.run(main())] == ["a", "b"]
+    assert sorted(runs) == ["a", "b"]
+
+
+def test_nothing_is_kept_after_completion():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        return len(runs)
+
+    async def main():
+        first = await flight.do("key", compute)
+        second = await flight.do("key", compute)
+        return first, second
+
+    assert asyncio.run(main()) == ((1, False), (2, False))
+    assert flight._inflight == {} and flight._waiters == {}
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", compute))
+        follower = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ("done", True)
+
+
+def test_computation_is_cancelled_when_every_caller_is_gone():
+    flight = SingleFlight("test")
+
+    async def main():
+        stopped = asyncio.Event()
+
+        async def compute():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        callers = [asyncio.create_task(flight.do("key", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return flight._inflight
+
+    assert asyncio.run(main()) == {}
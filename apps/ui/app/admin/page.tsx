@@ -11,7 +11,7 @@ import {
   adminReset,
   adminSeed,
   adminResetSeed,
-  type AdminResetResponse,
+  type AdminJobAccepted,
   type AdminSeedResponse,
   type AdminResetSeedResponse,
   type ApiConfig,
@@ -35,7 +35,7 @@ export default function AdminPage() {
   const [apiKey, setApiKey] = useState('');
   const [loading, setLoading] = useState(false);
   const [response, setResponse] = useState<
-    AdminResetResponse | AdminSeedResponse | AdminResetSeedResponse | null
+    AdminJobAccepted | AdminSeedResponse | AdminResetSeedResponse | null
   >(null);
   const [error, setError] = useState<string | null>(null);
   const [showConfirmModal, setShowConfirmModal] = useState<string | null>(null);
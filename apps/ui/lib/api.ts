@@ -54,11 +54,11 @@ export class ApiError extends Error {
   }
 }
 
-async function apiRequest<T>(
+async function apiRequestWithHeaders<T>(
   endpoint: string,
   options: RequestInit = {},
   config: ApiConfig = {}
-): Promise<T> {
+): Promise<{ data: T; headers: Headers }> {
   const { tenantId = 'demo', apiKey } = config;
   
   const url = new URL(endpoint, API_BASE);
@@ -94,7 +94,15 @@ async function apiRequest<T>(
     throw new ApiError(errorMessage, response.status, response.statusText);
   }
   
-  return response.json();
+  return { data: await response.json(), headers: response.headers };
+}
+
+async function apiRequest<T>(
+  endpoint: string,
+  options: RequestInit = {},
+  config: ApiConfig = {}
+): Promise<T> {
+  return (await apiRequestWithHeaders<T>(endpoint, options, config)).data;
 }
 
 /**
@@ -133,15 +141,25 @@ export async function chat(
 
 /**
  * List documents for a tenant (requires API key)
+ * The API returns one page at a time; follow X-Next-Cursor until the last page.
  */
 export async function listDocuments(config: ApiConfig = {}): Promise<Document[]> {
   if (!config.apiKey) {
     throw new ApiError('API key is required to list documents', 401);
   }
   
-  return apiRequest<Document[]>('/documents', {
-    method: 'GET',
-  }, config);
+  const documents: Document[] = [];
+  let cursor: string | null = null;
+  do {
+    const endpoint: string = cursor ? `/documents?cursor=${encodeURIComponent(cursor)}` : '/documents';
+    const { data, headers } = await apiRequestWithHeaders<Document[]>(endpoint, {
+      method: 'GET',
+    }, config);
+    documents.push(...data);
+    cursor = headers.get('X-Next-Cursor');
+  } while (cursor);
+  
+  return documents;
 }
 
 /**
@@ -170,6 +188,7 @@ export async function deleteDocument(
 
 export interface AdminResetRequest {
   tenant_id?: string;
+  background?: boolean;
 }
 
 export interface AdminResetResponse {
@@ -180,6 +199,12 @@ export interface AdminResetResponse {
   deleted_qdrant_points: number;
 }
 
+export interface AdminJobAccepted {
+  status: string;
+  job_id: string;
+  tenant_id: string;
+}
+
 export interface DocumentSeedInfo {
   title: string;
   document_id: string;
@@ -201,16 +226,17 @@ export interface AdminResetSeedResponse {
 
 /**
  * Reset a tenant (requires API key)
+ * The reset runs as a background job; the API answers 202 with its job_id.
  */
 export async function adminReset(
   tenantId: string = 'demo',
   config: ApiConfig = {}
-): Promise<AdminResetResponse> {
+): Promise<AdminJobAccepted> {
   if (!config.apiKey) {
     throw new ApiError('API key is required for admin operations', 401);
   }
   
-  return apiRequest<AdminResetResponse>(
+  return apiRequest<AdminJobAccepted>(
     '/admin/reset',
     {
       method: 'POST',